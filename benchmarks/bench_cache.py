@@ -0,0 +1,38 @@
+"""
+Load time of one service from a data.csv-shaped file without the columnar cache, on
+the first cached run (parse + cache write) and on the second run (cache read).
+
+Usage:
+    python -m benchmarks.bench_cache --rows 5000000
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import write_viewing_csv
+from source.loading import PIPELINE_COLUMNS, load_viewing_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--service', default='Netflix')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.csv')
+        write_viewing_csv(path, args.rows)
+        
+        for label, use_cache in [('no cache', False), ('first run', True), ('second run', True)]:
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                df = load_viewing_data(path, streaming_services=[args.service],
+                                       columns=PIPELINE_COLUMNS, use_cache=use_cache)
+            print(f'{label:>10}  {time.perf_counter() - started:8.2f} s  {len(df):,} rows')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Time and peak memory of the single-pass exploring profile against the multi-pass
+console dump it replaces (load the whole file, info(), unique values and regex
+matches), with a check that both find the same service spellings and that the
+approximate cardinalities are within a few percent of the exact ones.
+
+Every measurement runs in a fresh interpreter so that its peak RSS is its own.
+
+Usage:
+    python -m benchmarks.bench_exploring --rows 2000000
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.memory import peak_rss_mb
+from benchmarks.synthetic import write_viewing_csv
+from source.exploring import SERVICES_TO_MATCH, profile_csv, write_profile
+
+
+def multi_pass(path: str) -> dict:
+    df = pd.read_csv(path, low_memory=False)
+    df.info(buf=open(os.devnull, 'w'))
+    matches = {}
+    for column in ['application', 'network']:
+        values = [f'{value}' for value in df[column].unique().tolist()]
+        matches[column] = {word: sorted(value for value in values
+                                        if re.compile(fr'^{re.escape(word)}$', re.IGNORECASE).match(value))
+                           for word in SERVICES_TO_MATCH}
+    cardinalities = {column: int(df[column].nunique()) for column in df.columns}
+    return {'matches': matches, 'cardinalities': cardinalities}
+
+
+def child(mode: str, path: str, output: str):
+    started = time.perf_counter()
+    if mode == 'multi-pass':
+        result = multi_pass(path)
+    else:
+        profile = profile_csv(path)
+        write_profile(profile, output + '.profile.json')
+        result = {'matches': profile['matches'],
+                  'cardinalities': {column: summary['cardinality'] for column, summary in profile['columns'].items()}}
+    elapsed = time.perf_counter() - started
+    print(f'{mode:>12}  {elapsed:8.2f} s  peak RSS {peak_rss_mb():8,.0f} MB', flush=True)
+    with open(output, 'w') as f:
+        json.dump(result, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--child', nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.csv')
+        write_viewing_csv(path, args.rows, realistic=True)
+        print(f'{args.rows:,} rows, {os.path.getsize(path) / 2**20:,.0f} MB')
+        results = {}
+        for mode in ['multi-pass', 'single-pass']:
+            output = os.path.join(tmp, f'{mode}.json')
+            subprocess.run([sys.executable, '-m', 'benchmarks.bench_exploring', '--child', mode, path, output],
+                           check=True, stdout=sys.stdout)
+            with open(output) as f:
+                results[mode] = json.load(f)
+
+        expected, result = results['multi-pass'], results['single-pass']
+        assert expected['matches'] == result['matches'], result['matches']
+        for column, exact in expected['cardinalities'].items():
+            error = abs(result['cardinalities'][column] - exact) / max(exact, 1)
+            assert error < 0.05, (column, exact, result['cardinalities'][column])
+            if error:
+                print(f'{column:>20}  {exact:>10,} distinct, estimated {result["cardinalities"][column]:>10,} '
+                      f'({error:.2%} off)')
+        print('service matches are identical and cardinalities within 5%')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Peak memory and time of the out-of-core ExternalGapAnalysis against the in-memory
+GapAnalysis on the same file, with a check that both produce the same frequency
+table and subscription types.
+
+Every measurement runs in a fresh interpreter so that its peak RSS is its own.
+
+Usage:
+    python -m benchmarks.bench_external --rows 5000000 --run-rows 500000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.memory import peak_rss_mb
+from benchmarks.synthetic import write_viewing_csv
+from source.analysis import GapAnalysis
+from source.external_sort import ExternalGapAnalysis
+
+
+def child(mode: str, path: str, service: str, run_rows: str, block_rows: str):
+    started = time.perf_counter()
+    if mode == 'in-memory':
+        analyzer = GapAnalysis(path, service, use_cache=False)
+    else:
+        analyzer = ExternalGapAnalysis(path, service, run_rows=int(run_rows), block_rows=int(block_rows),
+                                       tmp_dir=os.path.dirname(path))
+    frequency_df = analyzer.frequency_df
+    subscription_types = analyzer.categorize_subscription_types()
+    elapsed = time.perf_counter() - started
+    peak_mb = peak_rss_mb()
+    print(f'{mode:>10}  {elapsed:8.2f} s  peak RSS {peak_mb:8,.0f} MB  {len(subscription_types):,} TVs', flush=True)
+
+    output = os.path.join(os.path.dirname(path), mode)
+    frequency_df.to_csv(f'{output}-frequency.csv', index=False)
+    subscription_types.to_csv(f'{output}-subscription-types.csv', index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--service', default='Netflix')
+    parser.add_argument('--run-rows', type=int, default=500_000)
+    parser.add_argument('--block-rows', type=int, default=50_000)
+    parser.add_argument('--child', nargs=5, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.csv')
+        write_viewing_csv(path, args.rows, realistic=True)
+        print(f'{args.rows:,} rows, {os.path.getsize(path) / 2**20:,.0f} MB, '
+              f'runs of {args.run_rows:,} rows merged in blocks of {args.block_rows:,}')
+        for mode in ['in-memory', 'external']:
+            subprocess.run([sys.executable, '-m', 'benchmarks.bench_external', '--child', mode, path,
+                            args.service, str(args.run_rows), str(args.block_rows)],
+                           check=True, stdout=sys.stdout)
+
+        for name in ['frequency', 'subscription-types']:
+            with open(os.path.join(tmp, f'in-memory-{name}.csv')) as f, \
+                 open(os.path.join(tmp, f'external-{name}.csv')) as g:
+                assert f.read() == g.read(), name
+        print('frequency tables and subscription types are identical')
+
+
+if __name__ == '__main__':
+    main()
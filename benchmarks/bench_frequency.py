@@ -0,0 +1,89 @@
+"""
+Benchmark of the fixed-bin gap histogram against the pd.cut binning it replaced, on
+gap tables with one multi-day outlier gap, with an equivalence check of the frequency
+tables. Peak memory is measured with tracemalloc.
+
+Usage:
+    python -m benchmarks.bench_frequency --gaps 2000000 --outlier-days 30
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from source.analysis import gap_frequency_table
+
+
+def make_gap_frame(n_gaps: int,
+                   n_tvs: int,
+                   outlier_seconds: float,
+                   seed: int = 0) -> pd.DataFrame:
+    """Gap table shaped like GapAnalysis.gap_analysis_df (tv_id and gap_seconds only)."""
+    rng = np.random.default_rng(seed)
+    tv_ids = pd.Categorical([f'{value:040x}' for value in rng.integers(0, 2**63, n_tvs)])
+    gap_seconds = np.where(rng.random(n_gaps) < 0.5,
+                           rng.integers(0, 60, n_gaps),
+                           rng.exponential(3_600, n_gaps).round())
+    gap_seconds[rng.random(n_gaps) < 0.1] = np.nan
+    gap_seconds[0] = outlier_seconds
+    return pd.DataFrame({'tv_id': tv_ids.take(rng.integers(0, n_tvs, n_gaps)),
+                         'gap_seconds': gap_seconds})
+
+
+def legacy_frequency_table(gap_analysis_df: pd.DataFrame) -> pd.DataFrame:
+    """Reference implementation: pd.cut over every 15-second range up to the largest gap."""
+    df_clean = gap_analysis_df.dropna(subset=['gap_seconds']).copy()
+    max_gap = df_clean['gap_seconds'].max()
+    bin_edges = list(range(0, int(max_gap) + 15, 15))
+    gap_labels = [f"{bin_edges[i]}-{bin_edges[i+1]}" for i in range(len(bin_edges) - 1)]
+
+    df_clean['gap_range'] = pd.cut(df_clean['gap_seconds'], bins=bin_edges, labels=gap_labels,
+                                   right=False, include_lowest=True)
+    return (df_clean
+            .groupby(['tv_id', 'gap_range'], observed=True)
+            .size()
+            .reset_index(name='frequency'))
+
+
+def measure(function, *args):
+    """Run function and return its result, wall time and peak traced memory in MiB."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = function(*args)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--gaps', type=int, default=2_000_000)
+    parser.add_argument('--tvs', type=int, default=50_000)
+    parser.add_argument('--outlier-days', type=float, default=30,
+                        help='Largest gap of the benchmark table, in days')
+    args = parser.parse_args()
+
+    # the largest gap is not at a range edge: pd.cut left out the top range when it was
+    check = make_gap_frame(200_000, 2_000, outlier_seconds=3 * 86_400 + 7.5, seed=1)
+    expected = legacy_frequency_table(check)
+    result = gap_frequency_table(check['tv_id'], check['gap_seconds'])
+    assert result.to_csv(index=False) == expected.to_csv(index=False)
+    pd.testing.assert_series_equal(result['frequency'], expected['frequency'])
+    print(f'equivalence check passed on {len(check):,} gaps')
+
+    df = make_gap_frame(args.gaps, args.tvs, outlier_seconds=args.outlier_days * 86_400)
+    print(f'{args.gaps:,} gaps, largest {args.outlier_days:g} days')
+    for name, function in [('pd.cut', legacy_frequency_table),
+                           ('fixed bins', lambda frame: gap_frequency_table(frame['tv_id'], frame['gap_seconds'])),
+                           ('fixed bins, log tail', lambda frame: gap_frequency_table(frame['tv_id'], frame['gap_seconds'],
+                                                                                      tail_start=3_600, tail_scale='log'))]:
+        frequency_df, elapsed, peak = measure(function, df)
+        print(f'{name:>22}  {elapsed:7.2f} s  peak {peak:8.1f} MiB  '
+              f'{len(frequency_df):,} rows, {len(frequency_df["gap_range"].cat.categories):,} ranges')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""
+Throughput of the session gap engine. Its equivalence with the per-session loop it
+replaced is checked in tests/test_analysis.py.
+
+Usage:
+    python -m benchmarks.bench_gap_analysis --sizes 1000000 10000000 50000000
+"""
+import argparse
+import time
+
+from benchmarks.synthetic import make_viewing_frame
+from source.analysis import compute_session_gaps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000_000, 10_000_000, 50_000_000])
+    args = parser.parse_args()
+    
+    for n_rows in args.sizes:
+        df = make_viewing_frame(n_rows)
+        started = time.perf_counter()
+        gap_analysis_df = compute_session_gaps(df)
+        elapsed = time.perf_counter() - started
+        print(f'{n_rows:>12,} rows  {elapsed:8.2f} s  {n_rows / elapsed:14,.0f} rows/s  '
+              f'{len(gap_analysis_df):,} gap rows')
+
+
+if __name__ == '__main__':
+    main()
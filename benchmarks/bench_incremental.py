@@ -0,0 +1,55 @@
+"""
+Cost of adding one day of viewing logs: a full GapAnalysis over history + delta
+against IncrementalGapAnalysis.update_frame on the delta, with an equality check of
+the resulting frequency tables and subscription types.
+
+Usage:
+    python -m benchmarks.bench_incremental --rows 2000000 --delta-days 1
+"""
+import argparse
+import contextlib
+import io
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_viewing_frame
+from source.analysis import GapAnalysis
+from source.incremental import IncrementalGapAnalysis
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--delta-days', type=int, default=1)
+    args = parser.parse_args()
+    
+    df = make_viewing_frame(args.rows).drop(columns='tv_content_id')
+    day = df['start_time'].str[:10]
+    last_days = sorted(day.unique())[-args.delta_days:]
+    history = df[~day.isin(last_days)].reset_index(drop=True)
+    delta = df[day.isin(last_days)].reset_index(drop=True)
+    
+    with contextlib.redirect_stdout(io.StringIO()):
+        incremental = IncrementalGapAnalysis('Netflix')
+        incremental.update_frame(history.copy())
+        
+        started = time.perf_counter()
+        incremental.update_frame(delta.copy())
+        subscription_types = incremental.subscription_types
+        incremental_time = time.perf_counter() - started
+        
+        started = time.perf_counter()
+        full = GapAnalysis(path_to_data='', streaming_service='Netflix',
+                           data=pd.concat([history, delta], ignore_index=True))
+        expected = full.categorize_subscription_types()
+        full_time = time.perf_counter() - started
+    
+    pd.testing.assert_frame_equal(subscription_types, expected)
+    assert incremental.frequency_df.to_csv(index=False) == full.frequency_df.to_csv(index=False)
+    print(f'history {len(history):,} rows, delta {len(delta):,} rows  '
+          f'full recompute {full_time:8.2f} s  incremental update {incremental_time:8.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Memory per row and groupby time of the tv_id / tv_content_id keys as Python strings
+against the categorical (integer coded) encoding used by the pipeline.
+
+Usage:
+    python -m benchmarks.bench_key_encoding --rows 5000000
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_viewing_frame
+from source.analysis import encode_session_keys
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    args = parser.parse_args()
+    
+    df = make_viewing_frame(args.rows).drop(columns='tv_content_id')
+    
+    string_keys, string_build = timed(lambda: pd.DataFrame({
+        'tv_id': df['tv_id'],
+        'tv_content_id': df['tv_id'].astype(str) + '_' + df['content_id'].astype(str)}))
+    
+    def encode():
+        tv_id = df['tv_id'].astype('category')
+        return pd.DataFrame({'tv_id': tv_id, 'tv_content_id': encode_session_keys(tv_id, df['content_id'])})
+    coded_keys, coded_build = timed(encode)
+    
+    for name, keys, build in [('strings', string_keys, string_build), ('categorical', coded_keys, coded_build)]:
+        bytes_per_row = keys.memory_usage(deep=True, index=False).sum() / len(keys)
+        _, session_groupby = timed(lambda: keys.groupby('tv_content_id', observed=True, sort=False).size())
+        _, tv_groupby = timed(lambda: keys.groupby('tv_id', observed=True).size())
+        print(f'{name:>12}  build {build:6.2f} s  {bytes_per_row:7.1f} bytes/row  '
+              f'groupby tv_content_id {session_groupby:6.2f} s  groupby tv_id {tv_groupby:6.2f} s')
+
+
+if __name__ == '__main__':
+    main()
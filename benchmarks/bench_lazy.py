@@ -0,0 +1,86 @@
+"""
+Construction time and peak memory of GapAnalysis runs that build every intermediate
+frame against a run that only asks for subscription types (gap_analysis_df is not
+kept), with a check that both classify the same way.
+
+Every measurement runs in a fresh interpreter so that its peak RSS is its own. The
+peak RSS is usually set by the CSV load, which both runs share, so the peak traced
+memory of the stages after the load and the resident memory held at the end are
+reported as well.
+
+Usage:
+    python -m benchmarks.bench_lazy --rows 5000000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.memory import peak_rss_mb
+from benchmarks.synthetic import write_viewing_csv
+from source.analysis import GapAnalysis
+
+
+def run_all(analyzer: GapAnalysis):
+    analyzer.gap_analysis_df, analyzer.frequency_df
+    return analyzer.categorize_subscription_types()
+
+
+def run_subscriptions(analyzer: GapAnalysis):
+    subscription_types = analyzer.categorize_subscription_types()
+    analyzer.release()
+    return subscription_types
+
+
+def resident_mb() -> float:
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+
+
+def child(mode: str, path: str, service: str):
+    started = time.perf_counter()
+    analyzer = GapAnalysis(path, service, use_cache=False)
+    constructed = time.perf_counter() - started
+    analyzer.df
+    
+    tracemalloc.start()
+    subscription_types = {'all': run_all, 'subscriptions': run_subscriptions}[mode](analyzer)
+    stages_peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+    tracemalloc.stop()
+    elapsed = time.perf_counter() - started
+    peak_mb = peak_rss_mb()
+    print(f'{mode:>14}  construct {constructed * 1000:5.2f} ms  total {elapsed:7.2f} s  '
+          f'peak RSS {peak_mb:7,.0f} MB  after load peak {stages_peak_mb:7,.0f} MB  '
+          f'resident at end {resident_mb():7,.0f} MB  {len(subscription_types):,} TVs', flush=True)
+    subscription_types.to_csv(os.path.join(os.path.dirname(path), f'lazy-{mode}.csv'), index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5_000_000)
+    parser.add_argument('--service', default='Netflix')
+    parser.add_argument('--child', nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.csv')
+        write_viewing_csv(path, args.rows, realistic=True)
+        print(f'{args.rows:,} rows, {os.path.getsize(path) / 2**20:,.0f} MB')
+        for mode in ['all', 'subscriptions']:
+            subprocess.run([sys.executable, '-m', 'benchmarks.bench_lazy', '--child', mode, path, args.service],
+                           check=True, stdout=sys.stdout)
+
+        with open(os.path.join(tmp, 'lazy-all.csv')) as f, open(os.path.join(tmp, 'lazy-subscriptions.csv')) as g:
+            assert f.read() == g.read()
+        print('subscription types are identical')
+
+
+if __name__ == '__main__':
+    main()
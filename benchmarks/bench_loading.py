@@ -0,0 +1,78 @@
+"""
+Peak memory of loading one service from a large data.csv-shaped file: the full
+read_csv followed by a filter against the chunked, column-pruned loader, without the
+columnar cache, building it (the default on a new file) and reading it.
+
+Every measurement runs in a fresh interpreter so that its peak RSS is its own.
+
+Usage:
+    python -m benchmarks.bench_loading --rows 20000000
+    python -m benchmarks.bench_loading --path ./data/big.csv
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.memory import peak_rss_mb
+from benchmarks.synthetic import write_viewing_csv
+from source.cache import clear_cache
+from source.loading import PIPELINE_COLUMNS, load_viewing_data
+
+
+def load_full(path: str, service: str) -> pd.DataFrame:
+    df = pd.read_csv(path, low_memory=False)
+    return df[df['application'].isin([service])].reset_index(drop=True)
+
+
+def load_streaming(path: str, service: str) -> pd.DataFrame:
+    return load_viewing_data(path, streaming_services=[service], columns=PIPELINE_COLUMNS, use_cache=False)
+
+
+def load_cached(path: str, service: str) -> pd.DataFrame:
+    return load_viewing_data(path, streaming_services=[service], columns=PIPELINE_COLUMNS)
+
+
+LOADERS = {'full': load_full, 'streaming': load_streaming, 'cache-build': load_cached, 'cache-read': load_cached}
+
+
+def child(mode: str, path: str, service: str):
+    started = time.perf_counter()
+    df = LOADERS[mode](path, service)
+    elapsed = time.perf_counter() - started
+    peak_mb = peak_rss_mb()
+    print(f'{mode:>11}  {elapsed:8.2f} s  peak RSS {peak_mb:10,.0f} MB  {len(df):,} rows kept')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20_000_000)
+    parser.add_argument('--path', help='existing CSV to load instead of a generated one')
+    parser.add_argument('--service', default='Netflix')
+    parser.add_argument('--child', choices=list(LOADERS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        child(args.child, args.path, args.service)
+        return
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.path
+        if path is None:
+            path = os.path.join(tmp, 'data.csv')
+            write_viewing_csv(path, args.rows)
+        print(f'{path}: {os.path.getsize(path) / 1024**3:.2f} GB')
+        
+        clear_cache(path, columns=PIPELINE_COLUMNS)
+        for mode in LOADERS:
+            subprocess.run([sys.executable, '-m', 'benchmarks.bench_loading',
+                            '--child', mode, '--path', path, '--service', args.service],
+                           check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark of the data preparation for several services: one file read per service
+(what a GapAnalysis per service does) against the single read, stable sort by
+application and per-service slices (sharing the sorted columns) used by
+GapAnalysis.for_services.
+
+Only the load and partition step is timed; the per-service pipeline that follows is
+the same in both cases.
+
+Usage:
+    python -m benchmarks.bench_multi_service --rows 2000000 --services 2 20
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_viewing_frame
+from source.loading import load_viewing_data
+
+
+def load_per_service(path: str, services: list) -> dict:
+    partitions = {}
+    for service in services:
+        df = load_viewing_data(path, use_cache=False)
+        partitions[service] = df[df['application'].isin([service])].reset_index(drop=True)
+    return partitions
+
+
+def load_once(path: str, services: list) -> dict:
+    df = load_viewing_data(path, use_cache=False)
+    codes, applications = pd.factorize(df['application'])
+    order = np.argsort(codes, kind='stable')
+    df = df.take(order).reset_index(drop=True)
+    bounds = np.searchsorted(codes[order], np.arange(len(applications) + 1))
+    blocks = dict(zip(applications, zip(bounds[:-1], bounds[1:])))
+    return {service: df.iloc[slice(*blocks[service])] for service in services}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--services', type=int, nargs='+', default=[2, 20])
+    args = parser.parse_args()
+    
+    for n_services in args.services:
+        services = [f'Service{i:02d}' for i in range(n_services)]
+        df = make_viewing_frame(args.rows, applications=services)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'data.csv')
+            df.drop(columns='tv_content_id').to_csv(path, index=False)
+            
+            timings = {}
+            for name, load in [('per_service', load_per_service), ('for_services', load_once)]:
+                started = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    load(path, services)
+                timings[name] = time.perf_counter() - started
+        
+        print(f'{n_services:>3} services  one read per service {timings["per_service"]:8.2f} s  '
+              f'single read {timings["for_services"]:8.2f} s  '
+              f'speedup {timings["per_service"] / timings["for_services"]:5.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Write time and bytes on disk of the four per-service result files: sequential
+to_csv calls (the previous main.py) against OutputWriter in every output format,
+with a check that the CSV files are byte-identical.
+
+Usage:
+    python -m benchmarks.bench_outputs --rows 2000000 --workers 4
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import write_viewing_csv
+from source.analysis import GapAnalysis
+from source.loading import format_timestamps
+from source.outputs import WRITERS, OutputWriter
+
+
+def result_frames(path: str, service: str) -> dict:
+    analyzer = GapAnalysis(path, service, use_cache=False)
+    return {f'{service}_data': format_timestamps(analyzer.df),
+            f'{service}_gap_analysis': analyzer.gap_analysis_df,
+            f'{service}_frequency_analysis': analyzer.frequency_df,
+            f'{service}_subscription_types': analyzer.categorize_subscription_types()}
+
+
+def write_sequential(frames: dict, output_dir: str) -> list:
+    paths = []
+    for name, df in frames.items():
+        paths.append(os.path.join(output_dir, f'{name}.csv'))
+        df.to_csv(paths[-1], index=False)
+    return paths
+
+
+def write_concurrent(frames: dict, output_dir: str, output_format: str, workers: int) -> list:
+    with OutputWriter(output_dir, output_format=output_format, max_workers=workers) as writer:
+        for name, df in frames.items():
+            writer.submit(name, df)
+    return writer.paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--service', default='Netflix')
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.csv')
+        write_viewing_csv(path, args.rows, realistic=True)
+        frames = result_frames(path, args.service)
+        print(f'{args.rows:,} rows in the file, {sum(len(df) for df in frames.values()):,} result rows '
+              f'({os.cpu_count()} CPUs, {args.workers} writer threads)')
+
+        runs = [('to_csv, sequential', lambda output_dir: write_sequential(frames, output_dir))]
+        for output_format in WRITERS:
+            runs.append((f'OutputWriter {output_format}',
+                         lambda output_dir, output_format=output_format:
+                         write_concurrent(frames, output_dir, output_format, args.workers)))
+
+        written = {}
+        for name, run in runs:
+            output_dir = tempfile.mkdtemp(dir=tmp)
+            started = time.perf_counter()
+            written[name] = paths = run(output_dir)
+            elapsed = time.perf_counter() - started
+            size_mb = sum(os.path.getsize(path) for path in paths) / 2**20
+            print(f'{name:>24}  {elapsed:7.2f} s  {size_mb:9.1f} MB on disk')
+
+        for expected, result in zip(written['to_csv, sequential'], written['OutputWriter csv']):
+            with open(expected, 'rb') as f, open(result, 'rb') as g:
+                assert f.read() == g.read(), result
+        print('CSV outputs are identical')
+
+
+if __name__ == '__main__':
+    main()
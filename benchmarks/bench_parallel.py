@@ -0,0 +1,47 @@
+"""
+Scaling of the session gap stage with the number of worker processes.
+
+Timestamps are parsed upfront (as the loader does) so only the gap stage is timed.
+Every run is checked against the serial result.
+
+Usage:
+    python -m benchmarks.bench_parallel --rows 10000000 --workers 1 2 4 8
+"""
+import argparse
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_viewing_frame
+from source.analysis import compute_session_gaps, encode_session_keys
+from source.loading import parse_timestamps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    
+    df = make_viewing_frame(args.rows)
+    df['tv_id'] = df['tv_id'].astype('category')
+    df['tv_content_id'] = encode_session_keys(df['tv_id'], df['content_id'])
+    df['start_time'] = parse_timestamps(df['start_time'])
+    df['end_time'] = parse_timestamps(df['end_time'])
+    
+    serial = None
+    baseline = None
+    for workers in args.workers:
+        started = time.perf_counter()
+        result = compute_session_gaps(df, workers=workers)
+        elapsed = time.perf_counter() - started
+        
+        if serial is None:
+            serial = compute_session_gaps(df) if workers > 1 else result
+        pd.testing.assert_frame_equal(result, serial)
+        baseline = baseline or elapsed
+        print(f'{workers:>2} workers  {elapsed:8.2f} s  speedup {baseline / elapsed:5.2f}x')
+
+
+if __name__ == '__main__':
+    main()
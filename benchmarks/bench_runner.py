@@ -0,0 +1,81 @@
+"""
+Throughput of the batch runner over several files and services for an increasing
+number of worker processes, against the serial loop of main.py, with a check that
+the runner writes the same files as the serial loop and that a second run skips
+every job.
+
+Usage:
+    python -m benchmarks.bench_runner --files 4 --rows 500000 --workers 1 2 4
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import write_viewing_csv
+from source.analysis import GapAnalysis
+from source.loading import format_timestamps
+from source.outputs import OutputWriter
+from source.runner import BatchRunner, job_dir
+from source.services import build_alias_index
+
+SERVICES = ['Netflix', 'Hulu']
+
+
+def serial_loop(paths: list, output_dir: str):
+    for path in paths:
+        analyzers = GapAnalysis.for_services(path, SERVICES, use_cache=False,
+                                             alias_index=build_alias_index(SERVICES))
+        with OutputWriter(job_dir(output_dir, path)) as writer:
+            for service, analyzer in analyzers.items():
+                writer.submit(f'{service}_data', format_timestamps(analyzer.df))
+                writer.submit(f'{service}_gap_analysis', analyzer.gap_analysis_df)
+                writer.submit(f'{service}_frequency_analysis', analyzer.frequency_df)
+                writer.submit(f'{service}_subscription_types', analyzer.categorize_subscription_types())
+                analyzer.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=4)
+    parser.add_argument('--rows', type=int, default=500_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for index in range(args.files):
+            paths.append(os.path.join(tmp, f'data-{index:02d}.csv'))
+            write_viewing_csv(paths[-1], args.rows, realistic=True, seed=index)
+        n_jobs = len(paths) * len(SERVICES)
+        print(f'{args.files} files of {args.rows:,} rows, {n_jobs} jobs, {os.cpu_count()} CPUs')
+
+        expected_dir = os.path.join(tmp, 'serial')
+        started = time.perf_counter()
+        serial_loop(paths, expected_dir)
+        elapsed = time.perf_counter() - started
+        print(f'{"serial loop":>18}  {elapsed:7.2f} s  {n_jobs / elapsed:6.2f} jobs/s')
+
+        for workers in args.workers:
+            output_dir = os.path.join(tmp, f'runner-{workers}')
+            runner = BatchRunner(output_dir, max_workers=workers, use_cache=False)
+            results = runner.run(paths, SERVICES)
+            assert all(result['status'] == 'done' for result in results), results
+            print(f'{f"runner, {workers} workers":>18}  {runner.summary()}')
+
+        for path in paths:
+            for service in SERVICES:
+                for name in ['data', 'gap_analysis', 'frequency_analysis', 'subscription_types']:
+                    file = f'{service}_{name}.csv'
+                    with open(os.path.join(job_dir(expected_dir, path), file), 'rb') as f, \
+                         open(os.path.join(job_dir(output_dir, path), file), 'rb') as g:
+                        assert f.read() == g.read(), file
+        print('runner outputs are identical to the serial loop')
+
+        runner.run(paths, SERVICES)
+        assert all(result['status'] == 'skipped' for result in runner.results)
+        print(f'{"second run":>18}  {runner.summary()}')
+
+
+if __name__ == '__main__':
+    main()
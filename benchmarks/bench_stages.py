@@ -0,0 +1,170 @@
+"""
+Stage-by-stage timing and memory profile of GapAnalysis on generated data.csv-shaped
+files of several sizes. Results are written as JSON so that runs can be compared
+across commits.
+
+Every size is run twice: once for wall times and once under tracemalloc for the
+peak memory allocated by each stage (tracing slows the run down, so its times are
+not reported). Generated files are kept in --data-dir and reused.
+
+Usage:
+    python -m benchmarks.bench_stages --rows 100000 1000000
+    python -m benchmarks.bench_stages --rows 1000000 --compare benchmarks/results/stages-<commit>-<time>.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import write_viewing_csv
+from source.analysis import GapAnalysis
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+def stages(analyzer: GapAnalysis) -> list:
+    """The (name, callable) stages of GapAnalysis, in the order its properties run them."""
+    def load_data():
+        analyzer._df = analyzer._load_data()
+
+    def create_gap_analysis_df():
+        analyzer.gap_analysis_df = analyzer._create_gap_analysis_df()
+
+    def create_gap_frequency_df():
+        analyzer.frequency_df = analyzer._create_gap_frequency_df(analyzer.gap_analysis_df)
+
+    return [('_load_data', load_data),
+            ('_encode_tv_id', analyzer._encode_tv_id),
+            ('_merge_tv_counts', lambda: analyzer._merge_tv_counts(analyzer._tv_counts_df())),
+            ('_create_session_id_col', analyzer._create_session_id_col),
+            ('_create_gap_analysis_df', create_gap_analysis_df),
+            ('_create_gap_frequency_df', create_gap_frequency_df),
+            ('categorize_subscription_types', analyzer.categorize_subscription_types)]
+
+
+def peak_rss_mib() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def profile(path: str,
+            service: str,
+            workers: int = 1) -> list:
+    """
+    Run every stage once for wall time and once under tracemalloc for peak memory.
+
+    Returns:
+        list: One dict per stage with 'stage', 'seconds', 'peak_mib' and 'rss_mib'
+            (peak resident set size of the process after the stage).
+    """
+    results = []
+    for name, stage in stages(GapAnalysis(path, service, use_cache=False, workers=workers)):
+        started = time.perf_counter()
+        stage()
+        results.append({'stage': name,
+                         'seconds': round(time.perf_counter() - started, 4),
+                         'rss_mib': round(peak_rss_mib(), 1)})
+
+    for result, (name, stage) in zip(results, stages(GapAnalysis(path, service, use_cache=False, workers=workers))):
+        tracemalloc.start()
+        stage()
+        result['peak_mib'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+        tracemalloc.stop()
+    return results
+
+
+def git_commit() -> dict:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=root,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+    return {'commit': commit, 'dirty': dirty}
+
+
+def compare(report: dict,
+            baseline_path: str):
+    """Print the time and memory ratio of every stage against a previous report."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    previous = {(run['rows'], stage['stage']): stage
+                for run in baseline['runs'] for stage in run['stages']}
+    print(f"\nagainst {baseline.get('commit')} ({baseline_path})")
+    for run in report['runs']:
+        for stage in run['stages']:
+            before = previous.get((run['rows'], stage['stage']))
+            if before is None:
+                continue
+            time_ratio = stage['seconds'] / before['seconds'] if before['seconds'] else float('nan')
+            memory_ratio = stage['peak_mib'] / before['peak_mib'] if before['peak_mib'] else float('nan')
+            print(f"{run['rows']:>12,}  {stage['stage']:<30} time x{time_ratio:6.2f}  memory x{memory_ratio:6.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--service', default='Netflix')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'gap-analysis-benchmarks'))
+    parser.add_argument('--output', help='Result file, defaults to benchmarks/results/stages-<commit>-<time>.json')
+    parser.add_argument('--compare', help='Previous result file to compare against')
+    args = parser.parse_args()
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    report = {'benchmark': 'stages',
+              **git_commit(),
+              'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+              'python': platform.python_version(),
+              'pandas': pd.__version__,
+              'numpy': np.__version__,
+              'machine': platform.machine(),
+              'cpus': os.cpu_count(),
+              'service': args.service,
+              'workers': args.workers,
+              'seed': args.seed,
+              'runs': []}
+
+    for n_rows in args.rows:
+        path = os.path.join(args.data_dir, f'viewing-{n_rows}-{args.seed}.csv')
+        if not os.path.exists(path):
+            print(f'generating {n_rows:,} rows in {path}')
+            write_viewing_csv(path, n_rows, seed=args.seed, realistic=True)
+
+        results = profile(path, args.service, args.workers)
+        report['runs'].append({'rows': n_rows,
+                               'file_bytes': os.path.getsize(path),
+                               'total_seconds': round(sum(stage['seconds'] for stage in results), 4),
+                               'stages': results})
+        print(f'\n{n_rows:,} rows')
+        for stage in results:
+            print(f"  {stage['stage']:<30} {stage['seconds']:9.3f} s  peak {stage['peak_mib']:9.1f} MiB  "
+                  f"RSS {stage['rss_mib']:9.1f} MiB")
+
+    output = args.output
+    if output is None:
+        stamp = datetime.datetime.now(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        output = os.path.join(RESULTS_DIR, f"stages-{report['commit'] or 'unknown'}-{stamp}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'\nresults written to {output}')
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == '__main__':
+    main()
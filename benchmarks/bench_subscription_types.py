@@ -0,0 +1,35 @@
+"""
+Time of the vectorized subscription classifier: the per-TV aggregates and one
+classification. Its equivalence with the per-tv_id loop it replaced is checked in
+tests/test_analysis.py.
+
+Usage:
+    python -m benchmarks.bench_subscription_types --tvs 300000
+"""
+import argparse
+import time
+
+from benchmarks.synthetic import make_frequency_frame
+from source.analysis import classify_subscription_types, tv_gap_aggregates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tvs', type=int, default=300_000)
+    args = parser.parse_args()
+    
+    frequency_df = make_frequency_frame(args.tvs)
+    started = time.perf_counter()
+    aggregates = tv_gap_aggregates(frequency_df)
+    aggregate_time = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    classify_subscription_types(aggregates)
+    classify_time = time.perf_counter() - started
+    
+    print(f'{args.tvs:,} TVs ({len(frequency_df):,} frequency rows)  aggregates {aggregate_time:6.2f} s  '
+          f'classification per threshold pair {classify_time:6.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Time of a threshold sweep: one categorize_subscription_types call per parameter set,
+each recomputing the per-TV aggregates (the previous grid search), against
+sweep_subscription_types on the cumulative gap counts, with a check that both give
+the same class counts.
+
+Usage:
+    python -m benchmarks.bench_sweep --tvs 300000
+"""
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import make_frequency_frame
+from source.analysis import (SUBSCRIPTION_TYPES, classify_subscription_types, cumulative_gap_counts,
+                             sweep_subscription_types, tv_gap_aggregates)
+
+
+def grid_search(frequency_df, ad_gap_cutoffs, ad_thresholds, ad_frequency_thresholds) -> dict:
+    counts = {}
+    for cutoff, threshold, proportion in itertools.product(ad_gap_cutoffs, ad_thresholds, ad_frequency_thresholds):
+        subscription_types = classify_subscription_types(tv_gap_aggregates(frequency_df, cutoff), threshold, proportion)
+        counts[cutoff, threshold, proportion] = subscription_types['subscription_type'].value_counts()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tvs', type=int, default=300_000)
+    parser.add_argument('--check-points', type=int, default=24,
+                        help='parameter sets classified one by one for the equivalence check')
+    args = parser.parse_args()
+
+    frequency_df = make_frequency_frame(args.tvs)
+    ad_gap_cutoffs = [15, 30, 45, 60, 75, 90, 105, 120]
+    ad_thresholds = list(range(1, 11))
+    ad_frequency_thresholds = np.round(np.linspace(0.3, 0.9, 13), 2)
+    n_points = len(ad_gap_cutoffs) * len(ad_thresholds) * len(ad_frequency_thresholds)
+
+    started = time.perf_counter()
+    classify_subscription_types(tv_gap_aggregates(frequency_df))
+    single_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    gap_counts = cumulative_gap_counts(frequency_df, max(ad_gap_cutoffs))
+    counts_time = time.perf_counter() - started
+    started = time.perf_counter()
+    sweep = sweep_subscription_types(gap_counts, ad_gap_cutoffs, ad_thresholds, ad_frequency_thresholds)
+    sweep_time = time.perf_counter() - started
+
+    check = [ad_gap_cutoffs[::3], ad_thresholds[::4], ad_frequency_thresholds[::6]]
+    started = time.perf_counter()
+    expected = grid_search(frequency_df, *check)
+    grid_time = (time.perf_counter() - started) / len(expected) * n_points
+
+    sweep = sweep.set_index(['ad_gap_cutoff', 'ad_threshold', 'ad_frequency_threshold', 'subscription_type'])['tvs']
+    for (cutoff, threshold, proportion), value_counts in expected.items():
+        for subscription_type in SUBSCRIPTION_TYPES:
+            assert sweep[cutoff, threshold, proportion, subscription_type] == value_counts.get(subscription_type, 0)
+    print(f'class counts match on {len(expected)} parameter sets')
+
+    print(f'{args.tvs:,} TVs ({len(frequency_df):,} frequency rows), {n_points:,} parameter sets')
+    print(f'{"single classification":>30}  {single_time:8.3f} s')
+    print(f'{"grid search (extrapolated)":>30}  {grid_time:8.3f} s')
+    print(f'{"sweep":>30}  {counts_time + sweep_time:8.3f} s  '
+          f'(cumulative counts {counts_time:.3f} s, classification {sweep_time:.3f} s)')
+
+
+if __name__ == '__main__':
+    main()
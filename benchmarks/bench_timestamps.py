@@ -0,0 +1,43 @@
+"""
+Microbenchmark of the fixed-width UTC timestamp parser against the previous
+str.strip() + format-inferring pd.to_datetime path.
+
+Usage:
+    python -m benchmarks.bench_timestamps --rows 10000000
+"""
+import argparse
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import format_utc_timestamps
+from source.timestamps import parse_utc_timestamps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    args = parser.parse_args()
+    
+    rng = np.random.default_rng(0)
+    column = pd.Series(format_utc_timestamps(rng.integers(1_640_995_200, 1_704_067_200, args.rows)).astype(object))
+    
+    started = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        expected = pd.to_datetime(column.str.strip())
+    general = time.perf_counter() - started
+    
+    started = time.perf_counter()
+    parsed, n_fallback = parse_utc_timestamps(column)
+    fixed = time.perf_counter() - started
+    
+    pd.testing.assert_series_equal(parsed, expected)
+    print(f'{args.rows:,} timestamps  general parser {general:8.2f} s  '
+          f'fixed-width {fixed:8.2f} s  speedup {general / fixed:6.1f}x  fallback rows {n_fallback}')
+
+
+if __name__ == '__main__':
+    main()
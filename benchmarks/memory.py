@@ -0,0 +1,23 @@
+import resource
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of the current process in MB.
+    
+    VmHWM is read from /proc where available: unlike ru_maxrss, which Linux carries
+    over from the parent through fork and exec, it starts over in a new program, so a
+    child interpreter started by a benchmark reports its own peak.
+    
+    Returns:
+        float: Peak RSS in MB.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
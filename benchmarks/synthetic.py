@@ -0,0 +1,259 @@
+import numpy as np
+import pandas as pd
+
+
+def format_utc_timestamps(epoch_seconds: np.ndarray) -> np.ndarray:
+    """
+    Format epoch seconds as 'YYYY-MM-DD HH:MM:SS UTC' strings, as found in data.csv.
+    
+    Args:
+        epoch_seconds (np.ndarray): Integer seconds since the epoch.
+        
+    Returns:
+        np.ndarray: Array of fixed-width timestamp strings.
+    """
+    iso = np.datetime_as_string(epoch_seconds.astype('datetime64[s]'), unit='s')
+    chars = iso.view(np.uint32).reshape(len(iso), -1).copy()
+    chars[:, 10] = ord(' ')
+    return np.char.add(chars.view(iso.dtype).ravel(), ' UTC')
+
+
+def make_tv_ids(rng: np.random.Generator,
+                n_tvs: int) -> np.ndarray:
+    """
+    Generate random 40-character hexadecimal TV identifiers, like the SHA-1 tv_ids of data.csv.
+    
+    Args:
+        rng (np.random.Generator): Random generator.
+        n_tvs (int): Number of identifiers.
+        
+    Returns:
+        np.ndarray: Object array of identifiers.
+    """
+    digits = rng.integers(0, 256, (n_tvs, 20), dtype=np.uint8)
+    return np.array([row.tobytes().hex() for row in digits], dtype=object)
+
+
+def make_viewing_frame(n_rows: int,
+                       rows_per_tv: int = 20,
+                       contents_per_tv: int = 4,
+                       applications: list | None = None,
+                       seed: int = 0) -> pd.DataFrame:
+    """
+    Generate a session-level frame with the columns used by the gap analysis.
+    
+    Every TV watches a handful of contents; sessions are spread over two years and
+    start times are left as strings, like the raw CSV.
+    
+    Args:
+        n_rows (int): Number of session rows to generate.
+        rows_per_tv (int, optional): Average number of sessions per TV. Defaults to 20.
+        contents_per_tv (int, optional): Number of distinct contents per TV. Defaults to 4.
+        applications (list, optional): Application names assigned uniformly to the rows.
+                                       Defaults to ['Netflix'].
+        seed (int, optional): Seed for the random generator. Defaults to 0.
+        
+    Returns:
+        pd.DataFrame: Frame with 'tv_content_id', 'tv_id', 'content_id', 'application',
+                     'start_time', 'end_time', 'duration', 'title' and 'season_id'.
+    """
+    rng = np.random.default_rng(seed)
+    applications = np.array(applications or ['Netflix'], dtype=object)
+    n_tvs = max(1, n_rows // rows_per_tv)
+    
+    tv_ids = make_tv_ids(rng, n_tvs)
+    tv_codes = rng.integers(0, n_tvs, n_rows)
+    content_id = tv_codes * contents_per_tv + rng.integers(0, contents_per_tv, n_rows)
+    
+    start = rng.integers(1_640_995_200, 1_704_067_200, n_rows)
+    duration = rng.integers(30, 4 * 3600, n_rows)
+    
+    df = pd.DataFrame({
+        'tv_id': tv_ids[tv_codes],
+        'content_id': content_id,
+        'application': applications[rng.integers(0, len(applications), n_rows)],
+        'start_time': format_utc_timestamps(start).astype(object),
+        'end_time': format_utc_timestamps(start + duration).astype(object),
+        'duration': duration,
+        'title': np.nan,
+        'season_id': np.nan,
+    })
+    df['tv_content_id'] = df['tv_id'].astype(str) + '_' + df['content_id'].astype(str)
+    return df
+
+
+# rough shares of viewing sessions per application
+APPLICATION_SHARES = {
+    'YouTube': 0.30,
+    'Netflix': 0.22,
+    'Hulu': 0.10,
+    'Amazon Prime Video': 0.09,
+    'Disney+': 0.07,
+    'Max': 0.05,
+    'Peacock': 0.04,
+    'Paramount+': 0.04,
+    'Tubi': 0.03,
+    'Pluto TV': 0.03,
+    'Roku Channel': 0.02,
+    'Apple TV+': 0.01,
+}
+
+
+def make_realistic_viewing_frame(n_rows: int,
+                                 rows_per_tv: int = 20,
+                                 contents_per_tv: int = 4,
+                                 application_shares: dict | None = None,
+                                 ad_supported_share: float = 0.4,
+                                 seed: int = 0) -> pd.DataFrame:
+    """
+    Generate a session-level frame with realistic viewing patterns.
+    
+    Sessions per TV are heavy-tailed (lognormal TV activity), every TV mostly uses
+    one application drawn from application_shares, and consecutive viewings of the
+    same content are separated by ad-like gaps (up to 60 seconds) mostly on
+    ad-supported TVs and by long gaps otherwise. Rows are shuffled like a raw log.
+    
+    Args:
+        n_rows (int): Number of session rows to generate.
+        rows_per_tv (int, optional): Average number of sessions per TV. Defaults to 20.
+        contents_per_tv (int, optional): Number of distinct contents per TV. Defaults to 4.
+        application_shares (dict, optional): Share of sessions per application.
+                                             Defaults to APPLICATION_SHARES.
+        ad_supported_share (float, optional): Share of ad-supported TVs. Defaults to 0.4.
+        seed (int, optional): Seed for the random generator. Defaults to 0.
+        
+    Returns:
+        pd.DataFrame: Frame with the same columns as make_viewing_frame.
+    """
+    rng = np.random.default_rng(seed)
+    application_shares = application_shares or APPLICATION_SHARES
+    applications = np.array(list(application_shares), dtype=object)
+    shares = np.array(list(application_shares.values()), dtype=float)
+    shares /= shares.sum()
+    n_tvs = max(1, n_rows // rows_per_tv)
+    
+    tv_ids = make_tv_ids(rng, n_tvs)
+    activity = rng.lognormal(0, 1, n_tvs)
+    tv_codes = np.sort(rng.choice(n_tvs, n_rows, p=activity / activity.sum()))
+    content_id = tv_codes * contents_per_tv + rng.integers(0, contents_per_tv, n_rows)
+    
+    # a TV mostly streams from its main application
+    tv_application = rng.choice(len(applications), n_tvs, p=shares)
+    application = np.where(rng.random(n_rows) < 0.9,
+                           tv_application[tv_codes],
+                           rng.choice(len(applications), n_rows, p=shares))
+    
+    # sessions of the same content follow each other, separated by ad breaks or long pauses
+    order = np.argsort(content_id, kind='stable')
+    content_id = content_id[order]
+    tv_codes = tv_codes[order]
+    first = np.concatenate([[True], content_id[1:] != content_id[:-1]])
+    ad_supported = rng.random(n_tvs) < ad_supported_share
+    is_ad_gap = rng.random(n_rows) < np.where(ad_supported[tv_codes], 0.75, 0.1)
+    gap = np.where(is_ad_gap,
+                   rng.integers(0, 61, n_rows),
+                   rng.exponential(6 * 3600, n_rows).astype(np.int64) + 61)
+    duration = np.clip(rng.lognormal(7, 1, n_rows).astype(np.int64), 30, 4 * 3600)
+    
+    step = np.where(first, rng.integers(1_640_995_200, 1_704_067_200, n_rows), 0)
+    step[1:] += np.where(first[1:], 0, duration[:-1] + gap[1:])
+    cumulative = np.cumsum(step)
+    start = cumulative - np.maximum.accumulate(np.where(first, cumulative - step, 0))
+    
+    shuffle = rng.permutation(n_rows)
+    df = pd.DataFrame({
+        'tv_id': tv_ids[tv_codes[shuffle]],
+        'content_id': content_id[shuffle],
+        'application': applications[application[order][shuffle]],
+        'start_time': format_utc_timestamps(start[shuffle]).astype(object),
+        'end_time': format_utc_timestamps(start[shuffle] + duration[shuffle]).astype(object),
+        'duration': duration[shuffle],
+        'title': np.nan,
+        'season_id': np.nan,
+    })
+    df['tv_content_id'] = df['tv_id'].astype(str) + '_' + df['content_id'].astype(str)
+    return df
+
+
+DATA_COLUMNS = ['tv_id', 'content_id', 'application', 'network', 'network_id',
+                'scheduled_program_start_time', 'scheduled_program_end_time', 'affiliate_call_sign',
+                'channel_content_offset_s', 'program_content_offset_s', 'dma', 'zip', 'start_time',
+                'end_time', 'duration', 'time_period', 'title_norm', 'episode_title', 'season',
+                'episode', 'release_date', 'title', 'title_id', 'season_id', 'service',
+                'content_type', 'exclude_title', 'is_exclusive']
+
+
+def write_viewing_csv(path: str,
+                      n_rows: int,
+                      chunk_rows: int = 1_000_000,
+                      applications: list | None = None,
+                      seed: int = 0,
+                      realistic: bool = False):
+    """
+    Write a CSV file with the 28 columns of data.csv, generated chunk by chunk.
+    
+    Each chunk is generated independently, so with realistic the TVs of a chunk do
+    not reappear in later chunks.
+    
+    Args:
+        path (str): Destination path.
+        n_rows (int): Number of rows to write.
+        chunk_rows (int, optional): Rows generated per chunk. Defaults to 1,000,000.
+        applications (list, optional): Application names assigned uniformly to the rows.
+                                       Defaults to ['Netflix', 'Hulu', 'YouTube', 'Amazon Prime Video'].
+        seed (int, optional): Seed for the random generator. Defaults to 0.
+        realistic (bool, optional): Use make_realistic_viewing_frame, with applications
+                                    weighted by APPLICATION_SHARES (or uniformly when
+                                    applications is given). Defaults to False.
+    """
+    default_applications = applications is None
+    applications = applications or ['Netflix', 'Hulu', 'YouTube', 'Amazon Prime Video']
+    written = 0
+    chunk_index = 0
+    while written < n_rows:
+        size = min(chunk_rows, n_rows - written)
+        if realistic:
+            shares = APPLICATION_SHARES if default_applications else dict.fromkeys(applications, 1.0)
+            chunk = make_realistic_viewing_frame(size, application_shares=shares, seed=seed + chunk_index)
+        else:
+            chunk = make_viewing_frame(size, applications=applications, seed=seed + chunk_index)
+        rng = np.random.default_rng(seed + chunk_index)
+        
+        chunk['network'] = chunk['application']
+        chunk['service'] = chunk['application']
+        chunk['dma'] = rng.integers(500, 882, size)
+        chunk['zip'] = np.char.zfill(rng.integers(1000, 99951, size).astype(str), 5)
+        chunk['time_period'] = chunk['start_time'].str[:7]
+        chunk = chunk.reindex(columns=DATA_COLUMNS)
+        
+        chunk.to_csv(path, mode='w' if chunk_index == 0 else 'a', header=chunk_index == 0, index=False)
+        written += size
+        chunk_index += 1
+
+
+def make_frequency_frame(n_tvs: int,
+                         seed: int = 0) -> pd.DataFrame:
+    """
+    Generate a gap frequency table shaped like GapAnalysis.frequency_df.
+    
+    Every TV draws six gap ranges on average, geometrically distributed over the
+    15-second ranges up to range 400.
+    
+    Args:
+        n_tvs (int): Number of TVs.
+        seed (int, optional): Seed for the random generator. Defaults to 0.
+        
+    Returns:
+        pd.DataFrame: Frame with 'tv_id', 'gap_range' (ordered categorical) and
+                     'frequency', sorted by tv_id and range.
+    """
+    rng = np.random.default_rng(seed)
+    n_rows = n_tvs * 6
+    tv_ids = np.array([f'{value:040x}' for value in rng.integers(0, 2**63, n_tvs)], dtype=object)
+    bins = np.minimum(rng.geometric(0.15, n_rows) - 1, 400)
+    labels = [f'{15 * i}-{15 * (i + 1)}' for i in range(401)]
+    
+    df = pd.DataFrame({'tv_id': tv_ids[rng.integers(0, n_tvs, n_rows)], 'bin': bins})
+    df = df.groupby(['tv_id', 'bin']).size().reset_index(name='frequency')
+    df['gap_range'] = pd.Categorical.from_codes(df['bin'], categories=labels, ordered=True)
+    return df[['tv_id', 'gap_range', 'frequency']]
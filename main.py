@@ -1,24 +1,40 @@
 from source.analysis import GapAnalysis
+from source.instrumentation import StageProfiler
+from source.loading import format_timestamps
+from source.outputs import OutputWriter
+from source.services import build_alias_index
 
 
+# for many data files and services: python -m source.runner './data/*.csv' --services Netflix Hulu
 if __name__ == "__main__":
     path = './data/data.csv'
     output_path = './output/'
+    # 'csv', 'csv.zst' (needs zstandard) or 'parquet' (needs pyarrow)
+    output_format = 'csv'
     streaming_services_list = ['Netflix', 'Hulu']
-    for streaming_service in streaming_services_list:
-        print(f'Analyzing data for {streaming_service}...')
-        gap_instance = GapAnalysis(path_to_data=path,
-                                   streaming_service=streaming_service)
-        
-        gap_instance.df.to_csv(f'{output_path}{streaming_service}_data.csv', index=False)
-        
-        
-        gap_instance.gap_analysis_df.to_csv(f'{output_path}{streaming_service}_gap_analysis.csv', index=False)
-        
-        
-        gap_instance.frequency_df.to_csv(f'{output_path}{streaming_service}_frequency_analysis.csv', index=False)
-        
-        
-        subscription_types = gap_instance.categorize_subscription_types()
-        subscription_types.to_csv(f'{output_path}{streaming_service}_subscription_types.csv', index=False)
-        print(subscription_types.head())
+    # case variants such as 'NETFLIX' are analyzed under the canonical service name
+    alias_index = build_alias_index(streaming_services_list)
+    profiler = StageProfiler()
+    gap_instances = GapAnalysis.for_services(path_to_data=path,
+                                             streaming_services=streaming_services_list,
+                                             profiler=profiler,
+                                             alias_index=alias_index)
+    with OutputWriter(output_path, output_format=output_format) as writer:
+        for streaming_service, gap_instance in gap_instances.items():
+            print(f'Analyzing data for {streaming_service}...')
+            
+            writer.submit(f'{streaming_service}_data', format_timestamps(gap_instance.df))
+            
+            
+            writer.submit(f'{streaming_service}_gap_analysis', gap_instance.gap_analysis_df)
+            
+            
+            writer.submit(f'{streaming_service}_frequency_analysis', gap_instance.frequency_df)
+            
+            
+            subscription_types = gap_instance.categorize_subscription_types()
+            writer.submit(f'{streaming_service}_subscription_types', subscription_types)
+            print(subscription_types.head())
+            gap_instance.release()
+    
+    profiler.to_json('./logs/analysis_stages.json')
@@ -1,10 +1,528 @@
-import os
-import warnings
+from collections import OrderedDict
+import numpy as np
 import pandas as pd 
+from source.instrumentation import NULL_PROFILER, StageProfiler
+from source.loading import (DEFAULT_CHUNKSIZE, PIPELINE_COLUMNS, _check_csv_path, canonical_services, parse_timestamps,
+                            load_viewing_data)
+from source.parallel import parallel_session_gaps
+
+# ad-like gaps (less than 60 seconds) based on google search for ads' time on netflix or hulu
+AD_GAP_CUTOFF_SECONDS = 60
+
+# width of the gap ranges in the frequency analysis
+GAP_BIN_SECONDS = 15
+
+GAP_ANALYSIS_COLUMNS = ['tv_content_id', 'tv_id', 'content_id', 'start_time', 'end_time', 'duration', 'title', 'season_id']
+
+# columns compute_session_gaps needs, enough for the frequency analysis
+SESSION_GAP_COLUMNS = ['tv_content_id', 'tv_id', 'start_time', 'end_time']
+
+# intermediates of GapAnalysis that are built on first access and can be released
+LAZY_FRAMES = ('df', 'gap_analysis_df', 'frequency_df')
+
+# per-TV aggregates kept by every GapAnalysis, one entry per ad gap cutoff (least recently used dropped)
+AGGREGATE_CACHE_SIZE = 8
+
+SUBSCRIPTION_TYPES = ('ad_supported', 'ad_free', 'mixed_or_uncertain', 'insufficient_data')
+
+
+def content_id_labels(content_id: pd.Series) -> np.ndarray:
+    """
+    Content ids as label strings, independent of the dtype the file was read with.
+    
+    A file with missing content ids reads the column as floats; their integral values
+    are written without the '.0', so a session gets the same label from every file.
+    
+    Args:
+        content_id (pd.Series): Content identifiers.
+        
+    Returns:
+        np.ndarray: Object array of label strings.
+    """
+    labels = content_id.astype(str).to_numpy(dtype=object)
+    if pd.api.types.is_float_dtype(content_id):
+        values = content_id.to_numpy()
+        integral = np.isfinite(values) & (values == np.round(values))
+        labels[integral] = values[integral].astype(np.int64).astype(str)
+    return labels
+
+
+def encode_session_keys(tv_id: pd.Series,
+                        content_id: pd.Series) -> pd.Categorical:
+    """
+    Encode (tv_id, content_id) pairs as a categorical of 'tv_id_content_id' labels.
+    
+    Pairs are factorized on integer codes and the label strings are only built once
+    per distinct pair, instead of concatenating two strings on every row.
+    
+    Args:
+        tv_id (pd.Series): TV identifiers (plain or categorical).
+        content_id (pd.Series): Content identifiers, aligned with tv_id.
+        
+    Returns:
+        pd.Categorical: Session key of every row, with the same labels as
+            tv_id.astype(str) + '_' + content_id.astype(str).
+    """
+    tv_codes, tv_uniques = pd.factorize(tv_id, use_na_sentinel=False)
+    content_codes, content_uniques = pd.factorize(content_id, use_na_sentinel=False)
+    
+    pair_codes, pairs = pd.factorize(tv_codes.astype(np.int64) * max(len(content_uniques), 1) + content_codes)
+    tv_labels = pd.Series(tv_uniques).astype(str).to_numpy(dtype=object)
+    content_labels = pd.Series(content_uniques).astype(str).to_numpy(dtype=object)
+    labels = (tv_labels[pairs // max(len(content_uniques), 1)] + '_'
+              + content_labels[pairs % max(len(content_uniques), 1)])
+    
+    # distinct pairs can still share a label when the ids themselves contain '_'
+    label_codes, label_uniques = pd.factorize(labels)
+    return pd.Categorical.from_codes(label_codes[pair_codes], categories=label_uniques)
+
+
+def sorted_session_gaps(session_codes: np.ndarray,
+                         start_ns: np.ndarray,
+                         end_ns: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Order rows by (session, start time) and compute the gap to the previous row of each session.
+    
+    All inputs are aligned int64 arrays. Missing timestamps are encoded as the int64
+    NaT sentinel and sort after every valid start time, as missing values do in
+    ``sort_values``.
+    
+    Args:
+        session_codes (np.ndarray): Integer session code of each row.
+        start_ns (np.ndarray): Session start times as nanoseconds since the epoch.
+        end_ns (np.ndarray): Session end times as nanoseconds since the epoch.
+        
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Row positions in output order and the gap in
+            nanoseconds for each of those rows (NaT sentinel for the first row of a
+            session or when either timestamp is missing).
+    """
+    nat = np.iinfo(np.int64).min
+    start_key = np.where(start_ns == nat, np.iinfo(np.int64).max, start_ns)
+    order = np.lexsort((start_key, session_codes))
+    
+    codes_sorted = session_codes[order]
+    start_sorted = start_ns[order]
+    previous_end = np.empty_like(start_sorted)
+    previous_end[0:1] = nat
+    previous_end[1:] = end_ns[order][:-1]
+    
+    first_of_session = np.ones(len(order), dtype=bool)
+    first_of_session[1:] = codes_sorted[1:] != codes_sorted[:-1]
+    missing = first_of_session | (start_sorted == nat) | (previous_end == nat)
+    
+    gap_ns = np.where(missing, nat, start_sorted - previous_end)
+    return order, gap_ns
+
+
+def compute_session_gaps(df: pd.DataFrame,
+                         workers: int = 1,
+                         columns=GAP_ANALYSIS_COLUMNS) -> pd.DataFrame:
+    """
+    Compute the time gaps between consecutive viewing sessions of every TV-content pair.
+    
+    Timestamps are parsed once for the whole frame and the gaps are computed with a
+    single sort on (session, start time) followed by a shift over int64 epoch arrays,
+    instead of filtering and re-parsing a sub-frame per session. With more than one
+    worker the sort and shift run in worker processes on partitions by 'tv_id'
+    (see parallel_session_gaps); the result is the same.
+    
+    Session keys, gap frequencies and subscription types stay in the calling process:
+    each is one vectorized pass taking a few tenths of a second on 2M rows, the same
+    order as starting the pool and copying the columns into shared memory.
+    
+    Args:
+        df (pd.DataFrame): Session-level data containing the columns in
+                           GAP_ANALYSIS_COLUMNS.
+        workers (int, optional): Number of worker processes. Defaults to 1 (in process).
+        columns (list, optional): Columns kept in the result, they must include
+                                  SESSION_GAP_COLUMNS. Defaults to GAP_ANALYSIS_COLUMNS.
+        
+    Returns:
+        pd.DataFrame: Rows of sessions with more than one viewing, grouped by
+                     'tv_content_id' in order of first appearance and sorted by start
+                     time, with 'gap_vs_previous_session' and 'gap_seconds' columns.
+    """
+    frame = df[list(columns)]
+    
+    codes, _ = pd.factorize(frame['tv_content_id'])
+    sizes = np.bincount(codes[codes >= 0])
+    keep = codes >= 0
+    keep[keep] = sizes[codes[keep]] > 1
+    
+    frame = frame[keep]
+    codes = codes[keep]
+    start_time = parse_timestamps(frame['start_time'])
+    end_time = parse_timestamps(frame['end_time'])
+    
+    start_ns = start_time.to_numpy(dtype='datetime64[ns]').view('i8')
+    end_ns = end_time.to_numpy(dtype='datetime64[ns]').view('i8')
+    if len(frame) == 0:
+        order = np.empty(0, dtype=np.intp)
+        gap_ns = np.empty(0, dtype=np.int64)
+    elif workers > 1:
+        tv_codes, _ = pd.factorize(frame['tv_id'])
+        order, gap_ns = parallel_session_gaps(sorted_session_gaps, codes.astype(np.int64),
+                                              tv_codes.astype(np.int64), start_ns, end_ns, workers)
+    else:
+        order, gap_ns = sorted_session_gaps(codes.astype(np.int64), start_ns, end_ns)
+    
+    gap_analysis_df = frame.take(order).reset_index(drop=True)
+    gap_analysis_df['start_time'] = start_time.take(order).reset_index(drop=True)
+    gap_analysis_df['end_time'] = end_time.take(order).reset_index(drop=True)
+    gap_analysis_df['gap_vs_previous_session'] = pd.to_timedelta(gap_ns, unit='ns')
+    gap_analysis_df['gap_seconds'] = gap_analysis_df['gap_vs_previous_session'].dt.total_seconds()
+    return gap_analysis_df
+
+
+def _check_gap_tail(tail_start,
+                    tail_scale: str):
+    """
+    Validate the tail options of the gap histogram.
+    
+    Raises:
+        ValueError: If tail_start is not a positive multiple of GAP_BIN_SECONDS or
+            tail_scale is not 'cap' or 'log'.
+    """
+    if tail_start is not None and (tail_start <= 0 or tail_start % GAP_BIN_SECONDS):
+        raise ValueError(f"tail_start must be a positive multiple of {GAP_BIN_SECONDS} seconds.")
+    if tail_scale not in ('cap', 'log'):
+        raise ValueError("tail_scale must be 'cap' or 'log'.")
+
+
+def gap_bin_index(gap_seconds: np.ndarray,
+                  tail_start: int | None = None,
+                  tail_scale: str = 'cap') -> np.ndarray:
+    """
+    Map non-negative gaps to integer gap range indexes by floor division.
+    
+    Ranges are GAP_BIN_SECONDS wide. From tail_start on, gaps either share one
+    open-ended range ('cap') or fall in ranges that double in width ('log').
+    
+    Args:
+        gap_seconds (np.ndarray): Non-negative gaps in seconds.
+        tail_start (int, optional): First second of the tail, a multiple of
+                                    GAP_BIN_SECONDS. Defaults to None (no tail).
+        tail_scale (str, optional): 'cap' or 'log'. Defaults to 'cap'.
+        
+    Returns:
+        np.ndarray: Gap range index of every gap.
+    """
+    bins = np.floor_divide(gap_seconds, GAP_BIN_SECONDS).astype(np.int64)
+    if tail_start is None:
+        return bins
+    
+    regular = tail_start // GAP_BIN_SECONDS
+    in_tail = bins >= regular
+    if tail_scale == 'cap':
+        return np.where(in_tail, regular, bins)
+    with np.errstate(divide='ignore'):
+        doublings = np.floor(np.log2(np.maximum(gap_seconds, tail_start) / tail_start)).astype(np.int64)
+    return np.where(in_tail, regular + doublings, bins)
+
+
+def gap_range_labels(bins: np.ndarray,
+                     tail_start: int | None = None,
+                     tail_scale: str = 'cap') -> list:
+    """
+    Format 'lower-upper' labels for gap range indexes (see gap_bin_index).
+    
+    Args:
+        bins (np.ndarray): Gap range indexes.
+        tail_start (int, optional): First second of the tail. Defaults to None (no tail).
+        tail_scale (str, optional): 'cap' or 'log'. Defaults to 'cap'.
+        
+    Returns:
+        list: One label per index, e.g. '15-30', or '3600-inf' for a capped tail.
+    """
+    regular = None if tail_start is None else tail_start // GAP_BIN_SECONDS
+    labels = []
+    for gap_bin in bins.tolist():
+        if regular is None or gap_bin < regular:
+            labels.append(f"{gap_bin * GAP_BIN_SECONDS}-{(gap_bin + 1) * GAP_BIN_SECONDS}")
+        elif tail_scale == 'cap':
+            labels.append(f"{tail_start}-inf")
+        else:
+            lower = tail_start * 2 ** (gap_bin - regular)
+            labels.append(f"{lower}-{2 * lower}")
+    return labels
+
+
+def gap_frequency_table(tv_id: pd.Series,
+                        gap_seconds: pd.Series,
+                        tail_start: int | None = None,
+                        tail_scale: str = 'cap') -> pd.DataFrame:
+    """
+    Count gaps per TV and gap range.
+    
+    Gap ranges are integer indexes from floor division and the counts are a sparse
+    (tv_id, range) aggregation, so time and memory do not depend on the largest gap.
+    Labels are only formatted for the ranges that occur.
+    
+    Args:
+        tv_id (pd.Series): TV identifier of every gap.
+        gap_seconds (pd.Series): Gaps in seconds; missing and negative gaps are ignored.
+        tail_start (int, optional): First second of the tail. Defaults to None (no tail).
+        tail_scale (str, optional): 'cap' or 'log'. Defaults to 'cap'.
+        
+    Returns:
+        pd.DataFrame: 'tv_id', 'gap_range' (ordered categorical) and 'frequency',
+            sorted by TV and range.
+    """
+    _check_gap_tail(tail_start, tail_scale)
+    valid = (gap_seconds >= 0).to_numpy()
+    # tv_id stays categorical, so the groupby runs on its codes rather than on the id strings
+    counts = (pd.DataFrame({'tv_id': tv_id[valid].reset_index(drop=True),
+                            'gap_bin': gap_bin_index(gap_seconds[valid].to_numpy(), tail_start, tail_scale)})
+              .groupby(['tv_id', 'gap_bin'], observed=True)
+              .size())
+    
+    frequency_df = counts.reset_index(name='frequency')
+    gap_bins = frequency_df.pop('gap_bin').to_numpy()
+    observed = np.unique(gap_bins)
+    frequency_df.insert(1, 'gap_range', pd.Categorical.from_codes(np.searchsorted(observed, gap_bins),
+                                                                  categories=gap_range_labels(observed, tail_start, tail_scale),
+                                                                  ordered=True))
+    return frequency_df
+
+
+def _gap_range_upper_bounds(gap_range: pd.Series) -> np.ndarray:
+    """
+    Return the numeric upper bound of every gap range label (e.g. '0-15' -> 15, '3600-inf' -> inf).
+    
+    Labels are parsed once per distinct range through the categorical codes instead of
+    once per row.
+    
+    Args:
+        gap_range (pd.Series): Column of 'lower-upper' gap range labels.
+        
+    Returns:
+        np.ndarray: Upper bound of each row's range.
+    """
+    gap_range = gap_range.astype('category')
+    bounds = np.array([float(str(label).split('-')[1]) for label in gap_range.cat.categories])
+    return bounds[gap_range.cat.codes.to_numpy()]
+
+
+def tv_gap_aggregates(frequency_df: pd.DataFrame,
+                      ad_gap_cutoff: int = AD_GAP_CUTOFF_SECONDS) -> pd.DataFrame:
+    """
+    Aggregate the gap frequency table into per-TV totals used for classification.
+    
+    Args:
+        frequency_df (pd.DataFrame): Gap frequencies with 'tv_id', 'gap_range' and 'frequency'.
+        ad_gap_cutoff (int, optional): Gap ranges whose upper bound is at most this many
+                                       seconds count as ad-like. Defaults to AD_GAP_CUTOFF_SECONDS.
+        
+    Returns:
+        pd.DataFrame: One row per TV in order of first appearance, with 'tv_id',
+            'total_gaps', 'ad_like_gaps', 'long_gaps' and 'most_common_ranges' (the three
+            most frequent ranges, ties broken by table order).
+    """
+    frequency = frequency_df['frequency'].to_numpy()
+    tv_codes, tv_ids = pd.factorize(frequency_df['tv_id'])
+    is_ad_gap = _gap_range_upper_bounds(frequency_df['gap_range']) <= ad_gap_cutoff
+    
+    n_tvs = len(tv_ids)
+    total_gaps = np.bincount(tv_codes, weights=frequency, minlength=n_tvs).astype(frequency.dtype)
+    ad_like_gaps = np.bincount(tv_codes, weights=frequency * is_ad_gap, minlength=n_tvs).astype(frequency.dtype)
+    
+    # one sort by (tv, frequency desc, table position) gives nlargest(3) for every TV
+    order = np.lexsort((np.arange(len(frequency)), -frequency, tv_codes))
+    sorted_codes = tv_codes[order]
+    rank = np.arange(len(order)) - np.searchsorted(sorted_codes, sorted_codes)
+    labels = frequency_df['gap_range'].astype(str).to_numpy()[order]
+    
+    most_common_ranges = np.full(n_tvs, '', dtype=object)
+    for position in range(3):
+        picked = rank == position
+        separator = '' if position == 0 else ', '
+        most_common_ranges[sorted_codes[picked]] += separator + labels[picked]
+    
+    return pd.DataFrame({
+        'tv_id': tv_ids,
+        'total_gaps': total_gaps,
+        'ad_like_gaps': ad_like_gaps,
+        'long_gaps': total_gaps - ad_like_gaps,
+        'most_common_ranges': most_common_ranges,
+    })
+
+
+def classify_subscription_types(aggregates: pd.DataFrame,
+                                ad_threshold=3,
+                                ad_frequency_threshold=0.6) -> pd.DataFrame:
+    """
+    Classify TVs from their gap aggregates (see tv_gap_aggregates).
+    
+    Args:
+        aggregates (pd.DataFrame): Per-TV gap aggregates.
+        ad_threshold (int, optional): Minimum number of ad-like gaps required 
+                                    for ad-supported classification. Defaults to 3.
+        ad_frequency_threshold (float, optional): Minimum proportion of ad-like gaps 
+                                                for ad-supported classification. Defaults to 0.6.
+        
+    Returns:
+        pd.DataFrame: Subscription types, see GapAnalysis.categorize_subscription_types.
+    """
+    if aggregates.empty:
+        return pd.DataFrame()
+    
+    total_gaps = aggregates['total_gaps'].to_numpy()
+    ad_gaps = aggregates['ad_like_gaps'].to_numpy()
+    long_gaps = aggregates['long_gaps'].to_numpy()
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ad_gap_proportion = np.where(total_gaps > 0, ad_gaps / total_gaps, 0)
+    
+    subscription_type = np.select(
+        [total_gaps == 0,
+         (ad_gaps >= ad_threshold) & (ad_gap_proportion >= ad_frequency_threshold),
+         # long gaps, likely natural breaks
+         (ad_gap_proportion < 0.3) & (long_gaps > ad_gaps),
+         ad_gaps < 2],
+        ['insufficient_data', 'ad_supported', 'ad_free', 'ad_free'],
+        default='mixed_or_uncertain')
+    
+    return pd.DataFrame({
+        'tv_id': aggregates['tv_id'].to_numpy(),
+        'subscription_type': subscription_type.astype(object),
+        'total_gaps': total_gaps,
+        'ad_like_gaps': ad_gaps,
+        'long_gaps': long_gaps,
+        'ad_gap_proportion': np.round(ad_gap_proportion, 3),
+        'most_common_ranges': aggregates['most_common_ranges'].to_numpy(),
+    })
+
+
+def cumulative_gap_counts(frequency_df: pd.DataFrame,
+                          max_cutoff: float = AD_GAP_CUTOFF_SECONDS) -> tuple:
+    """
+    Count the gaps of every TV cumulatively over the gap ranges, up to max_cutoff.
+    
+    Only the ranges whose upper bound is at most max_cutoff get their own column, so
+    the table stays small however many ranges there are; the number of ad-like gaps for
+    any cutoff up to max_cutoff is then one column of the prefix sum.
+    
+    Args:
+        frequency_df (pd.DataFrame): Gap frequencies with 'tv_id', 'gap_range' and 'frequency'.
+        max_cutoff (float, optional): Largest ad gap cutoff to support, in seconds.
+                                      Defaults to AD_GAP_CUTOFF_SECONDS.
+        
+    Returns:
+        tuple: (tv_ids, upper_bounds, cumulative, max_cutoff). tv_ids (pd.Index) are in
+            order of first appearance, upper_bounds (np.ndarray) are the ascending range
+            upper bounds up to max_cutoff, and cumulative[:, j] (np.ndarray) counts the
+            gaps of every TV in ranges ending at most upper_bounds[j]; the last column
+            holds the total number of gaps.
+    """
+    frequency = frequency_df['frequency'].to_numpy()
+    tv_codes, tv_ids = pd.factorize(frequency_df['tv_id'])
+    upper = _gap_range_upper_bounds(frequency_df['gap_range'])
+    upper_bounds = np.unique(upper[upper <= max_cutoff])
+    
+    # ranges above max_cutoff land in the last column, which becomes the total
+    n_columns = len(upper_bounds) + 1
+    columns = np.searchsorted(upper_bounds, upper)
+    counts = np.bincount(tv_codes * n_columns + columns, weights=frequency,
+                         minlength=len(tv_ids) * n_columns).astype(np.int64)
+    return tv_ids, upper_bounds, np.cumsum(counts.reshape(len(tv_ids), n_columns), axis=1), max_cutoff
+
+
+def _at_least(values: np.ndarray,
+              thresholds: np.ndarray) -> np.ndarray:
+    """Number of sorted thresholds each value reaches (value >= threshold)."""
+    return np.searchsorted(thresholds, values, side='right')
+
+
+def _pair_counts(threshold_hits: np.ndarray,
+                 proportion_hits: np.ndarray,
+                 n_thresholds: int,
+                 n_proportions: int) -> np.ndarray:
+    """
+    Count the rows reaching every (threshold, proportion) pair from the number of
+    thresholds and proportions each row reaches, with a 2-D suffix sum.
+    """
+    histogram = np.bincount(threshold_hits * (n_proportions + 1) + proportion_hits,
+                            minlength=(n_thresholds + 1) * (n_proportions + 1))
+    histogram = histogram.reshape(n_thresholds + 1, n_proportions + 1)
+    reached = histogram[::-1, ::-1].cumsum(axis=0).cumsum(axis=1)[::-1, ::-1]
+    return reached[1:, 1:]
+
+
+def sweep_subscription_types(gap_counts: tuple,
+                             ad_gap_cutoffs=(AD_GAP_CUTOFF_SECONDS,),
+                             ad_thresholds=(3,),
+                             ad_frequency_thresholds=(0.6,)) -> pd.DataFrame:
+    """
+    Count the TVs of every subscription type for a grid of classification parameters.
+    
+    Every combination of cutoff, ad-like gap threshold and proportion threshold is
+    classified as classify_subscription_types would, without building the per-TV
+    tables: for each cutoff the TVs are binned by how many thresholds they reach and
+    a 2-D suffix sum gives the counts of the whole threshold grid at once.
+    
+    Args:
+        gap_counts (tuple): Cumulative gap counts from cumulative_gap_counts, built with a
+                            max_cutoff of at least max(ad_gap_cutoffs).
+        ad_gap_cutoffs (iterable, optional): Ad gap cutoffs in seconds.
+                                             Defaults to (AD_GAP_CUTOFF_SECONDS,).
+        ad_thresholds (iterable, optional): Minimum numbers of ad-like gaps. Defaults to (3,).
+        ad_frequency_thresholds (iterable, optional): Minimum proportions of ad-like gaps.
+                                                      Defaults to (0.6,).
+        
+    Returns:
+        pd.DataFrame: One row per parameter set and subscription type, with
+            'ad_gap_cutoff', 'ad_threshold', 'ad_frequency_threshold',
+            'subscription_type' and 'tvs' (number of TVs), in grid order.
+            
+    Raises:
+        ValueError: If a cutoff is above the max_cutoff of gap_counts.
+    """
+    _, upper_bounds, cumulative, max_cutoff = gap_counts
+    ad_gap_cutoffs = np.asarray(list(ad_gap_cutoffs))
+    if len(ad_gap_cutoffs) and ad_gap_cutoffs.max() > max_cutoff:
+        raise ValueError(f"The gap counts only support ad gap cutoffs up to {max_cutoff} seconds.")
+    ad_thresholds = np.asarray(list(ad_thresholds))
+    ad_frequency_thresholds = np.asarray(list(ad_frequency_thresholds), dtype=float)
+    
+    sorted_thresholds = np.unique(ad_thresholds)
+    sorted_proportions = np.unique(ad_frequency_thresholds)
+    threshold_index = np.searchsorted(sorted_thresholds, ad_thresholds)
+    proportion_index = np.searchsorted(sorted_proportions, ad_frequency_thresholds)
+    
+    total_gaps = cumulative[:, -1]
+    has_gaps = total_gaps > 0
+    total_gaps = total_gaps[has_gaps]
+    n_insufficient = len(has_gaps) - len(total_gaps)
+    
+    counts = []
+    for cutoff in ad_gap_cutoffs:
+        column = np.searchsorted(upper_bounds, cutoff, side='right') - 1
+        ad_gaps = cumulative[has_gaps, column] if column >= 0 else np.zeros(len(total_gaps), dtype=np.int64)
+        long_gaps = total_gaps - ad_gaps
+        ad_gap_proportion = ad_gaps / total_gaps
+        ad_free = ((ad_gap_proportion < 0.3) & (long_gaps > ad_gaps)) | (ad_gaps < 2)
+        
+        threshold_hits = _at_least(ad_gaps, sorted_thresholds)
+        proportion_hits = _at_least(ad_gap_proportion, sorted_proportions)
+        supported = _pair_counts(threshold_hits, proportion_hits, len(sorted_thresholds), len(sorted_proportions))
+        supported_free = _pair_counts(threshold_hits[ad_free], proportion_hits[ad_free],
+                                      len(sorted_thresholds), len(sorted_proportions))
+        
+        supported = supported[threshold_index[:, None], proportion_index[None, :]]
+        free = np.count_nonzero(ad_free) - supported_free[threshold_index[:, None], proportion_index[None, :]]
+        mixed = len(total_gaps) - supported - free
+        insufficient = np.full_like(supported, n_insufficient)
+        counts.append(np.stack([supported, free, mixed, insufficient], axis=-1))
+    
+    counts = np.stack(counts) if counts else np.zeros((0, len(ad_thresholds), len(ad_frequency_thresholds), 4),
+                                                      dtype=np.int64)
+    grid = pd.MultiIndex.from_product([ad_gap_cutoffs, ad_thresholds, ad_frequency_thresholds,
+                                       list(SUBSCRIPTION_TYPES)],
+                                      names=['ad_gap_cutoff', 'ad_threshold', 'ad_frequency_threshold',
+                                             'subscription_type'])
+    return pd.DataFrame({'tvs': counts.ravel()}, index=grid).reset_index()
 
-# just to avoid userwarnings from pandas when dealing with inferred formats
-# in production this should be handled more gracefully
-warnings.filterwarnings("ignore", category=UserWarning)
 
 class GapAnalysis:
     """
@@ -15,11 +533,18 @@ class GapAnalysis:
     categorizes these gaps, and uses gap patterns to infer whether users have
     ad-supported or ad-free subscriptions.
     
+    The intermediate frames are built on first access and cached: constructing an
+    analyzer does not read the data, and a run that only needs subscription types
+    computes the gaps without keeping gap_analysis_df. release() drops cached frames,
+    which are then rebuilt from the data file when accessed again.
+    
     Attributes:
         path_to_data (str): Path to the data file.
         streaming_service (str): Name of the streaming service to analyze.
         application_column (str): Column name containing application data.
         df (pd.DataFrame): Filtered DataFrame containing only the specified streaming service data.
+        loaded_rows (int or None): Rows of the streaming service loaded, before TVs with a
+            single session are dropped from df. None until df is first built.
         gap_analysis_df (pd.DataFrame): DataFrame with calculated gaps between sessions.
         frequency_df (pd.DataFrame): DataFrame with gap frequency analysis.
     
@@ -27,60 +552,354 @@ class GapAnalysis:
         >>> analyzer = GapAnalysis('./data/streaming.csv', 'Netflix')
         >>> subscription_types = analyzer.categorize_subscription_types()
         >>> print(subscription_types.head())
+        
+        Several services can be analyzed from a single read of the file:
+        
+        >>> analyzers = GapAnalysis.for_services('./data/streaming.csv', ['Netflix', 'Hulu'])
+        >>> hulu_types = analyzers['Hulu'].categorize_subscription_types()
     """
     
     def __init__(self, 
                  path_to_data: str,
                  streaming_service: str,
-                 application_column: str = 'application'):
+                 application_column: str = 'application',
+                 data: pd.DataFrame | None = None,
+                 columns=PIPELINE_COLUMNS,
+                 chunksize: int = DEFAULT_CHUNKSIZE,
+                 use_cache: bool = True,
+                 cache_dir: str | None = None,
+                 workers: int = 1,
+                 tail_start: int | None = None,
+                 tail_scale: str = 'cap',
+                 profiler: StageProfiler | None = None,
+                 alias_index: dict | None = None,
+                 verify_hash: bool = False):
         """
-        Initialize the GapAnalysis with data loading and preprocessing.
+        Initialize the GapAnalysis settings; the data is loaded and processed on first access.
         
         Args:
             path_to_data (str): Path to the CSV file containing streaming data.
             streaming_service (str): Name of the streaming service to filter and analyze.
             application_column (str, optional): Column name containing application data. 
                                               Defaults to 'application'.
+            data (pd.DataFrame, optional): Rows already loaded and filtered for
+                                           streaming_service. When given the file is not
+                                           read again (unless df is released). Defaults to None.
+            columns (list, optional): Columns read from the file, None reads every column.
+                                      Defaults to PIPELINE_COLUMNS.
+            chunksize (int, optional): Number of rows parsed at a time while loading.
+                                       Defaults to DEFAULT_CHUNKSIZE.
+            use_cache (bool, optional): Read from and populate the columnar cache of the
+                                        file (needs pyarrow). Defaults to True.
+            cache_dir (str, optional): Cache root. Defaults to a '.cache' folder next to
+                                       the data file.
+            workers (int, optional): Worker processes for the session gap stage, rows are
+                                     partitioned by tv_id. Defaults to 1 (serial).
+            tail_start (int, optional): Gaps of at least this many seconds (a multiple of
+                                        15) go to tail ranges instead of 15-second ones.
+                                        Defaults to None (no tail).
+            tail_scale (str, optional): 'cap' keeps one open-ended tail range, 'log' tail
+                                        ranges double in width. Defaults to 'cap'.
+            profiler (StageProfiler, optional): Records time, rows, memory and peak RSS
+                                                of every pipeline stage. Defaults to None
+                                                (no instrumentation).
+            alias_index (dict, optional): Casefolded name -> canonical name (see
+                                          source.services.build_alias_index). Case variants
+                                          of the service, e.g. 'NETFLIX', are analyzed with
+                                          it. Defaults to None (exact names).
+            verify_hash (bool, optional): Drop the cache of the file when its content hash
+                                          changed, not only its size or modification time
+                                          (reads the whole file). Defaults to False.
         
         Raises:
             FileNotFoundError: If the specified data file path does not exist.
-            ValueError: If the file format is not supported (non-CSV).
+            ValueError: If the file format is not supported (non-CSV) or the tail
+                options are invalid.
         """
+        _check_gap_tail(tail_start, tail_scale)
         self.path_to_data = path_to_data
-        
-        df = self._load_data()
-        self.df = df[df[application_column].isin([streaming_service])].reset_index(drop=True)
-        
         self.streaming_service = streaming_service
         self.application_column = application_column
+        self.columns = columns
+        self.chunksize = chunksize
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.tail_start = tail_start
+        self.tail_scale = tail_scale
+        self.profiler = NULL_PROFILER if profiler is None else profiler
+        self.alias_index = alias_index
+        self.verify_hash = verify_hash
+        
+        if data is None:
+            _check_csv_path(path_to_data)
+        self._data = data
+        self._df = None
+        self.loaded_rows = None
+        self._gap_analysis_df = None
+        self._frequency_df = None
+        self._tv_aggregates = OrderedDict()
+        
+    @classmethod
+    def for_services(cls,
+                     path_to_data: str,
+                     streaming_services: list,
+                     application_column: str = 'application',
+                     columns=PIPELINE_COLUMNS,
+                     chunksize: int = DEFAULT_CHUNKSIZE,
+                     use_cache: bool = True,
+                     cache_dir: str | None = None,
+                     workers: int = 1,
+                     tail_start: int | None = None,
+                     tail_scale: str = 'cap',
+                     profiler: StageProfiler | None = None,
+                     alias_index: dict | None = None,
+                     verify_hash: bool = False) -> dict:
+        """
+        Create one analyzer per streaming service from a single read of the data file.
+        
+        The file is streamed once, keeping only rows of the requested services, and
+        sorted by application once (stable, so file order is kept within a service);
+        every analyzer receives a slice of its service's block, sharing the parsed
+        columns instead of re-reading the file or copying its partition.
+        
+        Args:
+            path_to_data (str): Path to the CSV file containing streaming data.
+            streaming_services (list): Names of the streaming services to analyze.
+            application_column (str, optional): Column name containing application data.
+                                              Defaults to 'application'.
+            columns (list, optional): Columns read from the file, None reads every column.
+                                      Defaults to PIPELINE_COLUMNS.
+            chunksize (int, optional): Number of rows parsed at a time while loading.
+                                       Defaults to DEFAULT_CHUNKSIZE.
+            use_cache (bool, optional): Read from and populate the columnar cache of the
+                                        file (needs pyarrow). Defaults to True.
+            cache_dir (str, optional): Cache root. Defaults to a '.cache' folder next to
+                                       the data file.
+            workers (int, optional): Worker processes for the session gap stage, rows are
+                                     partitioned by tv_id. Defaults to 1 (serial).
+            tail_start (int, optional): Gaps of at least this many seconds (a multiple of
+                                        15) go to tail ranges instead of 15-second ones.
+                                        Defaults to None (no tail).
+            tail_scale (str, optional): 'cap' keeps one open-ended tail range, 'log' tail
+                                        ranges double in width. Defaults to 'cap'.
+            profiler (StageProfiler, optional): Records time, rows, memory and peak RSS
+                                                of every pipeline stage. Defaults to None
+                                                (no instrumentation).
+            alias_index (dict, optional): Casefolded name -> canonical name (see
+                                          source.services.build_alias_index). Case variants
+                                          of the service, e.g. 'NETFLIX', are analyzed with
+                                          it. Defaults to None (exact names).
+            verify_hash (bool, optional): Drop the cache of the file when its content hash
+                                          changed, not only its size or modification time
+                                          (reads the whole file). Defaults to False.
+        
+        Returns:
+            dict: Mapping of streaming service name to its GapAnalysis instance, in the
+                  order of streaming_services.
+        
+        Raises:
+            FileNotFoundError: If the specified data file path does not exist.
+            ValueError: If the file format is not supported (non-CSV).
+        """
+        _check_gap_tail(tail_start, tail_scale)
+        profiler = NULL_PROFILER if profiler is None else profiler
+        with profiler.stage('load_viewing_data', streaming_services=list(streaming_services)) as stage:
+            df = load_viewing_data(path_to_data,
+                                   streaming_services=streaming_services,
+                                   application_column=application_column,
+                                   columns=columns,
+                                   chunksize=chunksize,
+                                   use_cache=use_cache,
+                                   cache_dir=cache_dir,
+                                   alias_index=alias_index,
+                                   verify_hash=verify_hash)
+            stage.output(df)
+        
+        # one stable sort makes every service a contiguous block, handed out as a slice
+        # of the sorted frame instead of a copy per service
+        codes, applications = pd.factorize(df[application_column])
+        order = np.argsort(codes, kind='stable')
+        sorted_codes = codes[order]
+        df = df.take(order)
+        df.index = pd.RangeIndex(len(df))
+        blocks = {application: (np.searchsorted(sorted_codes, code, side='left'),
+                                np.searchsorted(sorted_codes, code, side='right'))
+                  for code, application in enumerate(applications)}
         
-        self._merge_tv_counts(self._tv_counts_df())
-        self._create_session_id_col()
+        analyzers = {}
+        for streaming_service in streaming_services:
+            canonical = canonical_services([streaming_service], alias_index)[0]
+            start, end = blocks.get(canonical, (0, 0))
+            data = df.iloc[start:end]
+            data.index = pd.RangeIndex(len(data))
+            analyzers[streaming_service] = cls(path_to_data=path_to_data,
+                                               streaming_service=streaming_service,
+                                               application_column=application_column,
+                                               data=data,
+                                               columns=columns,
+                                               chunksize=chunksize,
+                                               use_cache=use_cache,
+                                               cache_dir=cache_dir,
+                                               workers=workers,
+                                               tail_start=tail_start,
+                                               tail_scale=tail_scale,
+                                               profiler=profiler,
+                                               alias_index=alias_index,
+                                               verify_hash=verify_hash)
+        return analyzers
         
-        self.gap_analysis_df = self._create_gap_analysis_df()
+    def _stage(self,
+               name: str,
+               frame: pd.DataFrame | None = None):
+        """Profiler stage labelled with the analyzed streaming service."""
+        return self.profiler.stage(name, frame, streaming_service=self.streaming_service)
+    
+    @property
+    def df(self) -> pd.DataFrame:
+        """Rows of the streaming service of TVs with several sessions, built on first access."""
+        if self._df is None:
+            self._build_df()
+        return self._df
+    
+    @df.setter
+    def df(self, df: pd.DataFrame):
+        self._df = df
+        self._gap_analysis_df = None
+        self._frequency_df = None
+        self._tv_aggregates.clear()
+    
+    @property
+    def gap_analysis_df(self) -> pd.DataFrame:
+        """Gaps between the sessions of every TV-content pair, built on first access."""
+        if self._gap_analysis_df is None:
+            df = self.df
+            with self._stage('_create_gap_analysis_df', df) as stage:
+                self._gap_analysis_df = self._create_gap_analysis_df()
+                stage.output(self._gap_analysis_df)
+        return self._gap_analysis_df
+    
+    @gap_analysis_df.setter
+    def gap_analysis_df(self, gap_analysis_df: pd.DataFrame):
+        self._gap_analysis_df = gap_analysis_df
+        self._frequency_df = None
+        self._tv_aggregates.clear()
+    
+    @property
+    def frequency_df(self) -> pd.DataFrame:
+        """
+        Gap range frequencies per TV, built on first access.
+        
+        When gap_analysis_df is not cached the gaps are computed with the
+        SESSION_GAP_COLUMNS only and dropped once counted.
+        """
+        if self._frequency_df is None:
+            if self._gap_analysis_df is None:
+                df = self.df
+                with self._stage('session_gaps', df) as stage:
+                    gap_analysis_df = self._create_gap_analysis_df(columns=SESSION_GAP_COLUMNS)
+                    stage.output(gap_analysis_df)
+            else:
+                gap_analysis_df = self._gap_analysis_df
+            with self._stage('_create_gap_frequency_df', gap_analysis_df) as stage:
+                self._frequency_df = self._create_gap_frequency_df(gap_analysis_df)
+                stage.output(self._frequency_df)
+            self._tv_aggregates.clear()
+        return self._frequency_df
+    
+    @frequency_df.setter
+    def frequency_df(self, frequency_df: pd.DataFrame):
+        self._frequency_df = frequency_df
+        self._tv_aggregates.clear()
+    
+    def release(self, *names: str):
+        """
+        Drop cached intermediate frames to free their memory.
         
-        self.frequency_df = self._create_gap_frequency_df(self.gap_analysis_df)
+        Released frames are rebuilt on their next access; the data file is read again
+        if df has to be rebuilt. The per-TV aggregates behind
+        categorize_subscription_types are kept, so it keeps working without any frame.
         
+        Args:
+            *names (str): Frames to drop among LAZY_FRAMES. Defaults to all of them.
+            
+        Raises:
+            ValueError: If a name is not one of LAZY_FRAMES.
+            
+        Example:
+            >>> subscription_types = analyzer.categorize_subscription_types()
+            >>> analyzer.release()
+        """
+        for name in names or LAZY_FRAMES:
+            if name not in LAZY_FRAMES:
+                raise ValueError(f"Unknown frame '{name}', expected one of {', '.join(LAZY_FRAMES)}.")
+            setattr(self, f'_{name}', None)
+        if self._df is None:
+            self._data = None
+    
+    def _build_df(self):
+        """Load the service rows (or take the given data) and run the preprocessing stages."""
+        try:
+            if self._data is None:
+                with self._stage('_load_data') as stage:
+                    self._df = self._load_data()
+                    stage.output(self._df)
+            else:
+                self._df, self._data = self._data, None
+            self.loaded_rows = len(self._df)
+            
+            with self._stage('_encode_tv_id', self._df) as stage:
+                self._encode_tv_id()
+                stage.output(self._df)
+            with self._stage('_merge_tv_counts', self._df) as stage:
+                self._merge_tv_counts(self._tv_counts_df())
+                stage.output(self._df)
+            with self._stage('_create_session_id_col', self._df) as stage:
+                self._create_session_id_col()
+                stage.output(self._df)
+        except BaseException:
+            self._df = None
+            raise
+    
     def _load_data(self) -> pd.DataFrame:
         """
-        Load data from a CSV file into a pandas DataFrame.
+        Load the rows of the analyzed streaming service from the CSV file.
+        
+        The file is streamed in chunks with only the configured columns parsed, and the
+        service filter is applied to every chunk as it is read.
         
         Returns:
-            pd.DataFrame: The loaded DataFrame from the CSV file.
+            pd.DataFrame: The rows of the CSV file for the streaming service.
             
         Raises:
             FileNotFoundError: If the specified file path does not exist.
             ValueError: If the file format is not CSV.
         """
-        if not os.path.exists(self.path_to_data):
-            raise FileNotFoundError(f"The file '{self.path_to_data}' was not found.")
+        return load_viewing_data(self.path_to_data,
+                                 streaming_services=[self.streaming_service],
+                                 application_column=self.application_column,
+                                 columns=self.columns,
+                                 chunksize=self.chunksize,
+                                 use_cache=self.use_cache,
+                                 cache_dir=self.cache_dir,
+                                 alias_index=self.alias_index,
+                                 verify_hash=self.verify_hash)
         
-        if self.path_to_data.endswith('.csv'):
-            df = pd.read_csv(self.path_to_data, low_memory=False)
-            print('Dataframe loaded successfully.')
-            return df
-        else:
-            raise ValueError("Unsupported file format. Please provide a CSV file.")
+    def _encode_tv_id(self,
+                      tv_id_col: str = 'tv_id') -> pd.DataFrame:
+        """
+        Store the TV identifier as a categorical so later stages work on integer codes.
+        
+        The 40-character identifiers are kept once per TV in the categories and written
+        back out as strings when results are saved.
+        
+        Args:
+            tv_id_col (str, optional): Column name for TV identifier. Defaults to 'tv_id'.
+            
+        Returns:
+            pd.DataFrame: The modified DataFrame (also updates self.df).
+        """
+        self.df = self.df.assign(**{tv_id_col: self.df[tv_id_col].astype('category')})
         
     def _tv_counts_df(self,
                       tv_id_col: str = 'tv_id') -> pd.DataFrame:
@@ -115,46 +934,40 @@ class GapAnalysis:
         """
         self.df = self.df.merge(tv_counts_df, on=tv_id_col, how='left')
         self.df = self.df[self.df['count'] > 1].reset_index(drop=True)
+        if isinstance(self.df[tv_id_col].dtype, pd.CategoricalDtype):
+            self.df[tv_id_col] = self.df[tv_id_col].cat.remove_unused_categories()
         
     def _create_session_id_col(self) -> pd.DataFrame:
         """
         Create a unique session identifier by combining TV ID and content ID.
         
         This method creates a 'tv_content_id' column that uniquely identifies
-        each viewing session for gap analysis.
+        each viewing session for gap analysis. The column is categorical (see
+        encode_session_keys), so grouping and comparisons run on integer codes.
         
         Returns:
             pd.DataFrame: The modified DataFrame with new session ID column.
         """
-        self.df['tv_content_id'] = self.df['tv_id'].astype(str) + '_' + self.df['content_id'].astype(str)
+        self.df['tv_content_id'] = encode_session_keys(self.df['tv_id'], self.df['content_id'])
         
-    def _create_gap_analysis_df(self) -> pd.DataFrame:
+    def _create_gap_analysis_df(self,
+                                columns=GAP_ANALYSIS_COLUMNS) -> pd.DataFrame:
         """
         Create a comprehensive gap analysis DataFrame with calculated time gaps between sessions.
         
-        This method processes each unique TV-content combination to:
-        1. Sort sessions by start time
-        2. Calculate gaps between consecutive sessions
-        3. Convert gaps to seconds for analysis
+        Sessions are ordered by TV-content combination (in order of first appearance)
+        and start time in a single pass, see compute_session_gaps. With workers > 1
+        the pass is split by tv_id across worker processes.
+        
+        Args:
+            columns (list, optional): Columns of df kept in the result.
+                                      Defaults to GAP_ANALYSIS_COLUMNS.
         
         Returns:
             pd.DataFrame: DataFrame containing gap analysis with columns for gap times,
                          gap durations in seconds, and session information.
         """
-        sub_dfs = []
-        for value in self.df['tv_content_id'].unique():
-            sub_df = self.df[self.df['tv_content_id'] == value].reset_index(drop=True)
-            if len(sub_df) > 1:
-                sub_df = sub_df[['tv_content_id', 'tv_id', 'content_id', 'start_time', 'end_time', 'duration', 'title', 'season_id']].sort_values(by='start_time', ascending=True).reset_index(drop=True)
-                sub_df['start_time'] = sub_df['start_time'].str.strip()
-                sub_df['start_time'] = pd.to_datetime(sub_df['start_time'])
-                sub_df['end_time'] = sub_df['end_time'].str.strip()
-                sub_df['end_time'] = pd.to_datetime(sub_df['end_time'])
-                sub_df['gap_vs_previous_session'] = sub_df['start_time'] - sub_df['end_time'].shift()
-                sub_df['gap_seconds'] = pd.to_timedelta(sub_df['gap_vs_previous_session']).dt.total_seconds()
-                sub_dfs.append(sub_df)
-        gap_analysis_df = pd.concat(sub_dfs, ignore_index=True)
-        return gap_analysis_df
+        return compute_session_gaps(self.df, workers=self.workers, columns=columns)
     
     def _create_gap_frequency_df(self,
                                  gap_analysis_df: pd.DataFrame) -> pd.DataFrame:
@@ -162,7 +975,8 @@ class GapAnalysis:
         Create a frequency distribution of gaps organized into time ranges.
         
         This method bins gap durations into 15-second intervals and counts
-        the frequency of gaps in each range for each TV.
+        the frequency of gaps in each range for each TV. Only ranges holding at
+        least one gap are listed, also as categories of 'gap_range'.
         
         Args:
             gap_analysis_df (pd.DataFrame): DataFrame containing gap analysis data.
@@ -170,33 +984,15 @@ class GapAnalysis:
         Returns:
             pd.DataFrame: DataFrame with gap ranges and their frequencies per TV.
         """
-        df_clean = gap_analysis_df.dropna(subset=['gap_seconds']).copy()
-    
-        max_gap = df_clean['gap_seconds'].max()
-        if pd.isna(max_gap) or max_gap < 0:
-            max_gap = 60
-        
-        bin_edges = list(range(0, int(max_gap) + 15, 15))
-        gap_labels = [f"{bin_edges[i]}-{bin_edges[i+1]}" for i in range(len(bin_edges) - 1)]
-        
-        df_clean['gap_range'] = pd.cut(
-            df_clean['gap_seconds'], 
-            bins=bin_edges, 
-            labels=gap_labels, 
-            right=False,
-            include_lowest=True
-        )
-        
-        frequency_df = (df_clean
-                    .groupby(['tv_id', 'gap_range'], observed=True)
-                    .size()
-                    .reset_index(name='frequency'))
-        
-        return frequency_df
+        return gap_frequency_table(gap_analysis_df['tv_id'],
+                                   gap_analysis_df['gap_seconds'],
+                                   tail_start=self.tail_start,
+                                   tail_scale=self.tail_scale)
     
     def categorize_subscription_types(self, 
                                       ad_threshold=3, 
-                                      ad_frequency_threshold=0.6):
+                                      ad_frequency_threshold=0.6,
+                                      ad_gap_cutoff=AD_GAP_CUTOFF_SECONDS):
         """
         Categorize TV subscribers as having ad-supported, ad-free, or mixed subscriptions
         based on viewing gap patterns.
@@ -206,11 +1002,19 @@ class GapAnalysis:
         - Ad-free: Predominantly longer gaps indicating natural viewing breaks
         - Mixed/Uncertain: Ambiguous patterns that don't clearly fit either category
         
+        The per-TV aggregates are computed once per frequency_df and ad gap cutoff and
+        reused (the last AGGREGATE_CACHE_SIZE cutoffs are kept), so calling this again
+        with other thresholds only re-evaluates the classification rules. Without a
+        cached gap_analysis_df the gaps are not kept (see frequency_df). To compare many
+        parameter sets use sweep_subscription_types.
+        
         Args:
             ad_threshold (int, optional): Minimum number of ad-like gaps required 
                                         for ad-supported classification. Defaults to 3.
             ad_frequency_threshold (float, optional): Minimum proportion of ad-like gaps 
                                                     for ad-supported classification. Defaults to 0.6.
+            ad_gap_cutoff (int, optional): Gap ranges whose upper bound is at most this many
+                                           seconds count as ad-like. Defaults to AD_GAP_CUTOFF_SECONDS.
         
         Returns:
             pd.DataFrame: DataFrame containing subscription type analysis with columns:
@@ -226,49 +1030,84 @@ class GapAnalysis:
             >>> results = analyzer.categorize_subscription_types(ad_threshold=5, ad_frequency_threshold=0.7)
             >>> print(results[results['subscription_type'] == 'ad_supported'].head())
         """
-        def _extract_upper_bound(gap_range):
-            """Extract the upper bound from a gap range string (e.g., '0-15' -> 15)."""
-            return int(gap_range.split('-')[1])
+        aggregates = self._cached_aggregates(('aggregates', ad_gap_cutoff),
+                                             'tv_gap_aggregates',
+                                             lambda frequency_df: tv_gap_aggregates(frequency_df, ad_gap_cutoff))
         
-        self.frequency_df = self.frequency_df.copy()
-        self.frequency_df['gap_upper_bound'] = self.frequency_df['gap_range'].apply(_extract_upper_bound)
+        with self._stage('categorize_subscription_types', aggregates) as stage:
+            subscription_types = classify_subscription_types(aggregates,
+                                                             ad_threshold=ad_threshold,
+                                                             ad_frequency_threshold=ad_frequency_threshold)
+            stage.output(subscription_types)
+        return subscription_types
+    
+    def sweep_subscription_types(self,
+                                 ad_gap_cutoffs=(AD_GAP_CUTOFF_SECONDS,),
+                                 ad_thresholds=(3,),
+                                 ad_frequency_thresholds=(0.6,)) -> pd.DataFrame:
+        """
+        Count the TVs of every subscription type for every combination of classification
+        parameters, as categorize_subscription_types would classify them.
         
-        # ad-like gaps (less than 60 seconds) based on google search for ads' time on netflix or hulu
-        self.frequency_df['is_ad_gap'] = self.frequency_df['gap_upper_bound'] <= 60
+        The cumulative gap counts per TV are built once up to the largest cutoff and
+        cached with the aggregates, so later sweeps within that cutoff reuse them.
         
-        tv_metrics = []
+        Args:
+            ad_gap_cutoffs (iterable, optional): Ad gap cutoffs in seconds.
+                                                 Defaults to (AD_GAP_CUTOFF_SECONDS,).
+            ad_thresholds (iterable, optional): Minimum numbers of ad-like gaps. Defaults to (3,).
+            ad_frequency_thresholds (iterable, optional): Minimum proportions of ad-like gaps.
+                                                          Defaults to (0.6,).
         
-        for tv_id in self.frequency_df['tv_id'].unique():
-            tv_data = self.frequency_df[self.frequency_df['tv_id'] == tv_id]
-            
-            total_gaps = tv_data['frequency'].sum()
-            ad_gaps = tv_data[tv_data['is_ad_gap']]['frequency'].sum()
-            long_gaps = tv_data[~tv_data['is_ad_gap']]['frequency'].sum()
-            
-            ad_gap_proportion = ad_gaps / total_gaps if total_gaps > 0 else 0
-            
-            most_common = tv_data.nlargest(3, 'frequency')['gap_range'].tolist()
-            
-            if total_gaps == 0:
-                subscription_type = 'insufficient_data'
-            elif ad_gaps >= ad_threshold and ad_gap_proportion >= ad_frequency_threshold:
-                subscription_type = 'ad_supported'
-            elif ad_gap_proportion < 0.3 and long_gaps > ad_gaps:
-                #long gaps, likely natural breaks
-                subscription_type = 'ad_free'
-            elif ad_gaps < 2:
-                subscription_type = 'ad_free' 
-            else:
-                subscription_type = 'mixed_or_uncertain'
-            
-            tv_metrics.append({
-                'tv_id': tv_id,
-                'subscription_type': subscription_type,
-                'total_gaps': total_gaps,
-                'ad_like_gaps': ad_gaps,
-                'long_gaps': long_gaps,
-                'ad_gap_proportion': round(ad_gap_proportion, 3),
-                'most_common_ranges': ', '.join(most_common[:3])
-            })
-        
-        return pd.DataFrame(tv_metrics)
\ No newline at end of file
+        Returns:
+            pd.DataFrame: 'ad_gap_cutoff', 'ad_threshold', 'ad_frequency_threshold',
+                'subscription_type' and 'tvs', one row per parameter set and type.
+                
+        Example:
+            >>> sweep = analyzer.sweep_subscription_types(ad_gap_cutoffs=[30, 45, 60, 90],
+            ...                                           ad_thresholds=range(1, 11),
+            ...                                           ad_frequency_thresholds=np.linspace(0.3, 0.9, 25))
+            >>> sweep.pivot_table('tvs', ['ad_gap_cutoff', 'ad_threshold', 'ad_frequency_threshold'],
+            ...                   'subscription_type')
+        """
+        ad_gap_cutoffs = list(ad_gap_cutoffs)
+        max_cutoff = max(ad_gap_cutoffs, default=AD_GAP_CUTOFF_SECONDS)
+        cached = [key for key in self._tv_aggregates if key[0] == 'cumulative' and key[1] >= max_cutoff]
+        key = min(cached, key=lambda key: key[1]) if cached else ('cumulative', max_cutoff)
+        gap_counts = self._cached_aggregates(key,
+                                             'cumulative_gap_counts',
+                                             lambda frequency_df: cumulative_gap_counts(frequency_df, key[1]))
+        
+        with self._stage('sweep_subscription_types') as stage:
+            sweep = sweep_subscription_types(gap_counts,
+                                             ad_gap_cutoffs=ad_gap_cutoffs,
+                                             ad_thresholds=ad_thresholds,
+                                             ad_frequency_thresholds=ad_frequency_thresholds)
+            stage.output(sweep)
+        return sweep
+    
+    def _cached_aggregates(self,
+                           key: tuple,
+                           stage_name: str,
+                           build):
+        """
+        Return per-TV aggregates from the least recently used cache, building them from
+        frequency_df on a miss.
+        
+        Args:
+            key (tuple): Kind of aggregates and ad gap cutoff.
+            stage_name (str): Profiler stage of the build.
+            build (callable): Builds the aggregates from frequency_df.
+        """
+        if key in self._tv_aggregates:
+            self._tv_aggregates.move_to_end(key)
+            return self._tv_aggregates[key]
+        
+        frequency_df = self.frequency_df
+        with self._stage(stage_name, frequency_df) as stage:
+            aggregates = build(frequency_df)
+            stage.output(aggregates if isinstance(aggregates, pd.DataFrame) else None)
+        self._tv_aggregates[key] = aggregates
+        while len(self._tv_aggregates) > AGGREGATE_CACHE_SIZE:
+            self._tv_aggregates.popitem(last=False)
+        return aggregates
@@ -0,0 +1,281 @@
+import hashlib
+import json
+import os
+import shutil
+from urllib.parse import quote
+import pandas as pd
+from source.services import service_key
+
+try:
+    import pyarrow  # noqa: F401 - only needed by pandas' parquet engine
+except ImportError:  # pragma: no cover - the cache is simply skipped
+    pyarrow = None
+
+CACHE_VERSION = 1
+
+# partition directory used for rows without an application value
+NULL_PARTITION = '__null__'
+
+ROW_COLUMN = '__row__'
+
+
+def is_available() -> bool:
+    """
+    Check whether the columnar cache can be used (it needs pyarrow).
+    
+    Returns:
+        bool: True if pyarrow is installed.
+    """
+    return pyarrow is not None
+
+
+def default_cache_dir(path_to_data: str) -> str:
+    """
+    Return the default cache directory of a data file, a '.cache' folder next to it.
+    
+    Args:
+        path_to_data (str): Path to the source CSV file.
+        
+    Returns:
+        str: Path to the cache directory.
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(path_to_data)), '.cache')
+
+
+def file_fingerprint(path_to_data: str,
+                     with_hash: bool = False) -> dict:
+    """
+    Fingerprint a file by its size and modification time, and optionally its content.
+    
+    Args:
+        path_to_data (str): Path to the file.
+        with_hash (bool, optional): Also compute the blake2b hash of the content.
+                                    Defaults to False.
+        
+    Returns:
+        dict: 'size', 'mtime_ns' and, when requested, 'content_hash'.
+    """
+    stat = os.stat(path_to_data)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if with_hash:
+        digest = hashlib.blake2b(digest_size=32)
+        with open(path_to_data, 'rb') as f:
+            for block in iter(lambda: f.read(8 * 1024 * 1024), b''):
+                digest.update(block)
+        fingerprint['content_hash'] = digest.hexdigest()
+    return fingerprint
+
+
+def _entry_dir(path_to_data: str,
+               partition_column: str,
+               cache_dir: str | None,
+               columns=None) -> str:
+    """
+    Return the cache directory of one source file, partition column and column set.
+    
+    Args:
+        path_to_data (str): Path to the source CSV file.
+        partition_column (str): Column the cache is partitioned by.
+        cache_dir (str or None): Cache root, None for default_cache_dir.
+        columns (list, optional): Cached columns, None for every column. Defaults to None.
+        
+    Returns:
+        str: Path to the cache entry.
+    """
+    cache_dir = cache_dir or default_cache_dir(path_to_data)
+    source = os.path.abspath(path_to_data)
+    column_set = '*' if columns is None else ','.join(sorted({*columns, partition_column}))
+    key = hashlib.sha1(f'{source}|{partition_column}|{column_set}'.encode()).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(cache_dir, f'{stem}-{key}')
+
+
+def _read_manifest(entry: str) -> dict | None:
+    """
+    Read the manifest of a cache entry.
+    
+    Args:
+        entry (str): Path to the cache entry.
+        
+    Returns:
+        dict or None: The manifest, or None if the entry is missing or incomplete.
+    """
+    try:
+        with open(os.path.join(entry, 'manifest.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _is_fresh(manifest: dict,
+              path_to_data: str,
+              verify_hash: bool) -> bool:
+    """
+    Check a manifest against the current state of its source file.
+    
+    Args:
+        manifest (dict): Manifest of the cache entry.
+        path_to_data (str): Path to the source CSV file.
+        verify_hash (bool): Also compare the content hash, which reads the whole file.
+        
+    Returns:
+        bool: True if the cache entry still matches the source file.
+    """
+    if manifest.get('version') != CACHE_VERSION:
+        return False
+    
+    current = file_fingerprint(path_to_data, with_hash=verify_hash)
+    return all(manifest['fingerprint'].get(key) == value for key, value in current.items())
+
+
+def read_cached(path_to_data: str,
+                streaming_services: list | None = None,
+                partition_column: str = 'application',
+                columns=None,
+                cache_dir: str | None = None,
+                verify_hash: bool = False,
+                alias_index: dict | None = None) -> pd.DataFrame | None:
+    """
+    Read viewing data from the columnar cache of a CSV file.
+    
+    Every column set has its own cache entry (see write_through). Only the partitions
+    of the requested services are read, with the parquet files memory-mapped.
+    
+    Args:
+        path_to_data (str): Path to the source CSV file.
+        streaming_services (list, optional): Applications to keep. Defaults to None (all rows).
+        partition_column (str, optional): Column the cache is partitioned by.
+                                          Defaults to 'application'.
+        columns (list, optional): Columns to read, the column set the entry was written
+                                  with. Defaults to None (every column).
+        cache_dir (str, optional): Cache root. Defaults to a '.cache' folder next to the file.
+        verify_hash (bool, optional): Compare the content hash of the source as well as its
+                                      size and modification time; entries written without
+                                      a hash are then stale. Defaults to False.
+        alias_index (dict, optional): Casefolded name -> canonical name, partitions are
+                                      selected by the canonical name of their value.
+                                      Defaults to None (exact names).
+        
+    Returns:
+        pd.DataFrame or None: The cached rows in file order, or None when there is no
+            valid cache for the file.
+    """
+    entry = _entry_dir(path_to_data, partition_column, cache_dir, columns)
+    manifest = _read_manifest(entry)
+    if manifest is None or not _is_fresh(manifest, path_to_data, verify_hash):
+        return None
+    
+    if columns is None:
+        columns = manifest['columns']
+    columns = [column for column in manifest['columns'] if column in {*columns, partition_column}]
+    
+    partitions = manifest['partitions']
+    if streaming_services is not None:
+        if alias_index is not None:
+            streaming_services = {alias_index.get(service_key(service), service) for service in streaming_services}
+            partitions = {name: value for name, value in partitions.items()
+                          if value is not None and alias_index.get(service_key(value), value) in streaming_services}
+        else:
+            partitions = {name: value for name, value in partitions.items() if value in streaming_services}
+    
+    files = [os.path.join(entry, name, file)
+             for name in partitions
+             for file in sorted(os.listdir(os.path.join(entry, name)))]
+    if not files:
+        return pd.DataFrame(columns=columns)
+    
+    frames = [pd.read_parquet(file, columns=[*columns, ROW_COLUMN], memory_map=True) for file in files]
+    df = pd.concat(frames, ignore_index=True)
+    if len(partitions) > 1:
+        df = df.sort_values(ROW_COLUMN, kind='stable', ignore_index=True)
+    return df.drop(columns=ROW_COLUMN)
+
+
+def write_through(path_to_data: str,
+                  chunks,
+                  partition_column: str = 'application',
+                  columns=None,
+                  cache_dir: str | None = None,
+                  verify_hash: bool = False):
+    """
+    Build the columnar cache of a CSV file from its parsed chunks, passing them through.
+    
+    Every chunk is split by partition_column and written as one parquet file per
+    partition, so memory stays bounded by the chunk size. The entry is keyed by its
+    column set, so a load of a few columns neither parses nor caches the others. The entry only becomes
+    visible once every chunk has been written; if the chunks are not fully consumed
+    nothing is cached. When another process publishes a fresh entry for the same file
+    first, that entry is kept.
+    
+    Args:
+        path_to_data (str): Path to the source CSV file.
+        chunks (iterable): Parsed chunks of the full file (every row and the given columns).
+        partition_column (str, optional): Column to partition by. Defaults to 'application'.
+        columns (list, optional): Columns of the chunks, the key of the entry.
+                                  Defaults to None (every column).
+        cache_dir (str, optional): Cache root. Defaults to a '.cache' folder next to the file.
+        verify_hash (bool, optional): Store the content hash of the source, which reads
+                                      the whole file once more, so that read_cached can
+                                      verify it. Defaults to False (size and modification
+                                      time only).
+        
+    Yields:
+        pd.DataFrame: The chunks, unchanged.
+    """
+    entry = _entry_dir(path_to_data, partition_column, cache_dir, columns)
+    staging = f'{entry}.tmp-{os.getpid()}'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    
+    fingerprint = file_fingerprint(path_to_data, with_hash=verify_hash)
+    partitions = {}
+    columns = None
+    offset = 0
+    try:
+        for index, chunk in enumerate(chunks):
+            columns = list(chunk.columns)
+            rows = chunk.assign(**{ROW_COLUMN: range(offset, offset + len(chunk))})
+            offset += len(chunk)
+            
+            for value, part in rows.groupby(partition_column, sort=False, observed=True, dropna=False):
+                name = NULL_PARTITION if pd.isna(value) else f'{partition_column}={quote(str(value), safe="")}'
+                partitions[name] = None if pd.isna(value) else value
+                os.makedirs(os.path.join(staging, name), exist_ok=True)
+                part.to_parquet(os.path.join(staging, name, f'part-{index:05d}.parquet'), index=False)
+            yield chunk
+        
+        with open(os.path.join(staging, 'manifest.json'), 'w') as f:
+            json.dump({'version': CACHE_VERSION,
+                       'source': os.path.abspath(path_to_data),
+                       'fingerprint': fingerprint,
+                       'partition_column': partition_column,
+                       'columns': columns or [],
+                       'partitions': partitions}, f, indent=2, default=str)
+        
+        shutil.rmtree(entry, ignore_errors=True)
+        try:
+            os.replace(staging, entry)
+        except OSError:
+            # another process published the entry in the meantime; keep it if it is fresh
+            manifest = _read_manifest(entry)
+            if manifest is None or not _is_fresh(manifest, path_to_data, verify_hash):
+                raise
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def clear_cache(path_to_data: str,
+                partition_column: str = 'application',
+                columns=None,
+                cache_dir: str | None = None):
+    """
+    Remove the cached copy of a CSV file for one column set.
+    
+    Args:
+        path_to_data (str): Path to the source CSV file.
+        partition_column (str, optional): Column the cache is partitioned by.
+                                          Defaults to 'application'.
+        columns (list, optional): Column set of the entry. Defaults to None (every column).
+        cache_dir (str, optional): Cache root. Defaults to a '.cache' folder next to the file.
+    """
+    shutil.rmtree(_entry_dir(path_to_data, partition_column, cache_dir, columns), ignore_errors=True)
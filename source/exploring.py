@@ -1,13 +1,39 @@
+import json
+import numpy as np
 import pandas as pd
-import re
 import os
+from source.loading import load_viewing_data
 
-def load_data(file_path: str) -> pd.DataFrame:
+# distinct values kept per column before only the approximate count is reported
+MAX_EXACT_VALUES = 10_000
+
+# HyperLogLog registers are 2 ** precision bytes, the standard error is 1.04 / sqrt(2 ** precision)
+HLL_PRECISION = 14
+
+# streaming services looked up in the application and network columns
+SERVICES_TO_MATCH = ('netflix', 'hulu')
+
+# rows parsed at a time by the profiler, which keeps nothing per row
+PROFILE_CHUNKSIZE = 100_000
+
+def load_data(file_path: str,
+              use_cache: bool = False,
+              verify_hash: bool = False) -> pd.DataFrame:
     """
     Load data from a CSV file into a pandas DataFrame.
     
+    The file is read as it is with pandas.read_csv. With use_cache, viewing data files
+    (CSV files with an 'application' column) are loaded through
+    source.loading.load_viewing_data instead, which caches them as parquet next to the
+    CSV (when pyarrow is installed) and returns the timestamps parsed and the
+    application and network columns as categoricals.
+    
     Args:
         file_path (str): Path to the CSV file to be loaded.
+        use_cache (bool, optional): Load viewing data files through the columnar cache.
+                                    Defaults to False.
+        verify_hash (bool, optional): Drop the cache when the content hash of the file
+                                      changed (reads the whole file). Defaults to False.
         
     Returns:
         pd.DataFrame: The loaded DataFrame from the CSV file.
@@ -22,6 +48,9 @@ def load_data(file_path: str) -> pd.DataFrame:
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"The file '{file_path}' was not found.")
     
+    if use_cache and file_path.endswith('.csv') and 'application' in pd.read_csv(file_path, nrows=0).columns:
+        return load_viewing_data(file_path, verify_hash=verify_hash)
+    
     df = pd.read_csv(file_path)
     print('Dataframe loaded successfully.')
     return df
@@ -51,10 +80,10 @@ def display_dataframe_info(df: pd.DataFrame):
     print('----------------------------')
     print('First few rows of the Dataframe:')
     print(df.head())
-
+    
     print('----------------------------')
     print('Dataframe shape:', df.shape)
-
+    
     print('----------------------------')
     print('Dataframe info:')
     df.info()
@@ -92,8 +121,9 @@ def find_exact_word_case_insensitive(string_list: list,
     """
     Find all elements in a list that exactly match a given word (case-insensitive).
     
-    This function performs an exact word match using regular expressions,
-    ignoring case sensitivity. It treats all list elements as strings.
+    This function performs an exact word match on casefolded values in one
+    vectorized comparison, ignoring case sensitivity. It treats all list elements
+    as strings.
     
     Args:
         string_list (list): List of elements to search through (converted to strings).
@@ -110,11 +140,10 @@ def find_exact_word_case_insensitive(string_list: list,
         ['Netflix', 'NETFLIX', 'netflix']
     """
     # Ensure all elements in the list are treated as strings
-    string_list_str = [f'{s}' for s in string_list]
-    regex = re.compile(fr"^{re.escape(word)}$", re.IGNORECASE)
+    string_series = pd.Series([f'{s}' for s in string_list], dtype=object)
     
-    matching_elements = [s for s in string_list_str if regex.match(s)]
-    return matching_elements
+    matching_elements = string_series[string_series.str.casefold() == word.casefold()]
+    return matching_elements.tolist()
 
 def analyze_streaming_services(df: pd.DataFrame):
     """
@@ -148,39 +177,222 @@ def analyze_streaming_services(df: pd.DataFrame):
     """
     print('----------------------------')
     app_list = get_unique_list_from_column(df, 'application')
-
+    
     print('----------------------------')
     network_list = get_unique_list_from_column(df, 'network')
-
+    
     print('----------------------------')
     found_app_case_insensitive_netflix = find_exact_word_case_insensitive(app_list, 'netflix')
     print('Elements from application list that match Netflix (case-insensitive):', found_app_case_insensitive_netflix)
-
+    
     print('----------------------------')
     found_app_case_insensitive_hulu = find_exact_word_case_insensitive(app_list, 'hulu')
     print('Elements from application list that match Hulu (case-insensitive):', found_app_case_insensitive_hulu)
-
+    
     print('----------------------------')
     found_network_case_insensitive_netflix = find_exact_word_case_insensitive(network_list, 'netflix')
     print('Elements from network list that match Netflix (case-insensitive):', found_network_case_insensitive_netflix)
-
+    
     print('----------------------------')
     found_network_case_insensitive_hulu = find_exact_word_case_insensitive(network_list, 'hulu')
     print('Elements from network list that match Hulu (case-insensitive):', found_network_case_insensitive_hulu)
 
+class HyperLogLog:
+    """
+    Approximate distinct counter with fixed memory (2 ** precision one-byte registers).
+    
+    Values are hashed in bulk with pandas' 64-bit hash; the first precision bits of a
+    hash pick a register, which keeps the longest run of leading zeros seen in the
+    remaining bits.
+    
+    Attributes:
+        precision (int): Number of hash bits used to pick a register.
+        registers (np.ndarray): Register values.
+        
+    Example:
+        >>> counter = HyperLogLog()
+        >>> counter.add(df['tv_id'].dropna().to_numpy())
+        >>> round(counter.estimate())
+        1523041
+    """
+    
+    def __init__(self, precision: int = HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+    
+    def add(self, values: np.ndarray):
+        """
+        Add values (not null) to the counter.
+        
+        Args:
+            values (np.ndarray): Values to count.
+        """
+        if len(values) == 0:
+            return
+        hashes = pd.util.hash_array(np.asarray(values), categorize=False)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        rest_bits = 64 - self.precision
+        rest = hashes & np.uint64((1 << rest_bits) - 1)
+        # position of the first set bit of the remaining bits, counted from 1
+        highest = np.floor(np.log2(np.maximum(rest, 1).astype(np.float64))).astype(np.int64)
+        rank = np.where(rest == 0, rest_bits + 1, rest_bits - highest).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+    
+    def estimate(self) -> float:
+        """
+        Estimate the number of distinct values added.
+        
+        Returns:
+            float: Estimated cardinality.
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        empty = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * m and empty:
+            return float(m * np.log(m / empty))
+        return float(raw)
 
-if __name__ == "__main__":
-    pd.set_option('display.max_columns', None)
+def _hash_values(values: pd.Series) -> np.ndarray:
+    """
+    Values to hash for the distinct count. Numbers are hashed as float64, so that
+    chunks that read a column as int and as float (missing values) agree.
+    """
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.to_numpy(dtype=np.float64)
+    return values.to_numpy(dtype=object)
 
-    data_file_path = './data/data.csv' 
+def _value_labels(values: np.ndarray) -> pd.Series:
+    """String form of distinct values, with integral floats written as integers."""
+    values = pd.Series(values)
+    if pd.api.types.is_float_dtype(values):
+        integral = np.isfinite(values) & (values == np.round(values))
+        labels = values.astype(str)
+        labels[integral] = values[integral].astype(np.int64).astype(str)
+        return labels
+    return values.astype(str)
 
-    try:
-        main_df = load_data(data_file_path)
+def _combined_dtype(dtypes: set) -> str:
+    """Dtype of a column whose chunks were read with the given dtypes."""
+    if len(dtypes) == 1:
+        return next(iter(dtypes))
+    if all(pd.api.types.is_numeric_dtype(np.dtype(dtype)) for dtype in dtypes if dtype != 'category'):
+        return 'float64'
+    return 'object'
 
-        display_dataframe_info(main_df)
+def profile_csv(file_path: str,
+                chunksize: int = PROFILE_CHUNKSIZE,
+                max_exact_values: int = MAX_EXACT_VALUES,
+                precision: int = HLL_PRECISION,
+                match_columns: tuple = ('application', 'network'),
+                match_words: tuple = SERVICES_TO_MATCH) -> dict:
+    """
+    Profile every column of a CSV file in one chunked pass with bounded memory.
+    
+    For every column the profile holds the dtype, the null count and the number of
+    distinct values. Distinct values are also kept, grouped by their casefolded form,
+    until a column has more than max_exact_values of them; past that (tv_id, zip)
+    only a HyperLogLog estimate of the cardinality is reported. Case-insensitive
+    matches of match_words in match_columns are dictionary lookups on the casefolded
+    values.
+    
+    Args:
+        file_path (str): Path to the CSV file to be profiled.
+        chunksize (int, optional): Number of rows parsed at a time. Defaults to PROFILE_CHUNKSIZE.
+        max_exact_values (int, optional): Distinct values kept per column. Defaults to MAX_EXACT_VALUES.
+        precision (int, optional): HyperLogLog precision. Defaults to HLL_PRECISION.
+        match_columns (tuple, optional): Columns searched for match_words.
+                                         Defaults to ('application', 'network').
+        match_words (tuple, optional): Words looked up case-insensitively.
+                                       Defaults to SERVICES_TO_MATCH.
+        
+    Returns:
+        dict: 'file', 'rows', 'columns' (name -> 'dtype', 'nulls', 'cardinality',
+            'cardinality_is_approximate' and 'values', casefolded value -> spellings,
+            or None when there were too many) and 'matches' (column -> word -> spellings).
+            
+    Raises:
+        FileNotFoundError: If the specified file path does not exist.
+        
+    Example:
+        >>> profile = profile_csv('./data/data.csv')
+        >>> profile['matches']['application']['netflix']
+        ['Netflix']
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"The file '{file_path}' was not found.")
+    
+    rows = 0
+    columns = {}
+    with pd.read_csv(file_path, chunksize=chunksize, low_memory=False) as reader:
+        for chunk in reader:
+            rows += len(chunk)
+            for name in chunk.columns:
+                column = columns.setdefault(name, {'dtypes': set(), 'nulls': 0, 'hll': HyperLogLog(precision),
+                                                   'values': {}})
+                values = chunk[name]
+                column['dtypes'].add(str(values.dtype))
+                present = values.dropna()
+                column['nulls'] += len(values) - len(present)
+                
+                column['hll'].add(_hash_values(present))
+                if column['values'] is None:
+                    continue
+                uniques = present.unique()
+                if len(uniques) > max_exact_values:
+                    column['values'] = None
+                    continue
+                labels = _value_labels(uniques)
+                for folded, spelling in zip(labels.str.casefold(), labels):
+                    column['values'].setdefault(folded, set()).add(spelling)
+                if sum(len(spellings) for spellings in column['values'].values()) > max_exact_values:
+                    column['values'] = None
+    
+    summary = {'file': file_path, 'rows': rows, 'columns': {}, 'matches': {}}
+    for name, column in columns.items():
+        values = column['values']
+        exact = values is not None
+        summary['columns'][name] = {
+            'dtype': _combined_dtype(column['dtypes']),
+            'nulls': int(column['nulls']),
+            'cardinality': sum(len(spellings) for spellings in values.values()) if exact
+                           else round(column['hll'].estimate()),
+            'cardinality_is_approximate': not exact,
+            'values': {folded: sorted(values[folded]) for folded in sorted(values)} if exact else None,
+        }
+    
+    for name in match_columns:
+        values = summary['columns'].get(name, {}).get('values') or {}
+        summary['matches'][name] = {word: values.get(word.casefold(), []) for word in match_words}
+    return summary
 
-        analyze_streaming_services(main_df)
+def write_profile(profile: dict,
+                  output_path: str = './logs/exploring.json'):
+    """
+    Save a profile (see profile_csv) as JSON.
+    
+    Args:
+        profile (dict): Profile to save.
+        output_path (str, optional): Destination path. Defaults to './logs/exploring.json'.
+    """
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(profile, f, indent=2)
 
+if __name__ == "__main__":
+    pd.set_option('display.max_columns', None)
+    
+    data_file_path = './data/data.csv' 
+    
+    try:
+        profile = profile_csv(data_file_path)
+        write_profile(profile, './logs/exploring.json')
+        
+        print('Dataframe shape:', (profile['rows'], len(profile['columns'])))
+        for column, matches in profile['matches'].items():
+            for word, spellings in matches.items():
+                print(f'Elements from {column} list that match {word} (case-insensitive):', spellings)
+    
     except FileNotFoundError as e:
         print(f"Error: {e}")
     except ValueError as e:
@@ -0,0 +1,319 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from source.analysis import (GAP_ANALYSIS_COLUMNS, _check_gap_tail, classify_subscription_types, content_id_labels,
+                             gap_bin_index, gap_range_labels, sorted_session_gaps, tv_gap_aggregates)
+from source.loading import DEFAULT_CHUNKSIZE, PIPELINE_COLUMNS, iter_viewing_data
+
+# rows per spilled block; the merge holds one block per sorted run in memory
+DEFAULT_BLOCK_ROWS = 100_000
+
+_NAT = np.iinfo(np.int64).min
+_MAX = np.iinfo(np.int64).max
+
+# sort key of the spilled rows: session label, start time (missing last), file position
+_SORT_COLUMNS = ['tv_content_id', 'start_key', 'row']
+
+
+def _session_labels(tv_id: pd.Series,
+                    content_id: pd.Series) -> np.ndarray:
+    """
+    'tv_id_content_id' labels of a chunk, independent of the dtype the chunk inferred
+    (see content_id_labels), so a session keeps one label across chunks.
+    """
+    return tv_id.astype(str).to_numpy(dtype=object) + '_' + content_id_labels(content_id)
+
+
+def _sort_block(block: pd.DataFrame) -> pd.DataFrame:
+    """Sort rows by _SORT_COLUMNS."""
+    key_codes, _ = pd.factorize(block['tv_content_id'], sort=True)
+    order = np.lexsort((block['row'].to_numpy(), block['start_key'].to_numpy(), key_codes))
+    return block.take(order).reset_index(drop=True)
+
+
+def _safe_rows(block: pd.DataFrame,
+               bound: tuple) -> int:
+    """Number of leading rows of a sorted block that are not after bound in _SORT_COLUMNS order."""
+    key, start_key, row = bound
+    keys = block['tv_content_id'].to_numpy()
+    same = keys == key
+    before = (keys < key) | (same & ((block['start_key'].to_numpy() < start_key)
+                                     | ((block['start_key'].to_numpy() == start_key)
+                                        & (block['row'].to_numpy() <= row))))
+    return int(before.sum())
+
+
+class ExternalGapAnalysis:
+    """
+    Out-of-core gap analysis for files whose service rows do not fit in memory.
+    
+    The file is read in chunks of run_rows rows; every chunk is sorted by session
+    and start time and spilled to a temporary directory as blocks of block_rows
+    rows (a sorted run). The runs are then merged block-wise: each step takes the
+    rows of every run that cannot be preceded by rows still on disk, sorts them and
+    computes their gaps, holding back the session that may continue in the next
+    step. Gap rows can be streamed to a CSV file and the per-TV histograms are
+    accumulated as the merge goes, so memory depends on run_rows and on the number
+    of runs times block_rows, not on the size of the file.
+    
+    frequency_df and categorize_subscription_types match those of GapAnalysis; the
+    gap rows are the same but sessions are ordered by label instead of by first
+    appearance.
+    
+    Attributes:
+        path_to_data (str): Path to the data file.
+        streaming_service (str): Name of the streaming service to analyze.
+        application_column (str): Column name containing application data.
+        run_rows (int): Rows read, sorted and spilled at a time.
+        block_rows (int): Rows per spilled block.
+        tmp_dir (str): Parent directory of the spilled runs, None for the system default.
+        gap_output (str): CSV file the gap rows are written to, None to skip them.
+        n_runs (int): Number of sorted runs of the last run().
+        n_gap_rows (int): Number of gap rows of the last run().
+    
+    Example:
+        >>> external = ExternalGapAnalysis('./data/year.csv', 'Netflix',
+        ...                                gap_output='./output/Netflix_gap_analysis.csv')
+        >>> subscription_types = external.categorize_subscription_types()
+    """
+    
+    def __init__(self,
+                 path_to_data: str,
+                 streaming_service: str,
+                 application_column: str = 'application',
+                 run_rows: int = DEFAULT_CHUNKSIZE,
+                 block_rows: int = DEFAULT_BLOCK_ROWS,
+                 tmp_dir: str | None = None,
+                 gap_output: str | None = None,
+                 tail_start: int | None = None,
+                 tail_scale: str = 'cap',
+                 alias_index: dict | None = None):
+        """
+        Initialize the analysis; the file is processed on the first run().
+        
+        Args:
+            path_to_data (str): Path to the CSV file containing streaming data.
+            streaming_service (str): Name of the streaming service to filter and analyze.
+            application_column (str, optional): Column name containing application data.
+                                              Defaults to 'application'.
+            run_rows (int, optional): Rows read, sorted and spilled at a time.
+                                      Defaults to DEFAULT_CHUNKSIZE.
+            block_rows (int, optional): Rows per spilled block. Defaults to DEFAULT_BLOCK_ROWS.
+            tmp_dir (str, optional): Parent directory of the spilled runs. Defaults to
+                                     None (the system temporary directory).
+            gap_output (str, optional): CSV file the gap rows are written to. Defaults
+                                        to None (gap rows are only counted).
+            tail_start (int, optional): First second of the tail gap ranges, see
+                                        GapAnalysis. Defaults to None (no tail).
+            tail_scale (str, optional): 'cap' or 'log'. Defaults to 'cap'.
+            alias_index (dict, optional): Casefolded name -> canonical name, see
+                                          GapAnalysis. Defaults to None (exact names).
+        
+        Raises:
+            ValueError: If the tail options are invalid.
+        """
+        _check_gap_tail(tail_start, tail_scale)
+        self.path_to_data = path_to_data
+        self.streaming_service = streaming_service
+        self.application_column = application_column
+        self.run_rows = run_rows
+        self.block_rows = block_rows
+        self.tmp_dir = tmp_dir
+        self.gap_output = gap_output
+        self.tail_start = tail_start
+        self.tail_scale = tail_scale
+        self.alias_index = alias_index
+        
+        self.n_runs = 0
+        self.n_gap_rows = 0
+        self._frequency_df = None
+        self._tv_aggregates = None
+    
+    @property
+    def frequency_df(self) -> pd.DataFrame:
+        """Gap ranges and their frequencies per TV, as GapAnalysis.frequency_df."""
+        if self._frequency_df is None:
+            self.run()
+        return self._frequency_df
+    
+    def run(self) -> pd.DataFrame:
+        """
+        Sort, merge and analyze the file.
+        
+        Returns:
+            pd.DataFrame: The frequency table, see frequency_df.
+        
+        Raises:
+            FileNotFoundError: If the specified data file path does not exist.
+            ValueError: If the file format is not CSV.
+        """
+        with tempfile.TemporaryDirectory(prefix='gap-runs-', dir=self.tmp_dir) as spill_dir:
+            runs = self._spill_runs(spill_dir)
+            self.n_runs = len(runs)
+            counts = self._merge_runs(runs)
+        
+        self._frequency_df = self._frequency_table(counts)
+        self._tv_aggregates = None
+        return self._frequency_df
+    
+    def _spill_runs(self, spill_dir: str) -> list:
+        """
+        Write the sorted runs of the file.
+        
+        Returns:
+            list: Block paths of every run, in sorted order.
+        """
+        runs = []
+        row = 0
+        for chunk in iter_viewing_data(self.path_to_data,
+                                       streaming_services=[self.streaming_service],
+                                       application_column=self.application_column,
+                                       columns=PIPELINE_COLUMNS,
+                                       chunksize=self.run_rows,
+                                       alias_index=self.alias_index):
+            positions = np.arange(row, row + len(chunk), dtype=np.int64)
+            row += len(chunk)
+            keep = chunk['tv_id'].notna().to_numpy()
+            chunk = chunk[keep]
+            if len(chunk) == 0:
+                continue
+            
+            start_ns = chunk['start_time'].to_numpy(dtype='datetime64[ns]').view('i8')
+            run = _sort_block(pd.DataFrame({
+                'tv_content_id': _session_labels(chunk['tv_id'], chunk['content_id']),
+                'start_key': np.where(start_ns == _NAT, _MAX, start_ns),
+                'row': positions[keep],
+                **{column: chunk[column].to_numpy() for column in GAP_ANALYSIS_COLUMNS[1:]},
+            }))
+            
+            paths = []
+            for start in range(0, len(run), self.block_rows):
+                paths.append(os.path.join(spill_dir, f'run-{len(runs):05d}-{len(paths):05d}.pkl'))
+                run.iloc[start:start + self.block_rows].to_pickle(paths[-1])
+            runs.append(paths)
+        return runs
+    
+    def _merge_runs(self, runs: list) -> list:
+        """
+        Merge the sorted runs block-wise, computing gaps and histogram counts as they go.
+        
+        Returns:
+            list: Per-step (tv_id, gap_bin) -> count Series.
+        """
+        pending = [list(paths) for paths in runs]
+        buffers = [pd.read_pickle(paths.pop(0)) for paths in pending]
+        held = None
+        counts = []
+        self.n_gap_rows = 0
+        
+        output = open(self.gap_output, 'w', newline='') if self.gap_output else None
+        try:
+            while buffers:
+                # rows after the smallest last row of a run with blocks on disk may still be preceded
+                bounds = [tuple(buffer[_SORT_COLUMNS].iloc[-1]) for buffer, paths in zip(buffers, pending) if paths]
+                bound = min(bounds) if bounds else None
+                
+                parts = []
+                for index, buffer in enumerate(buffers):
+                    n_safe = len(buffer) if bound is None else _safe_rows(buffer, bound)
+                    parts.append(buffer.iloc[:n_safe])
+                    buffers[index] = buffer.iloc[n_safe:]
+                for index in reversed(range(len(buffers))):
+                    if len(buffers[index]) == 0:
+                        if pending[index]:
+                            buffers[index] = pd.read_pickle(pending[index].pop(0))
+                        else:
+                            del buffers[index], pending[index]
+                
+                block = _sort_block(pd.concat([part for part in parts if len(part)]))
+                if held is not None:
+                    block = pd.concat([held, block], ignore_index=True)
+                if buffers:
+                    last = block['tv_content_id'].to_numpy() == block['tv_content_id'].iloc[-1]
+                    held = block[last]
+                    block = block[~last]
+                
+                gaps = self._block_gaps(block)
+                self.n_gap_rows += len(gaps)
+                if output is not None:
+                    gaps.to_csv(output, index=False, header=output.tell() == 0)
+                counts.append(self._block_counts(gaps))
+                if len(counts) >= 64:
+                    counts = [pd.concat(counts).groupby(level=[0, 1]).sum()]
+        finally:
+            if output is not None:
+                output.close()
+        return counts
+    
+    def _block_gaps(self, block: pd.DataFrame) -> pd.DataFrame:
+        """Gap rows of a sorted block of complete sessions, as in compute_session_gaps."""
+        codes, _ = pd.factorize(block['tv_content_id'])
+        sizes = np.bincount(codes, minlength=1)
+        keep = sizes[codes] > 1
+        block = block[keep]
+        codes = codes[keep].astype(np.int64)
+        
+        start_ns = block['start_time'].to_numpy(dtype='datetime64[ns]').view('i8')
+        end_ns = block['end_time'].to_numpy(dtype='datetime64[ns]').view('i8')
+        if len(block) == 0:
+            order = np.empty(0, dtype=np.intp)
+            gap_ns = np.empty(0, dtype=np.int64)
+        else:
+            order, gap_ns = sorted_session_gaps(codes, start_ns, end_ns)
+        
+        gaps = block[GAP_ANALYSIS_COLUMNS].take(order).reset_index(drop=True)
+        gaps['gap_vs_previous_session'] = pd.to_timedelta(gap_ns, unit='ns')
+        gaps['gap_seconds'] = gaps['gap_vs_previous_session'].dt.total_seconds()
+        return gaps
+    
+    def _block_counts(self, gaps: pd.DataFrame) -> pd.Series:
+        """Gap counts per (tv_id, gap range index) of a block."""
+        valid = (gaps['gap_seconds'] >= 0).to_numpy()
+        return (pd.DataFrame({'tv_id': gaps['tv_id'].astype(str).to_numpy()[valid],
+                              'gap_bin': gap_bin_index(gaps['gap_seconds'].to_numpy()[valid],
+                                                       self.tail_start, self.tail_scale)})
+                .groupby(['tv_id', 'gap_bin'])
+                .size())
+    
+    def _frequency_table(self, counts: list) -> pd.DataFrame:
+        """Combine the block counts into a table shaped like GapAnalysis.frequency_df."""
+        counts = [count for count in counts if len(count)]
+        if counts:
+            totals = pd.concat(counts).groupby(level=[0, 1]).sum().sort_index()
+        else:
+            totals = pd.Series([], index=pd.MultiIndex.from_arrays([[], []], names=['tv_id', 'gap_bin']),
+                               dtype=np.int64)
+        
+        frequency_df = totals.reset_index(name='frequency')
+        gap_bins = frequency_df['gap_bin'].to_numpy(dtype=np.int64)
+        observed = np.unique(gap_bins)
+        return pd.DataFrame({
+            'tv_id': frequency_df['tv_id'].astype('category'),
+            'gap_range': pd.Categorical.from_codes(np.searchsorted(observed, gap_bins),
+                                                   categories=gap_range_labels(observed, self.tail_start,
+                                                                               self.tail_scale),
+                                                   ordered=True),
+            'frequency': frequency_df['frequency'].to_numpy(dtype=np.int64),
+        })
+    
+    def categorize_subscription_types(self,
+                                      ad_threshold=3,
+                                      ad_frequency_threshold=0.6) -> pd.DataFrame:
+        """
+        Classify every TV from its gap histogram, see GapAnalysis.categorize_subscription_types.
+        
+        Args:
+            ad_threshold (int, optional): Minimum number of ad-like gaps required
+                                        for ad-supported classification. Defaults to 3.
+            ad_frequency_threshold (float, optional): Minimum proportion of ad-like gaps
+                                                    for ad-supported classification. Defaults to 0.6.
+        
+        Returns:
+            pd.DataFrame: Subscription types per TV.
+        """
+        if self._tv_aggregates is None:
+            self._tv_aggregates = tv_gap_aggregates(self.frequency_df)
+        return classify_subscription_types(self._tv_aggregates,
+                                           ad_threshold=ad_threshold,
+                                           ad_frequency_threshold=ad_frequency_threshold)
@@ -0,0 +1,290 @@
+import pickle
+import numpy as np
+import pandas as pd
+from source.analysis import (GAP_ANALYSIS_COLUMNS, _check_gap_tail, classify_subscription_types, content_id_labels,
+                             encode_session_keys, gap_bin_index, gap_range_labels, sorted_session_gaps,
+                             tv_gap_aggregates)
+from source.loading import PIPELINE_COLUMNS, parse_timestamps, load_viewing_data
+
+_NAT = np.iinfo(np.int64).min
+
+
+class IncrementalGapAnalysis:
+    """
+    Append-only gap analysis that only processes new viewing sessions.
+    
+    Instead of the full history, the analyzer keeps the last start and end time of
+    every TV-content session, a per-TV histogram of gap ranges and the current
+    subscription type of every TV. Each update computes the gaps of the new rows only
+    (the first new row of a known session is measured against its stored end time),
+    adds them to the histograms and re-classifies the TVs whose histograms changed.
+    The resulting frequency_df and subscription_types equal those of a GapAnalysis
+    over the full history, provided every update only holds sessions that start after
+    the ones already seen for the same TV-content pair. Sessions are keyed on
+    content_id labels that do not depend on the dtype a file was read with (see
+    content_id_labels), so files with and without missing content ids link up.
+    
+    Attributes:
+        streaming_service (str): Name of the streaming service to analyze.
+        application_column (str): Column name containing application data.
+        ad_threshold (int): Minimum number of ad-like gaps for ad-supported classification.
+        ad_frequency_threshold (float): Minimum proportion of ad-like gaps for ad-supported classification.
+        sessions (dict): Last (start, end) time in nanoseconds of every tv_content_id.
+        tail_start (int): First second of the tail gap ranges, None for no tail.
+        tail_scale (str): 'cap' or 'log' tail ranges.
+        histograms (dict): Gap counts per gap range index, per tv_id.
+        alias_index (dict): Casefolded name -> canonical name of the loaded services, None for exact names.
+    
+    Example:
+        >>> incremental = IncrementalGapAnalysis('Netflix')
+        >>> incremental.update('./data/history.csv')
+        >>> incremental.save('./output/Netflix_state.pkl')
+        >>> incremental = IncrementalGapAnalysis.load('./output/Netflix_state.pkl')
+        >>> new_gaps = incremental.update('./data/2024-03-01.csv')
+        >>> print(incremental.subscription_types.head())
+    """
+    
+    def __init__(self,
+                 streaming_service: str,
+                 application_column: str = 'application',
+                 ad_threshold=3,
+                 ad_frequency_threshold=0.6,
+                 tail_start: int | None = None,
+                 tail_scale: str = 'cap',
+                 alias_index: dict | None = None):
+        """
+        Initialize an empty incremental analyzer.
+        
+        Args:
+            streaming_service (str): Name of the streaming service to filter and analyze.
+            application_column (str, optional): Column name containing application data.
+                                              Defaults to 'application'.
+            ad_threshold (int, optional): Minimum number of ad-like gaps required
+                                        for ad-supported classification. Defaults to 3.
+            ad_frequency_threshold (float, optional): Minimum proportion of ad-like gaps
+                                                    for ad-supported classification. Defaults to 0.6.
+            tail_start (int, optional): First second of the tail gap ranges, see
+                                        GapAnalysis. Defaults to None (no tail).
+            tail_scale (str, optional): 'cap' or 'log'. Defaults to 'cap'.
+            alias_index (dict, optional): Casefolded name -> canonical name, see
+                                          GapAnalysis. Use the index of the full runs so
+                                          that the same case variants are analyzed.
+                                          Defaults to None (exact names).
+            
+        Raises:
+            ValueError: If the tail options are invalid.
+        """
+        _check_gap_tail(tail_start, tail_scale)
+        self.streaming_service = streaming_service
+        self.application_column = application_column
+        self.ad_threshold = ad_threshold
+        self.ad_frequency_threshold = ad_frequency_threshold
+        self.tail_start = tail_start
+        self.tail_scale = tail_scale
+        self.alias_index = alias_index
+        
+        self.sessions = {}
+        self.histograms = {}
+        self._subscription_rows = {}
+        self._subscription_columns = []
+    
+    def update(self, path_to_data: str) -> pd.DataFrame:
+        """
+        Add the viewing sessions of a new data file.
+        
+        Args:
+            path_to_data (str): Path to the CSV file with the new viewing logs.
+            
+        Returns:
+            pd.DataFrame: The new rows of the streaming service with their gap to the
+                previous session, see update_frame.
+                
+        Raises:
+            FileNotFoundError: If the specified data file path does not exist.
+            ValueError: If the file format is not CSV or the file holds sessions older
+                than ones already processed.
+        """
+        df = load_viewing_data(path_to_data,
+                               streaming_services=[self.streaming_service],
+                               application_column=self.application_column,
+                               columns=PIPELINE_COLUMNS,
+                               use_cache=False,
+                               alias_index=self.alias_index)
+        return self.update_frame(df)
+    
+    def update_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add new viewing sessions of the streaming service.
+        
+        Args:
+            df (pd.DataFrame): New rows with the PIPELINE_COLUMNS, already filtered on
+                               the streaming service.
+            
+        Returns:
+            pd.DataFrame: The new rows ordered by session and start time with the
+                GAP_ANALYSIS_COLUMNS plus 'gap_vs_previous_session' and 'gap_seconds'
+                (NaN for the first viewing of a session that was not seen before).
+                
+        Raises:
+            ValueError: If a session starts before the last stored start of the same
+                TV-content pair.
+        """
+        df = df[df['tv_id'].notna()].reset_index(drop=True)
+        # the labels key the stored sessions, so they must not depend on the dtype of content_id
+        df['tv_content_id'] = encode_session_keys(df['tv_id'], pd.Series(content_id_labels(df['content_id'])))
+        df['start_time'] = parse_timestamps(df['start_time'])
+        df['end_time'] = parse_timestamps(df['end_time'])
+        
+        codes = df['tv_content_id'].cat.codes.to_numpy().astype(np.int64)
+        start_ns = df['start_time'].to_numpy(dtype='datetime64[ns]').view('i8')
+        end_ns = df['end_time'].to_numpy(dtype='datetime64[ns]').view('i8')
+        order, gap_ns = sorted_session_gaps(codes, start_ns, end_ns)
+        
+        new_gaps = df[GAP_ANALYSIS_COLUMNS].take(order).reset_index(drop=True)
+        self._link_sessions(new_gaps, codes[order], start_ns[order], end_ns[order], gap_ns)
+        new_gaps['gap_vs_previous_session'] = pd.to_timedelta(gap_ns, unit='ns')
+        new_gaps['gap_seconds'] = new_gaps['gap_vs_previous_session'].dt.total_seconds()
+        
+        self._reclassify(self._add_gaps(new_gaps))
+        return new_gaps
+    
+    def _link_sessions(self,
+                       new_gaps: pd.DataFrame,
+                       codes: np.ndarray,
+                       start_ns: np.ndarray,
+                       end_ns: np.ndarray,
+                       gap_ns: np.ndarray):
+        """
+        Measure the first new row of every known session against its stored end time
+        and store the new last row of every session. Updates gap_ns in place.
+        """
+        if len(codes) == 0:
+            return
+        boundaries = np.flatnonzero(np.diff(codes)) + 1
+        firsts = np.concatenate([[0], boundaries])
+        lasts = np.concatenate([boundaries - 1, [len(codes) - 1]])
+        labels = new_gaps['tv_content_id'].to_numpy()
+        
+        for first, last in zip(firsts.tolist(), lasts.tolist()):
+            label = labels[first]
+            previous = self.sessions.get(label)
+            if previous is not None:
+                previous_start, previous_end = previous
+                if start_ns[first] != _NAT and start_ns[first] < previous_start:
+                    raise ValueError(f"Session '{label}' has viewings older than the processed history; "
+                                     "run a full GapAnalysis instead.")
+                if start_ns[first] != _NAT and previous_end != _NAT:
+                    gap_ns[first] = start_ns[first] - previous_end
+            self.sessions[label] = (int(start_ns[last]), int(end_ns[last]))
+    
+    def _add_gaps(self, new_gaps: pd.DataFrame) -> set:
+        """
+        Add new gaps to the per-TV histograms.
+        
+        Returns:
+            set: tv_ids whose frequency table rows changed.
+        """
+        gaps = new_gaps[(new_gaps['gap_seconds'] >= 0).to_numpy()]
+        counts = (pd.DataFrame({'tv_id': gaps['tv_id'].astype(str).to_numpy(),
+                                'gap_bin': gap_bin_index(gaps['gap_seconds'].to_numpy(),
+                                                         self.tail_start, self.tail_scale)})
+                  .groupby(['tv_id', 'gap_bin'])
+                  .size())
+        
+        changed = set()
+        for (tv_id, gap_bin), count in counts.items():
+            histogram = self.histograms.setdefault(tv_id, {})
+            histogram[gap_bin] = histogram.get(gap_bin, 0) + count
+            changed.add(tv_id)
+        return changed
+    
+    def _frequency_rows(self, tv_ids) -> pd.DataFrame:
+        """Frequency table rows of the given TVs, sorted by tv_id and gap range."""
+        rows = [(tv_id, gap_bin, count)
+                for tv_id in sorted(tv_ids)
+                for gap_bin, count in sorted(self.histograms.get(tv_id, {}).items())]
+        frequency_df = pd.DataFrame(rows, columns=['tv_id', 'gap_bin', 'frequency'])
+        frequency_df['frequency'] = frequency_df['frequency'].astype(np.int64)
+        gap_bins = frequency_df['gap_bin'].to_numpy(dtype=np.int64)
+        observed = np.unique(gap_bins)
+        frequency_df['gap_range'] = pd.Categorical.from_codes(np.searchsorted(observed, gap_bins),
+                                                              categories=gap_range_labels(observed, self.tail_start,
+                                                                                          self.tail_scale),
+                                                              ordered=True)
+        return frequency_df[['tv_id', 'gap_range', 'frequency']]
+    
+    def _reclassify(self, tv_ids: set):
+        """Recompute the subscription type of the given TVs."""
+        if not tv_ids:
+            return
+        for tv_id in tv_ids:
+            self._subscription_rows.pop(tv_id, None)
+        
+        aggregates = tv_gap_aggregates(self._frequency_rows(tv_ids))
+        subscription_types = classify_subscription_types(aggregates,
+                                                         ad_threshold=self.ad_threshold,
+                                                         ad_frequency_threshold=self.ad_frequency_threshold)
+        self._subscription_columns = list(subscription_types.columns)
+        for row in subscription_types.itertuples(index=False, name=None):
+            self._subscription_rows[row[0]] = row
+    
+    @property
+    def frequency_df(self) -> pd.DataFrame:
+        """Gap ranges and their frequencies per TV, as GapAnalysis.frequency_df."""
+        frequency_df = self._frequency_rows(self.histograms)
+        frequency_df['tv_id'] = frequency_df['tv_id'].astype('category')
+        return frequency_df
+    
+    @property
+    def subscription_types(self) -> pd.DataFrame:
+        """Current subscription types, as GapAnalysis.categorize_subscription_types."""
+        if not self._subscription_rows:
+            return pd.DataFrame()
+        rows = [self._subscription_rows[tv_id] for tv_id in sorted(self._subscription_rows)]
+        return pd.DataFrame(rows, columns=self._subscription_columns)
+    
+    def categorize_subscription_types(self,
+                                      ad_threshold=3,
+                                      ad_frequency_threshold=0.6) -> pd.DataFrame:
+        """
+        Classify every TV with other thresholds than the maintained ones.
+        
+        Args:
+            ad_threshold (int, optional): Minimum number of ad-like gaps required
+                                        for ad-supported classification. Defaults to 3.
+            ad_frequency_threshold (float, optional): Minimum proportion of ad-like gaps
+                                                    for ad-supported classification. Defaults to 0.6.
+        
+        Returns:
+            pd.DataFrame: Subscription types, see GapAnalysis.categorize_subscription_types.
+        """
+        return classify_subscription_types(tv_gap_aggregates(self.frequency_df),
+                                           ad_threshold=ad_threshold,
+                                           ad_frequency_threshold=ad_frequency_threshold)
+    
+    def save(self, path: str):
+        """
+        Save the analyzer state to a file.
+        
+        Args:
+            path (str): Destination path.
+        """
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    @classmethod
+    def load(cls, path: str) -> 'IncrementalGapAnalysis':
+        """
+        Load an analyzer state saved with save.
+        
+        Args:
+            path (str): Path to the saved state.
+            
+        Returns:
+            IncrementalGapAnalysis: The restored analyzer.
+        """
+        with open(path, 'rb') as f:
+            analyzer = pickle.load(f)
+        # states saved before the alias index existed selected exact names
+        analyzer.__dict__.setdefault('alias_index', None)
+        return analyzer
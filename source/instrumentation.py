@@ -0,0 +1,189 @@
+import json
+import logging
+import time
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - peak RSS is not reported on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+_MEASUREMENTS = ('stage', 'rows_in', 'rows_out', 'memory_bytes', 'seconds', 'peak_rss_delta_bytes', 'error')
+
+
+def peak_rss_bytes() -> int | None:
+    """
+    Return the peak resident set size of the process.
+    
+    Returns:
+        int: Peak RSS in bytes, None where the resource module is not available.
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _rows(frame) -> int | None:
+    return None if frame is None else len(frame)
+
+
+class _Stage:
+    """Context manager recording one stage of a StageProfiler."""
+    
+    def __init__(self, profiler: 'StageProfiler', record: dict):
+        self.profiler = profiler
+        self.record = record
+    
+    def __enter__(self) -> '_Stage':
+        self._rss = peak_rss_bytes()
+        self._started = time.perf_counter()
+        return self
+    
+    def output(self, frame: pd.DataFrame):
+        """Record the rows and memory usage of the DataFrame produced by the stage."""
+        self.record['rows_out'] = _rows(frame)
+        if frame is not None:
+            self.record['memory_bytes'] = int(frame.memory_usage(index=True, deep=self.profiler.deep).sum())
+    
+    def __exit__(self, exc_type, exc, traceback):
+        self.record['seconds'] = time.perf_counter() - self._started
+        rss = peak_rss_bytes()
+        self.record['peak_rss_delta_bytes'] = None if rss is None else rss - self._rss
+        if exc_type is not None:
+            self.record['error'] = exc_type.__name__
+        self.profiler._finish(self.record)
+        return False
+
+
+class _NullStage:
+    """Stage of a disabled profiler, every call is a no-op."""
+    
+    def __enter__(self) -> '_NullStage':
+        return self
+    
+    def output(self, frame: pd.DataFrame):
+        pass
+    
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class StageProfiler:
+    """
+    Collect wall time, rows in/out, DataFrame memory and peak RSS growth per pipeline stage.
+    
+    Pipeline code wraps each step in a stage and reports the DataFrame it produced:
+    
+        with profiler.stage('_load_data') as stage:
+            df = load()
+            stage.output(df)
+    
+    A disabled profiler (see NULL_PROFILER) hands out a shared no-op stage, so the
+    instrumentation costs one method call per stage when it is turned off.
+    
+    Attributes:
+        enabled (bool): Whether stages are recorded.
+        deep (bool): Measure object columns with memory_usage(deep=True).
+        log (bool): Log every finished stage to the 'source.instrumentation' logger.
+        callback (callable): Called with the record of every finished stage.
+        records (list): Records of the finished stages, in order.
+    
+    Example:
+        >>> profiler = StageProfiler(log=True)
+        >>> analyzer = GapAnalysis('./data/streaming.csv', 'Netflix', profiler=profiler)
+        >>> analyzer.categorize_subscription_types()
+        >>> profiler.to_json('./logs/Netflix_stages.json')
+    """
+    
+    def __init__(self,
+                 enabled: bool = True,
+                 deep: bool = True,
+                 log: bool = False,
+                 callback=None):
+        """
+        Initialize an empty profiler.
+        
+        Args:
+            enabled (bool, optional): Record stages. Defaults to True.
+            deep (bool, optional): Include the contents of object columns in the memory
+                                   usage, which needs a pass over them. Defaults to True.
+            log (bool, optional): Log every finished stage at INFO level. Defaults to False.
+            callback (callable, optional): Called with the record dict of every finished
+                                           stage. Defaults to None.
+        """
+        self.enabled = enabled
+        self.deep = deep
+        self.log = log
+        self.callback = callback
+        self.records = []
+    
+    def stage(self,
+              name: str,
+              frame: pd.DataFrame | None = None,
+              **labels):
+        """
+        Context manager recording one stage.
+        
+        Args:
+            name (str): Stage name.
+            frame (pd.DataFrame, optional): Input of the stage, for the rows in. Defaults to None.
+            **labels: Extra values stored in the record, e.g. streaming_service.
+        
+        Returns:
+            Context manager whose output(frame) method records the stage result.
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, {'stage': name, **labels, 'rows_in': _rows(frame), 'rows_out': None,
+                             'memory_bytes': None})
+    
+    def _finish(self, record: dict):
+        self.records.append(record)
+        if self.log:
+            labels = ', '.join(f'{key}={value}' for key, value in record.items() if key not in _MEASUREMENTS)
+            logger.info('%s (%s): %.3f s, rows %s -> %s, %s bytes, peak RSS +%s bytes',
+                        record['stage'], labels, record['seconds'], record['rows_in'], record['rows_out'],
+                        record['memory_bytes'], record['peak_rss_delta_bytes'])
+        if self.callback is not None:
+            self.callback(record)
+    
+    def report(self) -> dict:
+        """
+        Return the recorded stages as a structured report.
+        
+        Returns:
+            dict: 'stages' (list of records with 'stage', 'rows_in', 'rows_out',
+                'memory_bytes', 'seconds' and 'peak_rss_delta_bytes') and 'total_seconds'.
+        """
+        return {'stages': [dict(record) for record in self.records],
+                'total_seconds': sum(record['seconds'] for record in self.records)}
+    
+    def to_json(self, path: str | None = None) -> str:
+        """
+        Serialize the report as JSON.
+        
+        Args:
+            path (str, optional): File to write the JSON to. Defaults to None.
+        
+        Returns:
+            str: The JSON report.
+        """
+        text = json.dumps(self.report(), indent=2)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+    
+    def clear(self):
+        """Forget the recorded stages."""
+        self.records = []
+
+
+# shared disabled profiler used when no profiler is given
+NULL_PROFILER = StageProfiler(enabled=False)
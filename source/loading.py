@@ -0,0 +1,281 @@
+import os
+import pandas as pd
+from source import cache
+from source.services import canonical_categories, service_key, service_mask
+from source.timestamps import UTC_TIMESTAMP_FORMAT, parse_utc_timestamps, utc_timestamp_strings
+
+# columns used by the gap analysis pipeline, everything else is dropped at parse time
+PIPELINE_COLUMNS = ('tv_id', 'content_id', 'application', 'start_time', 'end_time', 'duration', 'title', 'season_id')
+
+# low-cardinality text columns stored as categoricals instead of one Python string per row
+CATEGORICAL_COLUMNS = ('application', 'network')
+
+# timestamp columns parsed while loading, so cached copies hold them already parsed
+TIMESTAMP_COLUMNS = ('start_time', 'end_time')
+
+DEFAULT_CHUNKSIZE = 1_000_000
+
+
+def _check_csv_path(path_to_data: str):
+    """
+    Validate that the data file exists and is a CSV file.
+    
+    Args:
+        path_to_data (str): Path to the data file.
+        
+    Raises:
+        FileNotFoundError: If the specified file path does not exist.
+        ValueError: If the file format is not CSV.
+    """
+    if not os.path.exists(path_to_data):
+        raise FileNotFoundError(f"The file '{path_to_data}' was not found.")
+    
+    if not path_to_data.endswith('.csv'):
+        raise ValueError("Unsupported file format. Please provide a CSV file.")
+
+
+def parse_timestamps(column: pd.Series) -> pd.Series:
+    """
+    Parse a column of timestamp strings, leaving already parsed columns untouched.
+    
+    Strings are decoded with the fixed-width UTC parser; the number of values that had
+    to go through the general parser is reported.
+    
+    Args:
+        column (pd.Series): Column with timestamp strings or datetimes.
+        
+    Returns:
+        pd.Series: The column as UTC datetimes.
+    """
+    if pd.api.types.is_datetime64_any_dtype(column):
+        return column
+    
+    parsed, n_fallback = parse_utc_timestamps(column)
+    if n_fallback:
+        print(f"{n_fallback} '{column.name}' values did not match '{UTC_TIMESTAMP_FORMAT}' "
+              f"and were parsed with the general parser.")
+    return parsed
+
+
+def format_timestamps(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Write the parsed timestamp columns of a frame back as 'YYYY-MM-DD HH:MM:SS UTC' text.
+    
+    Used for the per-service data outputs, so their timestamps read as in the source CSV
+    rather than as pandas' '+00:00' form.
+    
+    Args:
+        df (pd.DataFrame): Loaded viewing data.
+        
+    Returns:
+        pd.DataFrame: A frame with the timestamp columns as strings, sharing the other columns.
+    """
+    formatted = {column: utc_timestamp_strings(df[column])
+                 for column in TIMESTAMP_COLUMNS
+                 if column in df.columns and pd.api.types.is_datetime64_any_dtype(df[column])}
+    return df.assign(**formatted) if formatted else df
+
+
+def canonical_services(streaming_services: list | None,
+                       alias_index: dict | None) -> list | None:
+    """
+    Resolve requested service names through the alias index.
+    
+    Args:
+        streaming_services (list or None): Requested applications.
+        alias_index (dict or None): Casefolded name -> canonical name (see source.services).
+        
+    Returns:
+        list or None: The canonical names, or streaming_services unchanged without an index.
+    """
+    if streaming_services is None or alias_index is None:
+        return streaming_services
+    return list(dict.fromkeys(alias_index.get(service_key(service), service) for service in streaming_services))
+
+
+def _select(chunk: pd.DataFrame,
+            streaming_services: list | None,
+            application_column: str,
+            columns,
+            alias_index: dict | None = None) -> pd.DataFrame:
+    """
+    Keep the rows of the requested services and the requested columns of a chunk.
+    
+    With an alias index the application column is first mapped to canonical names
+    through its category codes, and the services are selected by comparing codes.
+    
+    Args:
+        chunk (pd.DataFrame): Chunk of viewing data.
+        streaming_services (list or None): Applications to keep, None for all rows.
+        application_column (str): Column name containing application data.
+        columns (list or None): Columns to keep, None for every column.
+        alias_index (dict, optional): Casefolded name -> canonical name. Defaults to
+                                      None (exact names).
+        
+    Returns:
+        pd.DataFrame: The filtered chunk.
+    """
+    if alias_index is not None:
+        chunk = chunk.assign(**{application_column: canonical_categories(chunk[application_column], alias_index)})
+        if streaming_services is not None:
+            chunk = chunk[service_mask(chunk[application_column],
+                                       canonical_services(streaming_services, alias_index))]
+    elif streaming_services is not None:
+        chunk = chunk[chunk[application_column].isin(streaming_services)]
+    if columns is not None:
+        chunk = chunk[[column for column in chunk.columns if column in {*columns, application_column}]]
+    return chunk
+
+
+def _read_csv_options(columns,
+                      application_column: str) -> dict:
+    """
+    Build the pandas.read_csv options for column pruning and parse-time dtypes.
+    
+    Args:
+        columns (list or None): Columns to read, or None for every column.
+        application_column (str): Column name containing application data.
+        
+    Returns:
+        dict: Keyword arguments for pandas.read_csv.
+    """
+    if columns is None:
+        return {'dtype': {column: 'category' for column in CATEGORICAL_COLUMNS}, 'low_memory': False}
+    
+    usecols = list(dict.fromkeys([*columns, application_column]))
+    dtype = {column: 'category' for column in CATEGORICAL_COLUMNS if column in usecols}
+    return {'usecols': usecols, 'dtype': dtype, 'low_memory': False}
+
+
+def iter_viewing_data(path_to_data: str,
+                      streaming_services: list | None = None,
+                      application_column: str = 'application',
+                      columns=None,
+                      chunksize: int = DEFAULT_CHUNKSIZE,
+                      alias_index: dict | None = None):
+    """
+    Stream viewing data from a CSV file in chunks, filtering each chunk as it is read.
+    
+    Only the requested columns are parsed and the service filter is applied chunk by
+    chunk, so memory depends on the chunk size and the number of matching rows rather
+    than on the size of the file. Timestamp columns are parsed as they are read.
+    
+    Args:
+        path_to_data (str): Path to the CSV file containing streaming data.
+        streaming_services (list, optional): Applications to keep. Defaults to None (all rows).
+        application_column (str, optional): Column name containing application data.
+                                          Defaults to 'application'.
+        columns (list, optional): Columns to read. Defaults to None (every column).
+        chunksize (int, optional): Number of rows parsed at a time. Defaults to DEFAULT_CHUNKSIZE.
+        alias_index (dict, optional): Casefolded name -> canonical name, applications are
+                                      mapped to canonical names and case variants of the
+                                      services are kept. Defaults to None (exact names).
+        
+    Yields:
+        pd.DataFrame: Filtered chunks of the file.
+        
+    Raises:
+        FileNotFoundError: If the specified file path does not exist.
+        ValueError: If the file format is not CSV.
+    """
+    _check_csv_path(path_to_data)
+    
+    options = _read_csv_options(columns, application_column)
+    with pd.read_csv(path_to_data, chunksize=chunksize, **options) as reader:
+        for chunk in reader:
+            chunk = _select(chunk, streaming_services, application_column, columns, alias_index)
+            for column in TIMESTAMP_COLUMNS:
+                if column in chunk.columns:
+                    chunk[column] = parse_timestamps(chunk[column])
+            yield chunk
+
+
+def load_viewing_data(path_to_data: str,
+                      streaming_services: list | None = None,
+                      application_column: str = 'application',
+                      columns=None,
+                      chunksize: int = DEFAULT_CHUNKSIZE,
+                      use_cache: bool = True,
+                      cache_dir: str | None = None,
+                      alias_index: dict | None = None,
+                      verify_hash: bool = False) -> pd.DataFrame:
+    """
+    Load viewing data from a CSV file into a pandas DataFrame.
+    
+    The file is read in chunks through iter_viewing_data; categorical columns are
+    re-categorized once the chunks are combined, since every chunk infers its own
+    categories.
+    
+    When pyarrow is installed the requested columns of the file are also cached as
+    parquet, partitioned by application (see source.cache). Later loads of the same
+    columns read only the partitions they need from the cache until the CSV changes.
+    
+    Args:
+        path_to_data (str): Path to the CSV file containing streaming data.
+        streaming_services (list, optional): Applications to keep. Defaults to None (all rows).
+        application_column (str, optional): Column name containing application data.
+                                          Defaults to 'application'.
+        columns (list, optional): Columns to read. Defaults to None (every column).
+        chunksize (int, optional): Number of rows parsed at a time. Defaults to DEFAULT_CHUNKSIZE.
+        use_cache (bool, optional): Read from and populate the columnar cache. Defaults to True.
+        cache_dir (str, optional): Cache root. Defaults to a '.cache' folder next to the file.
+        alias_index (dict, optional): Casefolded name -> canonical name, applications are
+                                      mapped to canonical names and case variants of the
+                                      services are kept. Defaults to None (exact names).
+        verify_hash (bool, optional): Drop the cache when the content hash of the file
+                                      changed, not only its size or modification time.
+                                      Reads the whole file to hash it. Defaults to False.
+        
+    Returns:
+        pd.DataFrame: The loaded DataFrame from the CSV file.
+        
+    Raises:
+        FileNotFoundError: If the specified file path does not exist.
+        ValueError: If the file format is not CSV.
+    """
+    _check_csv_path(path_to_data)
+    use_cache = use_cache and cache.is_available()
+    
+    df = None
+    if use_cache:
+        df = cache.read_cached(path_to_data,
+                               streaming_services=streaming_services,
+                               partition_column=application_column,
+                               columns=columns,
+                               cache_dir=cache_dir,
+                               verify_hash=verify_hash,
+                               alias_index=alias_index)
+        if df is not None and alias_index is not None:
+            df[application_column] = canonical_categories(df[application_column], alias_index)
+    
+    if df is None:
+        if use_cache:
+            # every service is cached, but only the requested columns are parsed
+            full_chunks = iter_viewing_data(path_to_data,
+                                            application_column=application_column,
+                                            columns=columns,
+                                            chunksize=chunksize)
+            chunks = [_select(chunk, streaming_services, application_column, columns, alias_index)
+                      for chunk in cache.write_through(path_to_data, full_chunks,
+                                                       partition_column=application_column,
+                                                       columns=columns,
+                                                       cache_dir=cache_dir,
+                                                       verify_hash=verify_hash)]
+        else:
+            chunks = list(iter_viewing_data(path_to_data,
+                                            streaming_services=streaming_services,
+                                            application_column=application_column,
+                                            columns=columns,
+                                            chunksize=chunksize,
+                                            alias_index=alias_index))
+        if chunks:
+            df = pd.concat(chunks, ignore_index=True)
+        else:
+            df = pd.read_csv(path_to_data, nrows=0, **_read_csv_options(columns, application_column))
+    
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype('category')
+    
+    print('Dataframe loaded successfully.')
+    return df
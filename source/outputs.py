@@ -0,0 +1,295 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - the parquet format is unavailable
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - the csv.zst format is unavailable
+    zstandard = None
+
+# rows serialized at a time, so a large frame is never held as one CSV string or table
+DEFAULT_CHUNK_ROWS = 500_000
+
+DEFAULT_ZSTD_LEVEL = 3
+
+_NAT = np.iinfo(np.int64).min
+
+
+def _whole_seconds(ns: np.ndarray) -> bool:
+    return not (ns % 1_000_000_000).any()
+
+
+def _fast_csv_columns(df: pd.DataFrame) -> dict:
+    """
+    Find the timestamp and duration columns whose CSV text can be built with numpy.
+    
+    pandas formats datetime64 and timedelta64 values one by one, which dominates the
+    time of writing the gap analysis. The vectorized formatting reproduces the text
+    of to_csv and is only used where that is simple: UTC timestamps and non-negative
+    durations in whole seconds, with durations that are not all whole days (those are
+    written as 'N days' alone). The checks run on whole columns, as to_csv does.
+    
+    Returns:
+        dict: Column name -> 'datetime' or 'timedelta'.
+    """
+    columns = {}
+    for column, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.DatetimeTZDtype) and str(dtype.tz) == 'UTC':
+            ns = df[column].to_numpy(dtype='datetime64[ns]').view('i8')
+            if _whole_seconds(ns[ns != _NAT]):
+                columns[column] = 'datetime'
+        elif dtype == 'timedelta64[ns]':
+            ns = df[column].to_numpy().view('i8')
+            ns = ns[ns != _NAT]
+            if len(ns) and _whole_seconds(ns) and (ns >= 0).all() and (ns % (86_400 * 1_000_000_000)).any():
+                columns[column] = 'timedelta'
+    return columns
+
+
+def _two_digits(values: np.ndarray) -> np.ndarray:
+    return np.char.zfill(values.astype(str), 2)
+
+
+def _format_datetimes(ns: np.ndarray) -> np.ndarray:
+    """UTC epoch nanoseconds -> 'YYYY-MM-DD HH:MM:SS+00:00' (None for NaT)."""
+    if len(ns) == 0:
+        return np.empty(0, dtype=object)
+    iso = np.datetime_as_string(ns.view('datetime64[ns]').astype('datetime64[s]'), unit='s')
+    chars = iso.view(np.uint32).reshape(len(iso), -1).copy()
+    chars[:, 10] = ord(' ')
+    text = np.char.add(chars.view(iso.dtype).ravel(), '+00:00').astype(object)
+    text[ns == _NAT] = None
+    return text
+
+
+def _format_timedeltas(ns: np.ndarray) -> np.ndarray:
+    """Non-negative nanoseconds -> 'D days HH:MM:SS' (None for NaT)."""
+    seconds = np.where(ns == _NAT, 0, ns) // 1_000_000_000
+    days, seconds = np.divmod(seconds, 86_400)
+    hours, seconds = np.divmod(seconds, 3_600)
+    minutes, seconds = np.divmod(seconds, 60)
+    text = np.char.add(days.astype(str), ' days ')
+    for part, separator in [(hours, ':'), (minutes, ':'), (seconds, '')]:
+        text = np.char.add(np.char.add(text, _two_digits(part)), separator)
+    text = text.astype(object)
+    text[ns == _NAT] = None
+    return text
+
+
+def _write_csv_chunks(df: pd.DataFrame,
+                      handle,
+                      chunk_rows: int):
+    """Write df to an open text handle chunk_rows rows at a time."""
+    fast_columns = _fast_csv_columns(df)
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        if fast_columns:
+            formatted = {}
+            for column, kind in fast_columns.items():
+                if kind == 'datetime':
+                    formatted[column] = _format_datetimes(chunk[column].to_numpy(dtype='datetime64[ns]').view('i8'))
+                else:
+                    formatted[column] = _format_timedeltas(chunk[column].to_numpy().view('i8'))
+            chunk = chunk.assign(**formatted)
+        chunk.to_csv(handle, index=False, header=start == 0)
+
+
+def write_csv(df: pd.DataFrame,
+              path: str,
+              chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """
+    Write a DataFrame as CSV, serializing chunk_rows rows at a time.
+    
+    The text is the same as df.to_csv(path, index=False).
+    
+    Args:
+        df (pd.DataFrame): Frame to write.
+        path (str): Destination path.
+        chunk_rows (int, optional): Rows serialized at a time. Defaults to DEFAULT_CHUNK_ROWS.
+    """
+    with open(path, 'w', newline='') as handle:
+        _write_csv_chunks(df, handle, chunk_rows)
+
+
+def write_csv_zst(df: pd.DataFrame,
+                  path: str,
+                  chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                  level: int = DEFAULT_ZSTD_LEVEL):
+    """
+    Write a DataFrame as zstd-compressed CSV, compressing the chunks as they are serialized.
+    
+    Args:
+        df (pd.DataFrame): Frame to write.
+        path (str): Destination path.
+        chunk_rows (int, optional): Rows serialized at a time. Defaults to DEFAULT_CHUNK_ROWS.
+        level (int, optional): zstd compression level. Defaults to DEFAULT_ZSTD_LEVEL.
+    """
+    with zstandard.open(path, 'w', cctx=zstandard.ZstdCompressor(level=level), newline='') as handle:
+        _write_csv_chunks(df, handle, chunk_rows)
+
+
+def write_parquet(df: pd.DataFrame,
+                  path: str,
+                  chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """
+    Write a DataFrame as Parquet with one row group per chunk_rows rows.
+    
+    The schema is inferred once from the whole frame, so object columns that are
+    empty in some row groups keep their type.
+    
+    Args:
+        df (pd.DataFrame): Frame to write.
+        path (str): Destination path.
+        chunk_rows (int, optional): Rows per row group. Defaults to DEFAULT_CHUNK_ROWS.
+    """
+    schema = pyarrow.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(path, schema, compression='zstd') as writer:
+        for start in range(0, max(len(df), 1), chunk_rows):
+            chunk = df.iloc[start:start + chunk_rows]
+            writer.write_table(pyarrow.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+# output format -> (writer, module it needs)
+WRITERS = {
+    'csv': (write_csv, pd),
+    'csv.zst': (write_csv_zst, zstandard),
+    'parquet': (write_parquet, pyarrow),
+}
+
+
+def check_format(output_format: str):
+    """
+    Validate that an output format is known and its optional dependency installed.
+    
+    Args:
+        output_format (str): One of the WRITERS keys.
+    
+    Raises:
+        ValueError: If the format is unknown.
+        ImportError: If the format needs a package that is not installed.
+    """
+    if output_format not in WRITERS:
+        raise ValueError(f"Unsupported output format '{output_format}', expected one of {', '.join(WRITERS)}.")
+    if WRITERS[output_format][1] is None:
+        package = 'pyarrow' if output_format == 'parquet' else 'zstandard'
+        raise ImportError(f"The '{output_format}' output format needs the {package} package.")
+
+
+class OutputWriter:
+    """
+    Write named result frames to an output directory concurrently on a thread pool.
+    
+    Frames are written as '<name>.<output_format>'. The serialization of CSV is
+    mostly bound by the interpreter, while zstd compression and Parquet encoding
+    release the GIL, so the compressed and columnar formats benefit the most from
+    the concurrent writes. Frames must be fully built before they are submitted,
+    the lazy GapAnalysis properties are not safe to compute from several threads.
+    
+    Attributes:
+        output_dir (str): Directory the files are written to.
+        output_format (str): 'csv', 'csv.zst' or 'parquet'.
+        chunk_rows (int): Rows serialized at a time.
+        paths (list): Paths of the submitted files, in order.
+    
+    Example:
+        >>> with OutputWriter('./output/', output_format='parquet') as writer:
+        ...     writer.submit('Netflix_gap_analysis', analyzer.gap_analysis_df)
+        ...     writer.submit('Netflix_frequency_analysis', analyzer.frequency_df)
+    """
+    
+    def __init__(self,
+                 output_dir: str,
+                 output_format: str = 'csv',
+                 max_workers: int = 4,
+                 chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        """
+        Initialize the writer and its thread pool.
+        
+        Args:
+            output_dir (str): Directory the files are written to, created if missing.
+            output_format (str, optional): 'csv', 'csv.zst' or 'parquet'. Defaults to 'csv'.
+            max_workers (int, optional): Files written at the same time. Defaults to 4.
+            chunk_rows (int, optional): Rows serialized at a time (row group size for
+                                        Parquet). Defaults to DEFAULT_CHUNK_ROWS.
+        
+        Raises:
+            ValueError: If the output format is unknown.
+            ImportError: If the output format needs a package that is not installed.
+        """
+        check_format(output_format)
+        os.makedirs(output_dir, exist_ok=True)
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.chunk_rows = chunk_rows
+        self.paths = []
+        self._futures = []
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='output')
+    
+    def path(self, name: str) -> str:
+        """
+        Return the path a frame submitted under name is written to.
+        
+        Args:
+            name (str): Output name, e.g. 'Netflix_subscription_types'.
+        
+        Returns:
+            str: Path of the output file.
+        """
+        return os.path.join(self.output_dir, f'{name}.{self.output_format}')
+    
+    def submit(self, name: str, df: pd.DataFrame):
+        """
+        Schedule the write of a frame.
+        
+        Args:
+            name (str): Output name, the file extension is added.
+            df (pd.DataFrame): Frame to write.
+        
+        Returns:
+            concurrent.futures.Future: Future of the write.
+        """
+        writer = WRITERS[self.output_format][0]
+        path = self.path(name)
+        future = self._executor.submit(writer, df, path, self.chunk_rows)
+        self.paths.append(path)
+        self._futures.append(future)
+        return future
+    
+    def wait(self) -> list:
+        """
+        Wait for every submitted write.
+        
+        Returns:
+            list: Paths of the written files.
+        
+        Raises:
+            Exception: The first error raised by a write.
+        """
+        futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+        return list(self.paths)
+    
+    def close(self):
+        """Wait for the submitted writes and shut the thread pool down."""
+        try:
+            self.wait()
+        finally:
+            self._executor.shutdown(wait=True)
+    
+    def __enter__(self) -> 'OutputWriter':
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+        return False
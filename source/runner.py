@@ -0,0 +1,333 @@
+import argparse
+import asyncio
+import glob
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from source.analysis import GapAnalysis
+from source.cache import file_fingerprint
+from source.loading import format_timestamps
+from source.outputs import OutputWriter, check_format
+from source.services import build_alias_index
+
+logger = logging.getLogger(__name__)
+
+# bumped when the outputs of a job change for the same input and options
+RUNNER_VERSION = 1
+
+
+def job_dir(output_dir: str,
+            path_to_data: str) -> str:
+    """
+    Return the output directory of the jobs of one input file.
+    
+    The directory is named after the file and a short hash of its absolute path, so
+    files with the same name in different directories do not share their outputs.
+    
+    Args:
+        output_dir (str): Root output directory.
+        path_to_data (str): Path to the input CSV file.
+    
+    Returns:
+        str: '<output_dir>/<file name without extension>-<path hash>'.
+    """
+    source = os.path.abspath(path_to_data)
+    key = hashlib.sha1(source.encode()).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(output_dir, f'{stem}-{key}')
+
+
+def _manifest_path(output_dir: str,
+                   path_to_data: str,
+                   streaming_service: str) -> str:
+    return os.path.join(job_dir(output_dir, path_to_data), f'{streaming_service}_manifest.json')
+
+
+def _job_manifest(path_to_data: str,
+                  streaming_service: str,
+                  output_format: str,
+                  verify_hash: bool) -> dict:
+    """Manifest content of a job, compared to the saved one to find up-to-date outputs."""
+    return {'version': RUNNER_VERSION,
+            'source': os.path.abspath(path_to_data),
+            'fingerprint': file_fingerprint(path_to_data, with_hash=verify_hash),
+            'streaming_service': streaming_service,
+            'output_format': output_format}
+
+
+def is_up_to_date(output_dir: str,
+                  path_to_data: str,
+                  streaming_service: str,
+                  output_format: str = 'csv',
+                  verify_hash: bool = False) -> bool:
+    """
+    Check whether the outputs of a job were written from the current input file.
+    
+    A job writes a manifest with the fingerprint of its input (see
+    source.cache.file_fingerprint) once all of its outputs are written.
+    
+    Args:
+        output_dir (str): Root output directory.
+        path_to_data (str): Path to the input CSV file.
+        streaming_service (str): Analyzed streaming service.
+        output_format (str, optional): Output format of the job. Defaults to 'csv'.
+        verify_hash (bool, optional): Compare the content hash of the input as well as
+                                      its size and modification time. Defaults to False.
+    
+    Returns:
+        bool: True if the manifest matches the input and every output exists.
+    """
+    try:
+        with open(_manifest_path(output_dir, path_to_data, streaming_service)) as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        return False
+    
+    current = _job_manifest(path_to_data, streaming_service, output_format, verify_hash)
+    fingerprint = saved.pop('fingerprint', {})
+    if any(fingerprint.get(key) != value for key, value in current.pop('fingerprint').items()):
+        return False
+    if any(saved.get(key) != value for key, value in current.items()):
+        return False
+    return all(os.path.exists(path) for path in saved.get('outputs', []))
+
+
+def run_job(path_to_data: str,
+            streaming_service: str,
+            output_dir: str,
+            output_format: str = 'csv',
+            use_cache: bool = True,
+            verify_hash: bool = False) -> dict:
+    """
+    Analyze one streaming service of one input file and write its outputs.
+    
+    Every frame is handed to an OutputWriter as soon as it is built, so writing it
+    overlaps with computing the next one. The manifest is written last, so an
+    interrupted job is run again.
+    
+    Args:
+        path_to_data (str): Path to the input CSV file.
+        streaming_service (str): Streaming service to analyze; case variants of the
+                                 name in the data are included (see source.services).
+        output_dir (str): Root output directory, the files go to job_dir(output_dir, path_to_data).
+        output_format (str, optional): 'csv', 'csv.zst' or 'parquet'. Defaults to 'csv'.
+        use_cache (bool, optional): Use the columnar cache of the input file. Defaults to True.
+        verify_hash (bool, optional): Store the content hash of the input in the
+                                      manifest and verify it against the columnar cache.
+                                      Defaults to False.
+    
+    Returns:
+        dict: 'rows' (rows of the service read from the input, including TVs with a
+            single session that the analysis drops), 'tvs' (classified TVs) and 'outputs'.
+    """
+    manifest = _job_manifest(path_to_data, streaming_service, output_format, verify_hash)
+    analyzer = GapAnalysis(path_to_data,
+                           streaming_service,
+                           use_cache=use_cache,
+                           alias_index=build_alias_index([streaming_service]),
+                           verify_hash=verify_hash)
+    
+    with OutputWriter(job_dir(output_dir, path_to_data), output_format=output_format) as writer:
+        writer.submit(f'{streaming_service}_data', format_timestamps(analyzer.df))
+        writer.submit(f'{streaming_service}_gap_analysis', analyzer.gap_analysis_df)
+        writer.submit(f'{streaming_service}_frequency_analysis', analyzer.frequency_df)
+        subscription_types = analyzer.categorize_subscription_types()
+        writer.submit(f'{streaming_service}_subscription_types', subscription_types)
+        analyzer.release()
+    
+    manifest['outputs'] = list(writer.paths)
+    manifest_path = _manifest_path(output_dir, path_to_data, streaming_service)
+    with open(f'{manifest_path}.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f'{manifest_path}.tmp', manifest_path)
+    return {'rows': analyzer.loaded_rows, 'tvs': len(subscription_types), 'outputs': manifest['outputs']}
+
+
+class BatchRunner:
+    """
+    Run GapAnalysis jobs for every (input file, streaming service) pair on a bounded
+    pool of worker processes.
+    
+    Jobs are scheduled from an asyncio event loop: the analysis of a job runs in a
+    worker process while its outputs are written by threads of that process, and the
+    other workers keep computing, so throughput grows with the number of cores. Jobs
+    whose outputs are up to date with their input file are skipped. When the columnar
+    cache is used, the jobs of a file run one at a time until one of them has run
+    successfully, which leaves the cache built, and the other services of that file
+    then start together, reading the cache instead of the CSV.
+    
+    Attributes:
+        output_dir (str): Root output directory.
+        output_format (str): 'csv', 'csv.zst' or 'parquet'.
+        max_workers (int): Jobs run at the same time.
+        results (list): One dict per job once run() returned, see run().
+    
+    Example:
+        >>> runner = BatchRunner('./output/', max_workers=8)
+        >>> results = runner.run(sorted(glob.glob('./data/2023-*.csv')), ['Netflix', 'Hulu'])
+        >>> print(runner.summary())
+    """
+    
+    def __init__(self,
+                 output_dir: str,
+                 output_format: str = 'csv',
+                 max_workers: int | None = None,
+                 use_cache: bool = True,
+                 verify_hash: bool = False,
+                 force: bool = False):
+        """
+        Initialize the runner settings.
+        
+        Args:
+            output_dir (str): Root output directory, every input file gets a sub-directory.
+            output_format (str, optional): 'csv', 'csv.zst' or 'parquet'. Defaults to 'csv'.
+            max_workers (int, optional): Worker processes. Defaults to None (os.cpu_count()).
+            use_cache (bool, optional): Use the columnar cache of the input files.
+                                        Defaults to True.
+            verify_hash (bool, optional): Fingerprint inputs by content as well as by size
+                                          and modification time. Defaults to False.
+            force (bool, optional): Run jobs even when their outputs are up to date.
+                                    Defaults to False.
+        
+        Raises:
+            ValueError: If the output format is unknown.
+            ImportError: If the output format needs a package that is not installed.
+        """
+        check_format(output_format)
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.use_cache = use_cache
+        self.verify_hash = verify_hash
+        self.force = force
+        self.results = []
+        self.seconds = 0.0
+    
+    def run(self,
+            paths: list,
+            streaming_services: list) -> list:
+        """
+        Run every (input file, streaming service) job and wait for them.
+        
+        A failed job is reported in its result and does not stop the others.
+        
+        Args:
+            paths (list): Input CSV files.
+            streaming_services (list): Streaming services to analyze in every file.
+        
+        Returns:
+            list: One dict per job in (file, service) order, with 'path',
+                'streaming_service', 'status' ('done', 'skipped' or 'failed'),
+                'seconds', 'rows', 'tvs' and 'error'.
+        """
+        started = time.perf_counter()
+        self.results = asyncio.run(self._run(list(paths), list(streaming_services)))
+        self.seconds = time.perf_counter() - started
+        return self.results
+    
+    async def _run(self,
+                   paths: list,
+                   streaming_services: list) -> list:
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            files = [self._run_file(loop, pool, path, streaming_services) for path in paths]
+            return [result for results in await asyncio.gather(*files) for result in results]
+    
+    async def _run_file(self,
+                        loop: asyncio.AbstractEventLoop,
+                        pool: ProcessPoolExecutor,
+                        path: str,
+                        streaming_services: list) -> list:
+        """Run the jobs of one file, one at a time until the first successful one built the cache."""
+        jobs = [self._run_job(loop, pool, path, service) for service in streaming_services]
+        results = []
+        if self.use_cache:
+            # skipped and failed jobs leave no cache behind, so the next job builds it
+            while jobs and (not results or results[-1]['status'] != 'done'):
+                results.append(await jobs.pop(0))
+        return results + list(await asyncio.gather(*jobs))
+    
+    async def _run_job(self,
+                       loop: asyncio.AbstractEventLoop,
+                       pool: ProcessPoolExecutor,
+                       path: str,
+                       streaming_service: str) -> dict:
+        result = {'path': path, 'streaming_service': streaming_service, 'status': 'skipped',
+                  'seconds': 0.0, 'rows': 0, 'tvs': 0, 'error': None}
+        up_to_date = await loop.run_in_executor(None, is_up_to_date, self.output_dir, path, streaming_service,
+                                                self.output_format, self.verify_hash)
+        if up_to_date and not self.force:
+            logger.info('%s / %s: up to date, skipped', path, streaming_service)
+            return result
+        
+        started = time.perf_counter()
+        try:
+            outcome = await loop.run_in_executor(pool, run_job, path, streaming_service, self.output_dir,
+                                                 self.output_format, self.use_cache, self.verify_hash)
+        except Exception as e:
+            result.update(status='failed', error=f'{type(e).__name__}: {e}')
+            logger.error('%s / %s: failed, %s', path, streaming_service, result['error'])
+        else:
+            result.update(status='done', rows=outcome['rows'], tvs=outcome['tvs'])
+            logger.info('%s / %s: %s rows, %s TVs', path, streaming_service, outcome['rows'], outcome['tvs'])
+        result['seconds'] = time.perf_counter() - started
+        return result
+    
+    def summary(self) -> str:
+        """
+        Summarize the last run: jobs per status and throughput of the jobs that ran.
+        
+        Throughput counts the rows of the analyzed service loaded from each input (see
+        run_job): rows of other services are left out, rows of TVs with a single
+        session are counted.
+        
+        Returns:
+            str: e.g. '12 jobs (10 done, 2 skipped, 0 failed) in 41.2 s: 1,204,551 rows/s, 0.24 jobs/s'.
+        """
+        done = [result for result in self.results if result['status'] == 'done']
+        counts = {status: sum(result['status'] == status for result in self.results)
+                  for status in ('done', 'skipped', 'failed')}
+        rows = sum(result['rows'] for result in done)
+        seconds = max(self.seconds, 1e-9)
+        return (f"{len(self.results)} jobs ({counts['done']} done, {counts['skipped']} skipped, "
+                f"{counts['failed']} failed) in {self.seconds:.1f} s: "
+                f"{rows / seconds:,.0f} rows/s, {len(done) / seconds:.2f} jobs/s")
+
+
+def main(argv: list | None = None) -> int:
+    """
+    Command line entry point, e.g.
+    python -m source.runner './data/*.csv' --services Netflix Hulu --workers 8
+    
+    Returns:
+        int: Exit status, 1 if a job failed.
+    """
+    parser = argparse.ArgumentParser(description='Run the gap analysis for every input file and streaming service.')
+    parser.add_argument('inputs', nargs='+', help='input CSV files or glob patterns')
+    parser.add_argument('--services', nargs='+', default=['Netflix', 'Hulu'])
+    parser.add_argument('--output', default='./output/', help='root output directory')
+    parser.add_argument('--format', default='csv', choices=['csv', 'csv.zst', 'parquet'])
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--no-cache', action='store_true', help='do not use the columnar cache of the inputs')
+    parser.add_argument('--verify-hash', action='store_true', help='fingerprint inputs by content')
+    parser.add_argument('--force', action='store_true', help='run jobs whose outputs are up to date')
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    paths = sorted({path for pattern in args.inputs for path in (glob.glob(pattern) or [pattern])})
+    runner = BatchRunner(args.output,
+                         output_format=args.format,
+                         max_workers=args.workers,
+                         use_cache=not args.no_cache,
+                         verify_hash=args.verify_hash,
+                         force=args.force)
+    results = runner.run(paths, args.services)
+    print(runner.summary())
+    return int(any(result['status'] == 'failed' for result in results))
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
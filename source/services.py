@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+
+
+def service_key(name) -> str:
+    """
+    Return the lookup key of a service name, its casefolded form without surrounding spaces.
+    
+    Args:
+        name: Service name as found in the data.
+    
+    Returns:
+        str: Lookup key, e.g. 'netflix' for 'NETFLIX '.
+    """
+    return str(name).strip().casefold()
+
+
+def build_alias_index(streaming_services,
+                      known_values=()) -> dict:
+    """
+    Build the alias index mapping casefolded service names to their canonical spelling.
+    
+    The requested streaming services are canonical for their own key. Other values
+    (e.g. the unique application and network values found while exploring the data)
+    seed the index with their first spelling, so that their case variants are merged
+    as well.
+    
+    Args:
+        streaming_services (list): Canonical service names, e.g. ['Netflix', 'Hulu'].
+        known_values (iterable, optional): Other spellings found in the data. Defaults to ().
+    
+    Returns:
+        dict: Casefolded name -> canonical name.
+    
+    Example:
+        >>> build_alias_index(['Netflix'], ['NETFLIX', 'netflix', 'HBO', 'hbo'])
+        {'netflix': 'Netflix', 'hbo': 'HBO'}
+    """
+    alias_index = {service_key(service): service for service in streaming_services}
+    for value in known_values:
+        if not pd.isna(value):
+            alias_index.setdefault(service_key(value), value)
+    return alias_index
+
+
+def alias_index_from_profile(profile: dict,
+                             streaming_services,
+                             columns=('application', 'network')) -> dict:
+    """
+    Build the alias index from the column profile of source.exploring.profile_csv.
+    
+    Args:
+        profile (dict): Profile returned by profile_csv.
+        streaming_services (list): Canonical service names.
+        columns (tuple, optional): Profiled columns whose spellings seed the index.
+                                   Defaults to ('application', 'network').
+    
+    Returns:
+        dict: Casefolded name -> canonical name.
+    """
+    known_values = [spellings[0]
+                    for column in columns
+                    for spellings in (profile['columns'].get(column, {}).get('values') or {}).values()]
+    return build_alias_index(streaming_services, known_values)
+
+
+def canonical_categories(column: pd.Series,
+                         alias_index: dict) -> pd.Series:
+    """
+    Map a column to canonical service names, as a categorical.
+    
+    Only the categories are looked up in the alias index, the rows are remapped by
+    their integer codes. Values without an alias are kept as they are.
+    
+    Args:
+        column (pd.Series): Application (or network) column, categorical or not.
+        alias_index (dict): Casefolded name -> canonical name.
+    
+    Returns:
+        pd.Series: Categorical column of canonical names.
+    """
+    if not isinstance(column.dtype, pd.CategoricalDtype):
+        column = column.astype('category')
+    categories = column.cat.categories
+    canonical = [alias_index.get(service_key(value), value) for value in categories]
+    inverse, uniques = pd.factorize(pd.Index(canonical, dtype=object))
+    codes = column.cat.codes.to_numpy()
+    codes = np.where(codes < 0, -1, inverse[np.maximum(codes, 0)]) if len(inverse) else codes
+    return pd.Series(pd.Categorical.from_codes(codes, categories=uniques), index=column.index, name=column.name)
+
+
+def service_mask(column: pd.Series,
+                 streaming_services) -> np.ndarray:
+    """
+    Select the rows of a categorical column whose value is one of the streaming services.
+    
+    The services are resolved to category codes once, so the rows are compared as
+    integers rather than as strings.
+    
+    Args:
+        column (pd.Series): Categorical column, e.g. from canonical_categories.
+        streaming_services (list): Values to keep.
+    
+    Returns:
+        np.ndarray: Boolean mask of the selected rows.
+    """
+    wanted = column.cat.categories.get_indexer(list(streaming_services))
+    return np.isin(column.cat.codes.to_numpy(), wanted[wanted >= 0])
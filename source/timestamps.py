@@ -0,0 +1,156 @@
+import numpy as np
+import pandas as pd
+
+# every timestamp in data.csv looks like '2022-12-08 15:34:36 UTC'
+UTC_TIMESTAMP_FORMAT = 'YYYY-MM-DD HH:MM:SS UTC'
+
+_WIDTH = len(UTC_TIMESTAMP_FORMAT)
+_DIGIT_POSITIONS = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]
+_LITERALS = {4: '-', 7: '-', 10: ' ', 13: ':', 16: ':', 19: ' ', 20: 'U', 21: 'T', 22: 'C'}
+
+_NAT = np.iinfo(np.int64).min
+
+# rows decoded at a time, keeps the fixed-width buffers small
+_BLOCK_ROWS = 1 << 20
+
+
+# days per month, index 0 unused
+_DAYS_IN_MONTH = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int64)
+
+
+def _two_digits(digits: list, position: int) -> np.ndarray:
+    return digits[position] * 10 + digits[position + 1]
+
+
+def _days_from_civil(year: np.ndarray,
+                     month: np.ndarray,
+                     day: np.ndarray) -> np.ndarray:
+    """
+    Convert proleptic Gregorian dates to days since 1970-01-01 (H. Hinnant's algorithm).
+    
+    Args:
+        year (np.ndarray): Years.
+        month (np.ndarray): Months, 1 to 12.
+        day (np.ndarray): Days of the month.
+        
+    Returns:
+        np.ndarray: Days since the epoch.
+    """
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * np.where(month > 2, month - 3, month + 9) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146_097 + day_of_era - 719_468
+
+
+def _parse_fixed_width(text: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Decode a block of fixed-width 'YYYY-MM-DD HH:MM:SS UTC' byte strings.
+    
+    Args:
+        text (np.ndarray): Byte strings of dtype 'S24' (one spare byte to detect longer values).
+        
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Nanoseconds since the epoch and a mask of the
+            rows that matched the format exactly.
+    """
+    raw = text.view(np.uint8).reshape(len(text), _WIDTH + 1)
+    
+    matched = raw[:, _WIDTH] == 0
+    for position, literal in _LITERALS.items():
+        matched &= raw[:, position] == ord(literal)
+    
+    digits = {}
+    for position in _DIGIT_POSITIONS:
+        # uint8 arithmetic wraps around, so anything below '0' also ends up above 9
+        digit = raw[:, position] - np.uint8(ord('0'))
+        matched &= digit <= 9
+        digits[position] = digit.astype(np.int64)
+    
+    year = _two_digits(digits, 0) * 100 + _two_digits(digits, 2)
+    month = _two_digits(digits, 5)
+    day = _two_digits(digits, 8)
+    hour = _two_digits(digits, 11)
+    minute = _two_digits(digits, 14)
+    second = _two_digits(digits, 17)
+    
+    leap_year = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    days_in_month = _DAYS_IN_MONTH[np.clip(month, 0, 12)] + ((month == 2) & leap_year)
+    matched &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= days_in_month)
+    matched &= (hour < 24) & (minute < 60) & (second < 60)
+    # keep clear of the int64 nanosecond limits (1677-09-21 to 2262-04-11)
+    matched &= (year >= 1678) & (year <= 2261)
+    
+    seconds = _days_from_civil(year, month, day) * 86_400 + hour * 3_600 + minute * 60 + second
+    return np.where(matched, seconds * 1_000_000_000, _NAT), matched
+
+
+def parse_utc_timestamps(column: pd.Series) -> tuple[pd.Series, int]:
+    """
+    Parse 'YYYY-MM-DD HH:MM:SS UTC' timestamps with vectorized fixed-width slicing.
+    
+    Values are decoded straight from their bytes into int64 nanoseconds. Values that
+    do not match the format exactly (padding, other layouts, non-ASCII text) are
+    stripped and handed to pandas' general parser.
+    
+    Args:
+        column (pd.Series): Column of timestamp strings (missing values allowed).
+        
+    Returns:
+        tuple[pd.Series, int]: The parsed UTC datetimes and the number of values that
+            needed the general parser.
+            
+    Example:
+        >>> parsed, n_fallback = parse_utc_timestamps(pd.Series(['2022-12-08 15:34:36 UTC', ' 2022-12-08 15:34:36 UTC']))
+        >>> n_fallback
+        1
+    """
+    values = column.to_numpy(dtype=object)
+    missing = pd.isna(values)
+    nanoseconds = np.full(len(values), _NAT, dtype=np.int64)
+    fallback = np.zeros(len(values), dtype=bool)
+    
+    for start in range(0, len(values), _BLOCK_ROWS):
+        block = slice(start, start + _BLOCK_ROWS)
+        block_values = np.where(missing[block], '', values[block])
+        try:
+            text = block_values.astype(f'S{_WIDTH + 1}')
+        except (UnicodeEncodeError, TypeError):
+            # blank out the values that are not ASCII strings, only those take the general parser
+            ascii_values = np.fromiter((isinstance(value, str) and value.isascii() for value in block_values),
+                                       dtype=bool, count=len(block_values))
+            text = np.where(ascii_values, block_values, '').astype(f'S{_WIDTH + 1}')
+        else:
+            ascii_values = True
+        nanoseconds[block], matched = _parse_fixed_width(text)
+        fallback[block] = ~(matched & ascii_values) & ~missing[block]
+    
+    n_fallback = int(fallback.sum())
+    if n_fallback:
+        others = pd.to_datetime(column[fallback].astype(str).str.strip(), utc=True, format='mixed')
+        nanoseconds[fallback] = others.to_numpy(dtype='datetime64[ns]').view(np.int64)
+    
+    parsed = pd.Series(nanoseconds.view('datetime64[ns]'), index=column.index, name=column.name)
+    return parsed.dt.tz_localize('UTC'), n_fallback
+
+
+def utc_timestamp_strings(column: pd.Series) -> pd.Series:
+    """
+    Format UTC datetimes as 'YYYY-MM-DD HH:MM:SS UTC' strings, the text they were parsed from.
+    
+    Args:
+        column (pd.Series): Column of UTC datetimes in whole seconds (missing values allowed).
+        
+    Returns:
+        pd.Series: Column of timestamp strings, None where the datetime is missing.
+        
+    Example:
+        >>> utc_timestamp_strings(pd.Series(pd.to_datetime(['2022-12-08 15:34:36'], utc=True))).tolist()
+        ['2022-12-08 15:34:36 UTC']
+    """
+    values = column.to_numpy(dtype='datetime64[ns]')
+    iso = np.datetime_as_string(values.astype('datetime64[s]'), unit='s')
+    text = np.char.add(np.char.replace(iso, 'T', ' '), ' UTC').astype(object)
+    text[np.isnat(values)] = None
+    return pd.Series(text, index=column.index, name=column.name)
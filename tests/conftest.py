@@ -0,0 +1,22 @@
+import os
+
+import pytest
+
+from benchmarks.synthetic import make_viewing_frame, write_viewing_csv
+
+
+@pytest.fixture(scope='session')
+def viewing_csv(tmp_path_factory) -> str:
+    """A small viewing file with Netflix and Hulu rows."""
+    path = os.path.join(tmp_path_factory.mktemp('data'), 'data.csv')
+    df = make_viewing_frame(6_000, applications=['Netflix', 'Hulu'])
+    df.drop(columns='tv_content_id').to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture(scope='session')
+def realistic_csv(tmp_path_factory) -> str:
+    """A small data.csv-shaped file with realistic session lengths and application shares."""
+    path = os.path.join(tmp_path_factory.mktemp('data'), 'realistic.csv')
+    write_viewing_csv(path, 20_000, chunk_rows=10_000, realistic=True)
+    return path
@@ -0,0 +1,66 @@
+"""
+Reference implementations of the per-session and per-tv_id loops that the vectorized
+engine replaced, used to check that its results did not change.
+"""
+import warnings
+
+import pandas as pd
+
+from source.analysis import GAP_ANALYSIS_COLUMNS
+
+
+def legacy_gap_analysis(df: pd.DataFrame) -> pd.DataFrame:
+    """Reference implementation: one boolean mask and one timestamp parse per session."""
+    sub_dfs = []
+    for value in df['tv_content_id'].unique():
+        sub_df = df[df['tv_content_id'] == value].reset_index(drop=True)
+        if len(sub_df) > 1:
+            sub_df = sub_df[GAP_ANALYSIS_COLUMNS].sort_values(by='start_time', ascending=True).reset_index(drop=True)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', UserWarning)
+                sub_df['start_time'] = pd.to_datetime(sub_df['start_time'].str.strip())
+                sub_df['end_time'] = pd.to_datetime(sub_df['end_time'].str.strip())
+            sub_df['gap_vs_previous_session'] = sub_df['start_time'] - sub_df['end_time'].shift()
+            sub_df['gap_seconds'] = pd.to_timedelta(sub_df['gap_vs_previous_session']).dt.total_seconds()
+            sub_dfs.append(sub_df)
+    return pd.concat(sub_dfs, ignore_index=True)
+
+
+def legacy_subscription_types(frequency_df: pd.DataFrame,
+                              ad_threshold=3,
+                              ad_frequency_threshold=0.6) -> pd.DataFrame:
+    """Reference implementation: a string parse per row and a filter per tv_id."""
+    frequency_df = frequency_df.copy()
+    frequency_df['gap_upper_bound'] = frequency_df['gap_range'].apply(lambda gap_range: int(gap_range.split('-')[1]))
+    frequency_df['is_ad_gap'] = frequency_df['gap_upper_bound'] <= 60
+    
+    tv_metrics = []
+    for tv_id in frequency_df['tv_id'].unique():
+        tv_data = frequency_df[frequency_df['tv_id'] == tv_id]
+        total_gaps = tv_data['frequency'].sum()
+        ad_gaps = tv_data[tv_data['is_ad_gap']]['frequency'].sum()
+        long_gaps = tv_data[~tv_data['is_ad_gap']]['frequency'].sum()
+        ad_gap_proportion = ad_gaps / total_gaps if total_gaps > 0 else 0
+        most_common = tv_data.nlargest(3, 'frequency')['gap_range'].tolist()
+        
+        if total_gaps == 0:
+            subscription_type = 'insufficient_data'
+        elif ad_gaps >= ad_threshold and ad_gap_proportion >= ad_frequency_threshold:
+            subscription_type = 'ad_supported'
+        elif ad_gap_proportion < 0.3 and long_gaps > ad_gaps:
+            subscription_type = 'ad_free'
+        elif ad_gaps < 2:
+            subscription_type = 'ad_free'
+        else:
+            subscription_type = 'mixed_or_uncertain'
+        
+        tv_metrics.append({
+            'tv_id': tv_id,
+            'subscription_type': subscription_type,
+            'total_gaps': total_gaps,
+            'ad_like_gaps': ad_gaps,
+            'long_gaps': long_gaps,
+            'ad_gap_proportion': round(ad_gap_proportion, 3),
+            'most_common_ranges': ', '.join(most_common[:3])
+        })
+    return pd.DataFrame(tv_metrics)
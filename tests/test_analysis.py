@@ -0,0 +1,74 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import make_frequency_frame, make_viewing_frame
+from source.analysis import (SUBSCRIPTION_TYPES, GapAnalysis, classify_subscription_types, compute_session_gaps,
+                             cumulative_gap_counts, encode_session_keys, sweep_subscription_types,
+                             tv_gap_aggregates)
+from source.loading import load_viewing_data, parse_timestamps
+from tests.legacy import legacy_gap_analysis, legacy_subscription_types
+
+SERVICES = ['Netflix', 'Hulu']
+
+
+def test_session_gaps_match_legacy_loop():
+    df = make_viewing_frame(5_000, seed=1)
+    pd.testing.assert_frame_equal(compute_session_gaps(df), legacy_gap_analysis(df))
+
+
+def test_parallel_session_gaps_match_serial():
+    df = make_viewing_frame(5_000, seed=2)
+    df['tv_id'] = df['tv_id'].astype('category')
+    df['tv_content_id'] = encode_session_keys(df['tv_id'], df['content_id'])
+    df['start_time'] = parse_timestamps(df['start_time'])
+    df['end_time'] = parse_timestamps(df['end_time'])
+    pd.testing.assert_frame_equal(compute_session_gaps(df, workers=2), compute_session_gaps(df))
+
+
+@pytest.mark.parametrize('ad_threshold, ad_frequency_threshold', [(3, 0.6), (1, 0.2), (5, 0.9)])
+def test_subscription_types_match_legacy_loop(ad_threshold, ad_frequency_threshold):
+    frequency_df = make_frequency_frame(500, seed=1)
+    pd.testing.assert_frame_equal(
+        classify_subscription_types(tv_gap_aggregates(frequency_df), ad_threshold, ad_frequency_threshold),
+        legacy_subscription_types(frequency_df, ad_threshold, ad_frequency_threshold))
+
+
+def test_sweep_matches_per_call_classification():
+    frequency_df = make_frequency_frame(500, seed=2)
+    ad_gap_cutoffs = [15, 60, 105]
+    ad_thresholds = [1, 3, 7]
+    ad_frequency_thresholds = [0.3, 0.6, 0.9]
+    
+    sweep = sweep_subscription_types(cumulative_gap_counts(frequency_df, max(ad_gap_cutoffs)),
+                                     ad_gap_cutoffs, ad_thresholds, ad_frequency_thresholds)
+    sweep = sweep.set_index(['ad_gap_cutoff', 'ad_threshold', 'ad_frequency_threshold', 'subscription_type'])['tvs']
+    for cutoff, threshold, proportion in itertools.product(ad_gap_cutoffs, ad_thresholds, ad_frequency_thresholds):
+        subscription_types = classify_subscription_types(tv_gap_aggregates(frequency_df, cutoff), threshold, proportion)
+        value_counts = subscription_types['subscription_type'].value_counts()
+        for subscription_type in SUBSCRIPTION_TYPES:
+            assert sweep[cutoff, threshold, proportion, subscription_type] == value_counts.get(subscription_type, 0)
+
+
+def test_for_services_matches_one_analyzer_per_service(viewing_csv):
+    analyzers = GapAnalysis.for_services(viewing_csv, SERVICES)
+    for service in SERVICES:
+        expected = GapAnalysis(viewing_csv, service)
+        pd.testing.assert_frame_equal(analyzers[service].df.reset_index(drop=True),
+                                      expected.df.reset_index(drop=True))
+        pd.testing.assert_frame_equal(analyzers[service].categorize_subscription_types(),
+                                      expected.categorize_subscription_types())
+
+
+def test_alias_index_merges_case_variants(tmp_path):
+    df = make_viewing_frame(2_000, applications=['Netflix', 'NETFLIX', 'netflix ', 'Hulu'])
+    path = tmp_path / 'data.csv'
+    df.drop(columns='tv_content_id').to_csv(path, index=False)
+    
+    expected = np.isin(df['application'], ['Netflix', 'NETFLIX', 'netflix '])
+    for use_cache in [False, True, True]:
+        loaded = load_viewing_data(str(path), ['Netflix'], use_cache=use_cache, alias_index={'netflix': 'Netflix'})
+        assert len(loaded) == expected.sum()
+        assert set(loaded['application']) == {'Netflix'}
@@ -0,0 +1,26 @@
+import io
+
+import pandas as pd
+
+from source.analysis import GapAnalysis
+from source.external_sort import ExternalGapAnalysis
+
+
+def test_external_matches_in_memory(realistic_csv, tmp_path):
+    expected = GapAnalysis(realistic_csv, 'Netflix', use_cache=False)
+    external = ExternalGapAnalysis(realistic_csv, 'Netflix', run_rows=3_000, block_rows=500,
+                                   tmp_dir=str(tmp_path), gap_output=str(tmp_path / 'gaps.csv'))
+    
+    assert external.frequency_df.to_csv(index=False) == expected.frequency_df.to_csv(index=False)
+    assert (external.categorize_subscription_types().to_csv(index=False)
+            == expected.categorize_subscription_types().to_csv(index=False))
+    
+    # sessions come out ordered by label rather than by first appearance
+    columns = [column for column in expected.gap_analysis_df.columns if column != 'tv_content_id']
+    gaps = pd.read_csv(tmp_path / 'gaps.csv')
+    key = ['tv_id', 'content_id', 'start_time']
+    assert external.n_runs > 1
+    pd.testing.assert_frame_equal(
+        gaps[columns].sort_values(key, kind='stable', ignore_index=True),
+        pd.read_csv(io.StringIO(expected.gap_analysis_df.to_csv(index=False)))[columns]
+        .sort_values(key, kind='stable', ignore_index=True))
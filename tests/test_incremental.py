@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_viewing_frame
+from source.analysis import GapAnalysis
+from source.incremental import IncrementalGapAnalysis
+
+
+def split_last_days(df: pd.DataFrame, days: int) -> tuple:
+    day = df['start_time'].str[:10]
+    last_days = sorted(day.unique())[-days:]
+    return (df[~day.isin(last_days)].reset_index(drop=True),
+            df[day.isin(last_days)].reset_index(drop=True))
+
+
+def test_update_frame_matches_full_analysis():
+    df = make_viewing_frame(8_000).drop(columns='tv_content_id')
+    history, delta = split_last_days(df, 30)
+    
+    incremental = IncrementalGapAnalysis('Netflix')
+    incremental.update_frame(history.copy())
+    incremental.update_frame(delta.copy())
+    full = GapAnalysis(path_to_data='', streaming_service='Netflix', data=df)
+    
+    pd.testing.assert_frame_equal(incremental.subscription_types, full.categorize_subscription_types())
+    assert incremental.frequency_df.to_csv(index=False) == full.frequency_df.to_csv(index=False)
+
+
+def test_update_from_files_with_saved_state(tmp_path):
+    df = make_viewing_frame(8_000, applications=['Netflix', 'NETFLIX', 'Hulu']).drop(columns='tv_content_id')
+    history, delta = split_last_days(df, 30)
+    history.to_csv(tmp_path / 'history.csv', index=False)
+    delta.to_csv(tmp_path / 'delta.csv', index=False)
+    df.to_csv(tmp_path / 'all.csv', index=False)
+    alias_index = {'netflix': 'Netflix'}
+    
+    incremental = IncrementalGapAnalysis('Netflix', alias_index=alias_index)
+    incremental.update(str(tmp_path / 'history.csv'))
+    incremental.save(str(tmp_path / 'state.pkl'))
+    incremental = IncrementalGapAnalysis.load(str(tmp_path / 'state.pkl'))
+    incremental.update(str(tmp_path / 'delta.csv'))
+    full = GapAnalysis(str(tmp_path / 'all.csv'), 'Netflix', use_cache=False, alias_index=alias_index)
+    
+    pd.testing.assert_frame_equal(incremental.subscription_types, full.categorize_subscription_types())
+    assert incremental.frequency_df.to_csv(index=False) == full.frequency_df.to_csv(index=False)
+
+
+def test_sessions_link_across_content_id_dtypes(tmp_path):
+    df = make_viewing_frame(8_000, applications=['Netflix', 'YouTube']).drop(columns='tv_content_id')
+    history, delta = split_last_days(df, 30)
+    # blanks in the history read content_id as floats, the delta reads it as integers
+    history.loc[history['application'] == 'YouTube', 'content_id'] = np.nan
+    delta = delta[delta['application'] == 'Netflix']
+    history.to_csv(tmp_path / 'history.csv', index=False)
+    delta.to_csv(tmp_path / 'delta.csv', index=False)
+    pd.concat([history, delta]).to_csv(tmp_path / 'all.csv', index=False)
+    
+    incremental = IncrementalGapAnalysis('Netflix')
+    incremental.update(str(tmp_path / 'history.csv'))
+    incremental.update(str(tmp_path / 'delta.csv'))
+    full = GapAnalysis(str(tmp_path / 'all.csv'), 'Netflix', use_cache=False)
+    
+    pd.testing.assert_frame_equal(incremental.subscription_types, full.categorize_subscription_types())
+    assert incremental.frequency_df.to_csv(index=False) == full.frequency_df.to_csv(index=False)
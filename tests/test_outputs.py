@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+from benchmarks.bench_outputs import result_frames
+from source.outputs import OutputWriter, write_csv
+from source.runner import run_job
+
+
+@pytest.fixture(scope='module')
+def frames(viewing_csv) -> dict:
+    return result_frames(viewing_csv, 'Netflix')
+
+
+def test_write_csv_matches_to_csv(frames, tmp_path):
+    for name, df in frames.items():
+        write_csv(df, tmp_path / f'{name}.csv', chunk_rows=1_000)
+        assert (tmp_path / f'{name}.csv').read_bytes() == df.to_csv(index=False).encode()
+
+
+def test_write_csv_zst_matches_to_csv(frames, tmp_path):
+    zstandard = pytest.importorskip('zstandard')
+    with OutputWriter(str(tmp_path), output_format='csv.zst', chunk_rows=1_000) as writer:
+        for name, df in frames.items():
+            writer.submit(name, df)
+    for (name, df), path in zip(frames.items(), writer.paths):
+        with zstandard.open(path, 'rb') as f:
+            assert f.read() == df.to_csv(index=False).encode()
+
+
+def test_run_job_counts_loaded_service_rows(viewing_csv, tmp_path):
+    df = pd.read_csv(viewing_csv)
+    single_session = df[df['application'] == 'Netflix'].head(1).assign(tv_id='single-session-tv')
+    path = tmp_path / 'data.csv'
+    pd.concat([df, single_session]).to_csv(path, index=False)
+    
+    outcome = run_job(str(path), 'Netflix', str(tmp_path / 'output'), use_cache=False)
+    assert outcome['rows'] == (df['application'] == 'Netflix').sum() + 1
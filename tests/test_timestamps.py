@@ -0,0 +1,61 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import format_utc_timestamps
+from source.timestamps import parse_utc_timestamps, utc_timestamp_strings
+
+
+def general_parser(column: pd.Series) -> pd.Series:
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        return pd.to_datetime(column.str.strip(), utc=True, format='mixed')
+
+
+def test_fixed_width_matches_general_parser():
+    rng = np.random.default_rng(0)
+    column = pd.Series(format_utc_timestamps(rng.integers(1_640_995_200, 1_704_067_200, 5_000)).astype(object))
+    parsed, n_fallback = parse_utc_timestamps(column)
+    assert n_fallback == 0
+    pd.testing.assert_series_equal(parsed, general_parser(column))
+
+
+def test_other_layouts_fall_back_to_general_parser():
+    column = pd.Series(['2022-12-08 15:34:36 UTC',
+                        ' 2022-12-08 15:34:36 UTC ',
+                        '2022-12-08T15:34:36Z',
+                        '2022-12-08 15:34:36',
+                        '2024-02-29 23:59:59 UTC'], name='start_time')
+    parsed, n_fallback = parse_utc_timestamps(column)
+    assert n_fallback == 3
+    pd.testing.assert_series_equal(parsed, general_parser(column))
+
+
+def test_missing_values_stay_missing():
+    column = pd.Series(['2022-12-08 15:34:36 UTC', None, np.nan, '2022-12-09 00:00:00 UTC'])
+    parsed, n_fallback = parse_utc_timestamps(column)
+    assert n_fallback == 0
+    assert parsed.isna().tolist() == [False, True, True, False]
+    assert parsed[3] - parsed[0] == pd.Timedelta('8h 25min 24s')
+
+
+def test_non_ascii_values_fall_back_alone():
+    column = pd.Series(['2022-12-08 15:34:36 UTC', '\u00a02022-12-08 15:34:36 UTC', '2022-12-09 00:00:00 UTC', None])
+    parsed, n_fallback = parse_utc_timestamps(column)
+    assert n_fallback == 1
+    assert parsed[0] == parsed[1] == pd.Timestamp('2022-12-08 15:34:36', tz='UTC')
+    assert parsed[2] == pd.Timestamp('2022-12-09', tz='UTC')
+    assert pd.isna(parsed[3])
+
+
+def test_impossible_dates_are_not_decoded():
+    with pytest.raises(ValueError):
+        parse_utc_timestamps(pd.Series(['2023-02-28 00:00:00 UTC', '2023-02-29 00:00:00 UTC']))
+
+
+def test_format_round_trips_source_text():
+    column = pd.Series(['2022-12-08 15:34:36 UTC', None, '2024-02-29 23:59:59 UTC'], name='start_time')
+    parsed, _ = parse_utc_timestamps(column)
+    pd.testing.assert_series_equal(utc_timestamp_strings(parsed), column)